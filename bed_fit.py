@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+造形サイズ（Bambu A1: 256×256×256mm）に収まるかのチェックと向きの自動探索
+
+- 最小体積の有向バウンディングボックス（OBB）を回転の総当たり + 局所探索で求める
+- 上向き方向（フィボナッチ球面の点）× ベッド上の回転角の候補をまとめて評価し、
+  ベッドに収まる向きのうちオーバーハング面積が最小のものを選ぶ
+- 頂点が多いときは、多数の方向に最も突き出した点（凸包の近似）だけで候補を評価し、
+  最後に選んだ向きだけ全頂点で寸法を確かめる
+
+使い方:
+    python3 bed_fit.py                  # 全バリエーション
+    python3 bed_fit.py frontback ボディ\\ 15.stl
+"""
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from mesh_validate import weld
+from stl_export import face_normals
+
+BED_SIZE = (256.0, 256.0, 256.0)  # Bambu A1 の造形サイズ (X, Y, Z) mm
+OVERHANG_ANGLE = 45               # 度（鉛直からこれ以上傾いた下向きの面をオーバーハングとする）
+BED_CONTACT = 0.1                 # mm（ベッド面からこの高さ以内の面はベッドに接しているとみなす）
+
+UP_DIRECTIONS = 400   # 上向き方向の候補数
+YAW_STEPS = 36        # ベッド上の回転角の候補数（0〜90度）
+SUPPORT_DIRECTIONS = 512  # 凸包を近似するときの方向数
+REFINE_ROUNDS = 4
+REFINE_SAMPLES = 256
+BATCH = 4096          # 一度に評価する回転の数
+OVERHANG_BATCH = 64   # オーバーハングを一度に評価する上向き方向の数（面数 × これ の配列を作る）
+
+
+@dataclass(frozen=True)
+class FitResult:
+    """rotation は行が (ベッドの X, Y, 上向き) になる回転行列"""
+    fits: bool
+    rotation: np.ndarray
+    extents: np.ndarray        # 選んだ向きでの X, Y, Z 寸法
+    overhang_area: float       # mm²
+    obb_extents: np.ndarray    # 最小体積OBBの寸法（大きい順）
+    obb_rotation: np.ndarray
+
+    def summary(self):
+        x, y, z = self.extents
+        a, b, c = self.obb_extents
+        return (f"向き {x:.1f}×{y:.1f}×{z:.1f}mm オーバーハング {self.overhang_area / 100:.1f}cm² "
+                f"/ OBB {a:.1f}×{b:.1f}×{c:.1f}mm")
+
+
+def fibonacci_directions(count):
+    """球面上にほぼ均等に並んだ単位ベクトル (count, 3)"""
+    i = np.arange(count) + 0.5
+    z = 1 - 2 * i / count
+    r = np.sqrt(1 - z * z)
+    phi = np.pi * (3 - np.sqrt(5)) * i
+    return np.stack([r * np.cos(phi), r * np.sin(phi), z], axis=1)
+
+
+def candidate_ups():
+    """上向き方向の候補（フィボナッチ球面 + 座標軸の ±X, ±Y, ±Z）"""
+    axes = np.concatenate([np.eye(3), -np.eye(3)])
+    return np.concatenate([fibonacci_directions(UP_DIRECTIONS), axes])
+
+
+def rotations_from(ups, yaws):
+    """上向き方向 (K, 3) × 回転角 (M,) → 回転行列 (K*M, 3, 3)"""
+    ups = ups / np.linalg.norm(ups, axis=1, keepdims=True)
+    # 上向きと平行でない軸から直交基底を作る
+    helper = np.where(np.abs(ups[:, :1]) < 0.9, [[1.0, 0, 0]], [[0, 1.0, 0]])
+    e1 = np.cross(ups, helper)
+    e1 /= np.linalg.norm(e1, axis=1, keepdims=True)
+    e2 = np.cross(ups, e1)
+    cos = np.cos(yaws)[None, :, None]
+    sin = np.sin(yaws)[None, :, None]
+    x_axis = cos * e1[:, None] + sin * e2[:, None]
+    y_axis = -sin * e1[:, None] + cos * e2[:, None]
+    z_axis = np.broadcast_to(ups[:, None], x_axis.shape)
+    return np.stack([x_axis, y_axis, z_axis], axis=2).reshape(-1, 3, 3)
+
+
+def support_points(points, count=SUPPORT_DIRECTIONS):
+    """多数の方向で最も突き出した点だけを残す（凸包の頂点の近似）"""
+    if len(points) <= count:
+        return points
+    directions = fibonacci_directions(count)
+    projected = directions @ points.T  # 方向ごとに行が連続するので argmax が速い
+    keep = np.union1d(projected.argmax(axis=1), projected.argmin(axis=1))
+    return points[keep]
+
+
+def extents_of(points, rotations):
+    """各回転での X, Y, Z 寸法 (K, 3) と Z の最小値 (K,)"""
+    extents = np.empty((len(rotations), 3))
+    lowest = np.empty(len(rotations))
+    center = points.mean(axis=0)
+    points = points - center
+    for start in range(0, len(rotations), BATCH):
+        batch = rotations[start:start + BATCH]
+        # (点, 回転×3軸) の行列積1回で全回転の座標を出す
+        projected = (points @ batch.reshape(-1, 3).T).reshape(len(points), len(batch), 3)
+        low = projected.min(axis=0)
+        extents[start:start + len(batch)] = projected.max(axis=0) - low
+        lowest[start:start + len(batch)] = low[:, 2] + batch[:, 2] @ center
+    return extents, lowest
+
+
+def overhang_areas(normals, areas, centers, ups, lowest):
+    """各上向き方向でのオーバーハング面積（ベッドに接する面は除く）"""
+    limit = -np.cos(np.radians(OVERHANG_ANGLE))
+    # 面の分類だけなので float32 で十分（面数 × 方向数 の配列が半分の大きさになる）
+    normals = normals.astype(np.float32)
+    centers = centers.astype(np.float32)
+    areas = areas.astype(np.float32)
+    ups = ups.astype(np.float32)
+    result = np.empty(len(ups))
+    for start in range(0, len(ups), OVERHANG_BATCH):
+        batch = slice(start, start + OVERHANG_BATCH)
+        down = normals @ ups[batch].T < limit
+        on_bed = centers @ ups[batch].T <= lowest[batch] + BED_CONTACT
+        result[batch] = areas @ (down & ~on_bed)
+    return result
+
+
+def fits_bed(extents, bed=BED_SIZE, rotate=False):
+    """寸法 (..., 3) が造形サイズに収まるか（rotate=True なら軸の入れ替え＝90° 単位の置き直しも許す）"""
+    extents, bed = np.asarray(extents, dtype=np.float64), np.asarray(bed, dtype=np.float64)
+    if rotate:
+        extents, bed = np.sort(extents, axis=-1), np.sort(bed)
+    return np.all(extents <= bed + 1e-6, axis=-1)
+
+
+def minimal_obb(points, rotations, extents, rng):
+    """最小体積のOBB → (回転行列, 寸法)
+
+    rotations, extents は総当たりで評価済みの候補（fit_part と共有する）
+    """
+    best = int(np.argmin(extents.prod(axis=1)))
+    best_rotation, best_extents = rotations[best], extents[best]
+
+    # 最良の回転のまわりで少しずつ小さく揺らして詰める
+    spread = np.radians(90 / YAW_STEPS)
+    for _ in range(REFINE_ROUNDS):
+        axes = rng.normal(size=(REFINE_SAMPLES, 3))
+        axes /= np.linalg.norm(axes, axis=1, keepdims=True)
+        angles = rng.uniform(-spread, spread, REFINE_SAMPLES)
+        candidates = axis_angle(axes, angles) @ best_rotation
+        extents, _ = extents_of(points, candidates)
+        index = int(np.argmin(extents.prod(axis=1)))
+        if extents[index].prod() < best_extents.prod():
+            best_rotation, best_extents = candidates[index], extents[index]
+        spread /= 3
+    order = np.argsort(best_extents)[::-1]
+    return best_rotation[order], best_extents[order]
+
+
+def axis_angle(axes, angles):
+    """回転軸 (K, 3) と角度 (K,) → 回転行列 (K, 3, 3)（ロドリゲスの公式）"""
+    x, y, z = axes.T
+    zero = np.zeros_like(x)
+    skew = np.stack([zero, -z, y, z, zero, -x, -y, x, zero], axis=1).reshape(-1, 3, 3)
+    sin = np.sin(angles)[:, None, None]
+    cos = np.cos(angles)[:, None, None]
+    return np.eye(3) + sin * skew + (1 - cos) * (skew @ skew)
+
+
+def fit_part(vertices, faces=None, bed=BED_SIZE, seed=0):
+    """ベッドに収まる向きのうちオーバーハング面積が最小のものを探す
+
+    faces を省略すると三角形 (N, 3, 3) の並び（mesh.Mesh.vectors や MappedSTL.vectors）として扱う
+    """
+    vertices, faces = weld(vertices, faces)
+    triangles = vertices[faces]
+    cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    areas = 0.5 * np.linalg.norm(cross, axis=1)
+    normals = face_normals(triangles)
+    centers = triangles.mean(axis=1)
+
+    rng = np.random.default_rng(seed)
+    hull = support_points(vertices)
+    ups = candidate_ups()
+    yaws = np.linspace(0, np.pi / 2, YAW_STEPS, endpoint=False)
+    rotations = rotations_from(ups, yaws)
+    extents, lowest = extents_of(hull, rotations)
+
+    # オーバーハングは上向き方向だけで決まる（回転角にはよらない）
+    overhang = np.repeat(overhang_areas(normals, areas, centers, ups, lowest[::YAW_STEPS]), YAW_STEPS)
+    fits = fits_bed(extents, bed)
+    if fits.any():
+        # 収まる向きの中でオーバーハング最小、同じなら高さが低いもの
+        candidates = np.flatnonzero(fits)
+        best = candidates[np.lexsort((extents[candidates, 2], overhang[candidates]))[0]]
+    else:
+        # 収まらない場合は、はみ出しが最も小さい向きを示す
+        best = int(np.argmin(np.max(extents / np.asarray(bed), axis=1)))
+
+    # 選んだ向きだけは全頂点で寸法を確かめる
+    final_extents, _ = extents_of(vertices, rotations[best:best + 1])
+    obb_rotation, obb_extents = minimal_obb(hull, rotations, extents, rng)
+    obb_extents, _ = extents_of(vertices, obb_rotation[None])
+    return FitResult(
+        fits=bool(fits_bed(final_extents[0], bed)),
+        rotation=rotations[best],
+        extents=final_extents[0],
+        overhang_area=float(overhang[best]),
+        obb_extents=obb_extents[0],
+        obb_rotation=obb_rotation,
+    )
+
+
+def main(argv=None):
+    from variants import VARIANTS
+
+    targets = (sys.argv[1:] if argv is None else argv) or list(VARIANTS)
+    failed = 0
+    for target in targets:
+        if target in VARIANTS:
+            from chute_params import DEFAULT_PARAMS
+            from variants import load_parts
+
+            results = [(filename, fit_part(*func(DEFAULT_PARAMS)))
+                       for func, filename in load_parts(target)]
+        else:
+            from stl_reader import MappedSTL
+
+            results = [(target, fit_part(MappedSTL(target).vectors))]
+        for name, result in results:
+            failed += not result.fits
+            mark = '✅' if result.fits else '❌'
+            print(f"{mark} {name}: {result.summary()}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
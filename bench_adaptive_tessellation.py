@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+許容誤差モード（ChuteParams.tolerance / coinchute.py の --tolerance）のベンチマーク
+はめ込み型の下部パーツ（長方形 → 直径100mmの円の線織面）で、許容誤差ごとに
+1. 許容誤差モードの三角形数・生成時間・曲面との最大誤差（surface_error）
+2. 同じ誤差に収まる一番少ない一様分割（segments を二分探索、loft_rings=1）の三角形数
+を比べる。既定の segments=32 の誤差も表示する
+
+使い方:
+    python3 bench_adaptive_tessellation.py [許容誤差 ...]
+"""
+
+import sys
+from dataclasses import replace
+
+from bench_mesh_validate import best_of
+from chute_params import DEFAULT_PARAMS
+from generate_stl_snap_fit import create_lower_part_snap, lower_part_snap_surfaces
+from mesh_builder import surface_error
+
+DEFAULT_TOLERANCES = [0.5, 0.2, 0.1]
+MAX_SEGMENTS = 4096  # 一様分割の二分探索の上限
+
+
+def measure(params):
+    """(三角形数, 最大誤差 mm)"""
+    vertices, faces = create_lower_part_snap(params)
+    return len(faces), surface_error(vertices, faces, lower_part_snap_surfaces(params))
+
+
+def smallest_uniform(tolerance):
+    """誤差が tolerance 以下になる一番小さい segments（4の倍数）→ (segments, 三角形数, 誤差)"""
+    low, high = 1, MAX_SEGMENTS // 4  # segments = 4 * k
+    result = None
+    while low <= high:
+        k = (low + high) // 2
+        faces, error = measure(replace(DEFAULT_PARAMS, segments=4 * k))
+        if error <= tolerance:
+            result, high = (4 * k, faces, error), k - 1
+        else:
+            low = k + 1
+    return result
+
+
+def run(tolerances):
+    faces, error = measure(DEFAULT_PARAMS)
+    print(f"既定（segments={DEFAULT_PARAMS.segments}, loft_rings={DEFAULT_PARAMS.loft_rings}）: "
+          f"三角形 {faces} / 誤差 {error:.3f} mm\n")
+    print(f"{'許容[mm]':>9} {'時間[ms]':>9} {'三角形':>7} {'誤差[mm]':>9}   {'一様 segments':>13} {'三角形':>7} "
+          f"{'誤差[mm]':>9} {'削減':>6}  結果")
+    for tolerance in tolerances:
+        params = replace(DEFAULT_PARAMS, tolerance=tolerance)
+        elapsed = best_of(lambda: create_lower_part_snap(params), 3)
+        faces, error = measure(params)
+        uniform = smallest_uniform(tolerance)
+        if uniform is None:
+            print(f"{tolerance:>9g} {elapsed * 1e3:>9.0f} {faces:>7} {error:>9.4f}   "
+                  f"（segments={MAX_SEGMENTS} でも届かない）  {'✅' if error <= tolerance else '❌'}")
+            continue
+        segments, uniform_faces, uniform_error = uniform
+        ok = error <= tolerance and faces < uniform_faces
+        print(f"{tolerance:>9g} {elapsed * 1e3:>9.0f} {faces:>7} {error:>9.4f}   {segments:>13} {uniform_faces:>7} "
+              f"{uniform_error:>9.4f} {1 - faces / uniform_faces:>6.0%}  {'✅' if ok else '❌'}")
+
+
+if __name__ == "__main__":
+    run([float(arg) for arg in sys.argv[1:]] or DEFAULT_TOLERANCES)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+bed_fit のベンチマーク
+Shapr3D のボディ（ボディ *.stl）と生成パーツで fit_part の時間を測る（目標: 1秒以内）
+
+使い方:
+    python3 bench_bed_fit.py [STLファイル ...]
+"""
+
+import glob
+import sys
+
+from bed_fit import fit_part
+from bench_mesh_validate import best_of
+from stl_reader import MappedSTL
+
+TARGET_SECONDS = 1.0
+
+
+def run(paths):
+    print(f"{'ファイル':<28} {'三角形数':>9} {'時間[ms]':>9}  結果")
+    for path in paths:
+        triangles = MappedSTL(path).vectors
+        elapsed = best_of(lambda: fit_part(triangles), 3)
+        result = fit_part(triangles)
+        mark = '✅' if elapsed < TARGET_SECONDS else '❌'
+        print(f"{path:<28} {len(triangles):>9} {elapsed * 1e3:>9.1f}  {mark} {result.summary()}")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:] or sorted(glob.glob('ボディ *.stl')) + ['coin_chute_back.stl', 'coin_chute_front.stl'])
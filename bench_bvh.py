@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+bvh のベンチマーク
+閉じたトーラスで、作成・保存・読み込みの時間と、まとめた問い合わせ（光線・最近点・箱）の時間を測る
+一部の問い合わせは全三角形を調べる方法と比べて、結果が一致するかも確かめる
+
+使い方:
+    python3 bench_bvh.py [三角形数 ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench_mesh_validate import best_of, torus
+from bvh import build_bvh, closest_points, load_bvh, ray_triangle
+
+DEFAULT_TRIANGLES = [10_000, 100_000, 1_000_000]
+QUERIES = 100_000
+CHECKS = 50
+
+
+def brute_force(triangles, origins, directions, points):
+    """比較用: 問い合わせ1つごとに全三角形を調べる"""
+    a = triangles[:, 0]
+    ab = triangles[:, 1] - a
+    ac = triangles[:, 2] - a
+    ones = np.ones((len(triangles), 1))
+    distance = np.array([ray_triangle(o * ones, d * ones, a, ab, ac).min() for o, d in zip(origins, directions)])
+    nearest = np.array([np.linalg.norm(closest_points(p * ones, a, ab, ac) - p, axis=1).min() for p in points])
+    return distance, nearest
+
+
+def run(counts):
+    rng = np.random.default_rng(0)
+    print(f"{'三角形数':>9} {'作成[ms]':>9} {'保存[ms]':>9} {'読込[ms]':>9} {'光線[µs/本]':>12} "
+          f"{'最近点[µs/点]':>14} {'箱[µs/個]':>10} {'全探索[µs/本]':>14}  結果")
+    for count in counts:
+        vertices, faces = torus(count)
+        triangles = vertices[faces]
+        built = best_of(lambda: build_bvh(triangles), 1)
+        tree = build_bvh(triangles)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tree.bvh.npz')
+            saved = best_of(lambda: tree.save(path), 3)
+            loaded = best_of(lambda: load_bvh(path, triangles), 3)
+
+        # 光線は外側の点から中心付近へ、最近点と箱は表面の近く
+        origins = rng.uniform(-200, 200, (QUERIES, 3))
+        directions = rng.uniform(-30, 30, (QUERIES, 3)) - origins
+        directions /= np.linalg.norm(directions, axis=1)[:, None]
+        points = triangles[rng.integers(0, len(triangles), QUERIES)].mean(axis=1) + rng.normal(0, 2, (QUERIES, 3))
+
+        ray_time = best_of(lambda: tree.intersect(origins, directions), 1)
+        closest_time = best_of(lambda: tree.closest(points), 1)
+        box_time = best_of(lambda: tree.overlap(points - 2, points + 2), 1)
+
+        start = time.perf_counter()
+        expected_distance, expected_nearest = brute_force(triangles, origins[:CHECKS], directions[:CHECKS],
+                                                          points[:CHECKS])
+        scanned = (time.perf_counter() - start) / (2 * CHECKS)
+        distance, _ = tree.intersect(origins[:CHECKS], directions[:CHECKS])
+        _, nearest, _ = tree.closest(points[:CHECKS])
+        ok = np.allclose(distance, expected_distance) and np.allclose(nearest, expected_nearest)
+        mark = '✅' if ok else '❌'
+        print(f"{len(triangles):>9} {built * 1e3:>9.0f} {saved * 1e3:>9.1f} {loaded * 1e3:>9.1f} "
+              f"{ray_time / QUERIES * 1e6:>12.1f} {closest_time / QUERIES * 1e6:>14.1f} "
+              f"{box_time / QUERIES * 1e6:>10.1f} {scanned * 1e6:>14.0f}  {mark} "
+              f"節 {tree.nodes} 深さ {tree.depth()} SAH {tree.sah_cost():.1f}")
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_TRIANGLES)
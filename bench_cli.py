@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+coinchute.py の起動時間ベンチマーク
+--list / --help が重いモジュール（numpy, stl, matplotlib）を読まずに
+50ms 以内で起動することを確認する
+
+- 各コマンドを別プロセスで実行し、最速の実時間を出す
+- python -X importtime の出力から、読み込まれた重いモジュールと
+  import の合計時間を出す
+
+使い方:
+    python3 bench_cli.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(HERE, 'coinchute.py')
+REPEAT = 10
+TARGET_MS = 50
+HEAVY_MODULES = ('numpy', 'stl', 'matplotlib')
+
+COMMANDS = [
+    ('--list', [CLI, '--list']),
+    ('--help', [CLI, '--help']),
+    ('hole --help', [CLI, 'hole', '--help']),
+    ('(参考) import numpy, stl', ['-c', 'import numpy, stl']),
+    ('(参考) generate_stl import', ['-c', 'import generate_stl']),
+]
+
+
+def wall_time(args):
+    """REPEAT 回実行して最速の実時間（秒）"""
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=HERE, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_profile(args):
+    """-X importtime の出力から (import合計[ms], 読み込まれた重いモジュール)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=HERE, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    total_us = 0
+    heavy = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # 字下げなし = トップレベルの import（cumulative に子も含まれる）
+        if not name.startswith('  '):
+            total_us += int(cumulative)
+        module = name.strip().split('.')[0]
+        if module in HEAVY_MODULES:
+            heavy.add(module)
+    return total_us / 1e3, sorted(heavy)
+
+
+def run():
+    print(f"{'コマンド':<28} {'実時間[ms]':>10} {'import[ms]':>10}  重いモジュール")
+    for label, args in COMMANDS:
+        elapsed = wall_time(args) * 1e3
+        imports, heavy = import_profile(args)
+        mark = '' if label.startswith('(') else ('✅' if elapsed < TARGET_MS and not heavy else '❌')
+        print(f"{label:<28} {elapsed:>10.1f} {imports:>10.1f}  {', '.join(heavy) or '-'} {mark}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+coin_sim のベンチマーク
+生成したシュート（hole: create_upper_part + create_lower_part、snap: create_upper_part_snap +
+create_lower_part_snap。下部パーツが長方形の投入口から出口の円へ絞る漏斗）を組み立てた状態で硬貨を落として、
+計算時間・1ステップあたりの時間・流量を測る（目標: 10,000枚を10分以内に全部出口へ）
+
+使い方:
+    python3 bench_coin_sim.py [枚数 ...]
+"""
+
+import sys
+import time
+
+from chute_params import DEFAULT_PARAMS
+from coin_sim import TIME_STEP, assemble, simulate
+
+DEFAULT_COUNTS = [1_000, 10_000]
+VARIANTS = ['hole', 'snap']
+TARGET_SECONDS = 600.0
+
+
+def run(counts):
+    print(f"{'バリエーション':<8} {'枚数':>7} {'計算[s]':>9} {'模擬時間[s]':>11} {'ステップ[ms]':>12} {'流量[枚/s]':>10}  結果")
+    for variant in VARIANTS:
+        vertices, faces = assemble(variant, DEFAULT_PARAMS)
+        for count in counts:
+            start = time.perf_counter()
+            result = simulate(vertices, faces, count)
+            elapsed = time.perf_counter() - start
+            steps = result.seconds / TIME_STEP
+            ok = elapsed < TARGET_SECONDS and result.exited == count
+            mark = '✅' if ok else '❌'
+            print(f"{variant:<8} {count:>7} {elapsed:>9.1f} {result.seconds:>11.1f} "
+                  f"{elapsed / steps * 1e3:>12.2f} {result.throughput:>10.1f}  {mark} {result.summary()}")
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+convex_hull のベンチマーク
+1. 立方体・球の中のランダムな点と、球面上の点（全部が凸包の頂点）の凸包を点の数を変えて作り、
+   時間と、閉じているか（validate）、全部の点が凸包の内側にあるかを調べる
+2. inset_hull: 1辺 L の立方体を t だけ内側へ移すと体積 (L - 2t)³ になるか、
+   ランダムな点群（ほぼ1点で交わる面ができる）でも閉じたメッシュ（validate）になるか
+3. coin_chute.scad の上下パーツ（hull() 2つの差 + 突起・穴）を作る時間
+
+使い方:
+    python3 bench_convex_hull.py [点の数 ...]
+"""
+
+import sys
+
+import numpy as np
+
+from bench_mesh_boolean import volume
+from bench_mesh_validate import best_of
+from chute_params import from_scad
+from convex_hull import convex_hull, inset_hull
+from generate_stl_scad import SCAD_PATH, create_lower_part_scad, create_upper_part_scad
+from mesh_validate import validate
+
+DEFAULT_POINTS = [1_000, 10_000, 100_000]
+SPHERE_LIMIT = 10_000  # 球面上の点はすべて凸包の頂点になるので、この数までにする
+CHUNK = 1024           # 内側かどうかを調べる点の数（1回あたり）
+INSET_POINTS = [100, 500, 2000]  # inset_hull を調べるランダムな点群の点の数
+INSET_SEEDS = 10
+INSET_THICKNESS = 0.2
+
+
+def clouds(count, rng):
+    """[(名前, 点 (N, 3))]"""
+    direction = rng.normal(size=(count, 3))
+    direction /= np.linalg.norm(direction, axis=1)[:, None]
+    return [
+        ('立方体', rng.uniform(-50, 50, (count, 3))),
+        ('球', direction * 50 * rng.uniform(0, 1, (count, 1)) ** (1 / 3)),
+        ('球面', direction[:SPHERE_LIMIT] * 50),
+    ]
+
+
+def outside_distance(points, vertices, faces):
+    """凸包の面より外にある点の、最大のはみ出し（mm）"""
+    a = vertices[faces[:, 0]]
+    normal = np.cross(vertices[faces[:, 1]] - a, vertices[faces[:, 2]] - a)
+    normal /= np.linalg.norm(normal, axis=1)[:, None]
+    offset = np.einsum('ij,ij->i', normal, a)
+    return max(float((points[k:k + CHUNK] @ normal.T - offset).max()) for k in range(0, len(points), CHUNK))
+
+
+def run_hulls(counts):
+    rng = np.random.default_rng(0)
+    print(f"{'点の数':>9} {'分布':<6} {'時間[ms]':>9} {'頂点':>7} {'面':>7} {'はみ出し[mm]':>13}  結果")
+    for count in counts:
+        for name, points in clouds(count, rng):
+            result = []
+            elapsed = best_of(lambda: result.append(convex_hull(points)), 1)
+            vertices, faces = result[-1]
+            worst = outside_distance(points, vertices, faces)
+            ok = validate(vertices, faces).ok and worst < 1e-9
+            print(f"{len(points):>9} {name:<6} {elapsed * 1e3:>9.0f} {len(vertices):>7} {len(faces):>7} "
+                  f"{worst:>13.1e}  {'✅' if ok else '❌'}")
+
+
+def run_inset(side=10.0, thickness=1.0):
+    corners = np.array([[x, y, z] for x in (0, side) for y in (0, side) for z in (0, side)])
+    vertices, faces = inset_hull(corners, thickness)
+    expected = (side - 2 * thickness) ** 3
+    ok = validate(vertices, faces).ok and abs(volume(vertices, faces) - expected) < 1e-9 * expected
+    print(f"\ninset_hull: 立方体 {side:g}mm を {thickness:g}mm 内側へ → 体積 {volume(vertices, faces):.3f} "
+          f"（計算値 {expected:.3f}）  {'✅' if ok else '❌'}")
+
+    failed = 0
+    for count in INSET_POINTS:
+        for seed in range(INSET_SEEDS):
+            vertices, faces = inset_hull(np.random.default_rng(seed).normal(size=(count, 3)), INSET_THICKNESS)
+            failed += not validate(vertices, faces).ok
+    total = len(INSET_POINTS) * INSET_SEEDS
+    print(f"inset_hull: ランダムな点群 {total} 個（点 {', '.join(map(str, INSET_POINTS))}）を "
+          f"{INSET_THICKNESS:g} 内側へ → validate NG {failed} 個  {'✅' if not failed else '❌'}")
+
+
+def run_scad():
+    params = from_scad(SCAD_PATH)
+    print(f"\n{'coin_chute.scad':<24} {'時間[ms]':>9} {'面':>6}  結果")
+    for func in (create_upper_part_scad, create_lower_part_scad):
+        result = []
+        elapsed = best_of(lambda: result.append(func(params)), 3)
+        vertices, faces = result[-1]
+        print(f"{func.__name__:<24} {elapsed * 1e3:>9.0f} {len(faces):>6}  {'✅' if validate(vertices, faces).ok else '❌'}")
+
+
+if __name__ == "__main__":
+    run_hulls([int(arg) for arg in sys.argv[1:]] or DEFAULT_POINTS)
+    run_inset()
+    run_scad()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+export_3mf のベンチマーク
+2つのトーラス（上下パーツの代わり）を、STL 2ファイル（stl_export.save_stl）と
+1枚のプレートの 3MF（export_3mf.write_3mf）に書き出して、時間と大きさを比べる
+3MF は読み直して、頂点・三角形の数が weld 後のメッシュと同じか確かめる
+
+使い方:
+    python3 bench_export_3mf.py [三角形数 ...]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import zipfile
+from contextlib import redirect_stdout
+
+from bench_mesh_validate import best_of, torus
+from export_3mf import MODEL_PATH, write_3mf
+from stl_export import save_stl
+
+DEFAULT_TRIANGLES = [10_000, 100_000, 1_000_000]
+
+
+def count_elements(path):
+    """3MF のモデルの <vertex> と <triangle> の数"""
+    with zipfile.ZipFile(path) as archive, archive.open(MODEL_PATH) as fh:
+        text = fh.read()
+    return text.count(b'<vertex '), text.count(b'<triangle ')
+
+
+def run(counts):
+    print(f"{'三角形数':>9} {'STL[ms]':>9} {'3MF[ms]':>9} {'STL[KB]':>10} {'3MF[KB]':>9} {'比':>6}  結果")
+    for count in counts:
+        parts = [(f'part{k}.stl', *torus(count // 2, minor=30.0 - 10 * k)) for k in range(2)]
+        with tempfile.TemporaryDirectory() as directory:
+            def write_stls():
+                for name, vertices, faces in parts:
+                    save_stl(vertices, faces, os.path.join(directory, name))
+
+            path = os.path.join(directory, 'plate.3mf')
+            with redirect_stdout(io.StringIO()):  # save_stl の表示と、並べたトーラスがはみ出す警告は出さない
+                stl_time = best_of(write_stls, 1)
+                three_mf_time = best_of(lambda: write_3mf(path, parts, orient=False), 1)
+            stl_size = sum(os.path.getsize(os.path.join(directory, name)) for name, _, _ in parts)
+            size = os.path.getsize(path)
+            vertices, triangles = count_elements(path)
+
+        ok = vertices == sum(len(v) for _, v, _ in parts) and triangles == sum(len(f) for _, _, f in parts)
+        mark = '✅' if ok and size < stl_size else '❌'
+        print(f"{triangles:>9} {stl_time * 1e3:>9.0f} {three_mf_time * 1e3:>9.0f} {stl_size / 1024:>10.0f} "
+              f"{size / 1024:>9.0f} {stl_size / size:>5.1f}x  {mark}")
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_TRIANGLES)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+差分再生成（param_deps / DesignCache.save_stl）のベンチマーク
+全バリエーションのカタログ（10ファイル）を空のキャッシュ・出力先に作ってから、
+1. 何も変えずにもう一度 2. clearance だけ変える 3. hole_position だけ変える 4. キャッシュを消して記録だけで
+と続けて実行し、時間と、書き換えたファイル数・作り直したパーツ数を param_deps の依存グラフの予想と比べる
+
+使い方:
+    python3 bench_incremental.py
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import fields, replace
+
+from chute_params import DEFAULT_PARAMS, ChuteParams
+from design_cache import DesignCache
+from param_deps import affected_parts, dependency_graph
+from variants import VARIANTS, load_parts
+
+STEPS = [
+    ('初回（全部）', {}),
+    ('変更なし', {}),
+    ('clearance=0.2', {'clearance': 0.2}),
+    ('hole_position=60', {'clearance': 0.2, 'hole_position': 60}),
+]
+
+
+def snapshot(directory):
+    """パーツの STL の {ファイル名: 更新時刻 ns}（save_stl が一緒に書き出す LOD は数えない）"""
+    parts = {filename for variant in VARIANTS for _, filename in load_parts(variant)}
+    return {entry.name: entry.stat().st_mtime_ns for entry in os.scandir(directory) if entry.name in parts}
+
+
+def regenerate(cache, out_dir, params):
+    """カタログ全体を save_stl で作る → (時間, 作り直したパーツ数)"""
+    built = 0
+    start = time.perf_counter()
+    for variant in VARIANTS:
+        for func, filename in load_parts(variant):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                cache.save_stl(func, os.path.join(out_dir, filename), params)
+            built += '読むパラメータが同じ' not in output.getvalue()
+    return time.perf_counter() - start, built
+
+
+def run():
+    graph = dependency_graph(VARIANTS, DEFAULT_PARAMS)
+    with tempfile.TemporaryDirectory() as root:
+        cache_dir, out_dir = os.path.join(root, 'cache'), os.path.join(root, 'out')
+        os.makedirs(out_dir)
+        cache = DesignCache(cache_dir)
+        previous = DEFAULT_PARAMS
+        print(f"{'手順':<18} {'時間[ms]':>9} {'作り直し':>8} {'書き換え':>8} {'予想':>5}  結果")
+        for name, overrides in STEPS + [('キャッシュなし', {'clearance': 0.2, 'hole_position': 60})]:
+            if name == 'キャッシュなし':
+                shutil.rmtree(cache_dir)
+                cache = DesignCache(cache_dir)
+            params = replace(DEFAULT_PARAMS, **overrides)
+            changed = {f.name for f in fields(ChuteParams)
+                       if f.init and getattr(params, f.name) != getattr(previous, f.name)}
+            expected = len(graph) if name == '初回（全部）' else len(affected_parts(graph, changed))
+            before = snapshot(out_dir)
+            elapsed, built = regenerate(cache, out_dir, params)
+            after = snapshot(out_dir)
+            written = sum(1 for filename, mtime in after.items() if before.get(filename) != mtime)
+            mark = '✅' if built == expected and written <= built else '❌'
+            print(f"{name:<18} {elapsed * 1e3:>9.0f} {built:>8} {written:>8} {expected:>5}  {mark}")
+            previous = params
+
+
+if __name__ == "__main__":
+    run()
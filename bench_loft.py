@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+長方形→円ロフトのベンチマーク
+旧実装（4辺 × segments_per_edge の二重ループ）と
+mesh_builder.loft_rect_to_circle（外側・内側を一括生成）を比較する
+
+使い方:
+    python3 bench_loft.py [分割数 ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from chute_params import DEFAULT_PARAMS
+from mesh_builder import MeshBuilder, corner_phase, loft_rect_to_circle, slanted_circle
+
+DEFAULT_SEGMENTS = [32, 512, 8192]
+
+
+def shell_inputs(segments):
+    """generate_stl.create_lower_part と同じ長方形・円周を作る
+    （円周は角度 corner_phase から始める。loft_rect_to_circle は回さずにそのまま旧実装と同じ点をつなぐ）"""
+    p = DEFAULT_PARAMS
+    w, d, t = p.top_width / 2, p.top_depth / 2, p.wall_thickness
+    top_outer = [[-w, -d, 0], [w, -d, 0], [w, d, 0], [-w, d, 0]]
+    top_inner = [
+        [-(w - t), -(d - t), -t],
+        [(w - t), -(d - t), -t],
+        [(w - t), (d - t), -t + p.slope_drop],
+        [-(w - t), (d - t), -t + p.slope_drop],
+    ]
+    center = (0, -d + p.hole_position)
+    circle_outer = slanted_circle(
+        center, p.bottom_diameter / 2, segments,
+        lambda y: (y + d) / p.top_depth * p.slope_drop - p.height_per_part - t, corner_phase(top_outer, center))
+    circle_inner = slanted_circle(
+        center, p.bottom_diameter / 2 - t, segments,
+        lambda y: (y + d) / p.top_depth * p.slope_drop - p.height_per_part - t * 2, corner_phase(top_inner, center))
+    return top_outer, top_inner, circle_outer.tolist(), circle_inner.tolist()
+
+
+def legacy_loft(top_outer, top_inner, circle_outer, circle_inner, segments):
+    """旧 create_lower_part の遷移面ループ"""
+    vertices = []
+    faces = []
+    segments_per_edge = segments // 4
+
+    for top, circle, flip in ((top_outer, circle_outer, False), (top_inner, circle_inner, True)):
+        for i in range(4):
+            next_i = (i + 1) % 4
+            top_start = np.array(top[i])
+            top_end = np.array(top[next_i])
+
+            for j in range(segments_per_edge):
+                circle_idx = i * segments_per_edge + j
+                next_circle_idx = (circle_idx + 1) % segments
+
+                t1 = j / segments_per_edge
+                t2 = (j + 1) / segments_per_edge
+                rect_p1 = top_start + t1 * (top_end - top_start)
+                rect_p2 = top_start + t2 * (top_end - top_start)
+
+                v_idx = len(vertices)
+                vertices.extend([rect_p1.tolist(), rect_p2.tolist(),
+                                 circle[next_circle_idx], circle[circle_idx]])
+                if flip:
+                    faces.append([v_idx, v_idx+2, v_idx+1])
+                    faces.append([v_idx, v_idx+3, v_idx+2])
+                else:
+                    faces.append([v_idx, v_idx+1, v_idx+2])
+                    faces.append([v_idx, v_idx+2, v_idx+3])
+
+    return np.array(vertices), np.array(faces)
+
+
+def vectorized_loft(top_outer, top_inner, circle_outer, circle_inner, rings=1):
+    """loft_rect_to_circle + MeshBuilder.loft"""
+    outer_shell, inner_shell = loft_rect_to_circle(
+        [top_outer, top_inner], [circle_outer, circle_inner], rings=rings)
+    builder = MeshBuilder()
+    builder.loft(outer_shell)
+    builder.loft(inner_shell, flip=True)
+    return builder.to_arrays()
+
+
+def best_of(func, repeat):
+    """repeat 回実行して最速の時間（秒）を返す"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(segments_list):
+    print(f"{'SEGMENTS':>9} {'旧実装[ms]':>11} {'新実装[ms]':>11} {'高速化':>8} {'点のみ[ms]':>11} {'頂点数 旧→新':>16}")
+    for segments in segments_list:
+        inputs = shell_inputs(segments)
+        repeat = 5 if segments <= 512 else 2
+
+        legacy = best_of(lambda: legacy_loft(*inputs, segments), repeat)
+        fast = best_of(lambda: vectorized_loft(*inputs), repeat)
+        points_only = best_of(lambda: loft_rect_to_circle(
+            [inputs[0], inputs[1]], [inputs[2], inputs[3]]), repeat)
+
+        # 三角形として同じ形になることを確認
+        v_old, f_old = legacy_loft(*inputs, segments)
+        v_new, f_new = vectorized_loft(*inputs)
+        assert np.allclose(v_old[f_old], v_new[f_new])
+
+        print(f"{segments:>9} {legacy * 1e3:>11.2f} {fast * 1e3:>11.2f} {legacy / fast:>7.1f}x "
+              f"{points_only * 1e3:>11.3f} {len(v_old):>8}→{len(v_new):<7}")
+
+
+if __name__ == "__main__":
+    run([int(s) for s in sys.argv[1:]] or DEFAULT_SEGMENTS)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+mesh_boolean のベンチマーク
+1. 直方体から六角柱・円柱を引き、体積が計算どおりか（角柱の体積は多角形の面積 × 高さ）
+2. 傾けてずらした2つのトーラスを三角形数を変えて和・積・差にかけ、時間と、
+   体積の関係（和 + 積 = A + B、差 = A − 積）が成り立つか、validate で閉じているかを調べる
+
+使い方:
+    python3 bench_mesh_boolean.py [三角形数 ...]
+"""
+
+import sys
+
+import numpy as np
+
+from bench_mesh_validate import best_of, torus
+from mesh_boolean import OPERATIONS, boolean, box, cylinder, prism
+from mesh_validate import validate
+
+DEFAULT_TRIANGLES = [1_000, 10_000, 50_000]
+RELATIVE_TOLERANCE = 1e-6  # 体積の相対誤差の許容
+
+
+def volume(vertices, faces):
+    """閉じたメッシュの体積（符号付き四面体の和）"""
+    t = vertices[faces]
+    return np.einsum('ij,ij->i', t[:, 0], np.cross(t[:, 1], t[:, 2])).sum() / 6
+
+
+def polygon_area(polygon):
+    x, y = np.asarray(polygon).T
+    return 0.5 * (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def cutters():
+    """直方体 40×30×10 から引く角柱 → [(名前, 角柱, 引いた後の体積)]"""
+    angle = np.linspace(0, 2 * np.pi, 6, endpoint=False)
+    hexagon = np.column_stack([12 + 6 * np.cos(angle), 15 + 6 * np.sin(angle)])
+    circle = np.linspace(0, 2 * np.pi, 64, endpoint=False)
+    circle = np.column_stack([28 + 5 * np.cos(circle), 15 + 5 * np.sin(circle)])
+    solid = 40 * 30 * 10
+    return [
+        ('六角柱の穴', prism(hexagon, -1, 11), solid - polygon_area(hexagon) * 10),
+        ('円柱の穴', cylinder((28, 15), 5, -1, 11), solid - polygon_area(circle) * 10),
+        ('円柱の止まり穴', cylinder((28, 15), 5, 4, 11), solid - polygon_area(circle) * 6),
+    ]
+
+
+def run_cutters():
+    block = box((0, 0, 0), (40, 30, 10))
+    print(f"{'直方体から引く':<12} {'時間[ms]':>9} {'体積[mm³]':>11} {'計算値':>11}  結果")
+    for name, cutter, expected in cutters():
+        result = []
+        elapsed = best_of(lambda: result.append(boolean(block, cutter, 'difference')), 3)
+        vertices, faces = result[-1]
+        measured = volume(vertices, faces)
+        ok = validate(vertices, faces).ok and abs(measured - expected) <= RELATIVE_TOLERANCE * expected
+        print(f"{name:<12} {elapsed * 1e3:>9.1f} {measured:>11.3f} {expected:>11.3f}  {'✅' if ok else '❌'}")
+
+
+def run_tori(counts):
+    rotation = np.array([[1.0, 0.0, 0.0], [0.0, np.cos(0.6), -np.sin(0.6)], [0.0, np.sin(0.6), np.cos(0.6)]])
+    print(f"\n{'三角形数':>9} " + ' '.join(f'{name + "[ms]":>16}' for name in OPERATIONS) + '  結果')
+    for count in counts:
+        first = torus(count, major=20, minor=8)
+        vertices, faces = torus(count, major=15, minor=5)
+        second = (vertices @ rotation.T + [6.0, 3.0, 2.0], faces)
+
+        times, volumes, closed = [], {}, True
+        for operation in OPERATIONS:
+            result = []
+            times.append(best_of(lambda: result.append(boolean(first, second, operation)), 1))
+            volumes[operation] = volume(*result[-1])
+            closed &= validate(*result[-1]).ok
+        a, b = volume(*first), volume(*second)
+        ok = (closed and abs(volumes['union'] + volumes['intersection'] - a - b) <= RELATIVE_TOLERANCE * a
+              and abs(volumes['difference'] - (a - volumes['intersection'])) <= RELATIVE_TOLERANCE * a)
+        print(f"{count:>9} " + ' '.join(f'{t * 1e3:>16.0f}' for t in times) + f"  {'✅' if ok else '❌'}")
+
+
+if __name__ == "__main__":
+    run_cutters()
+    run_tori([int(arg) for arg in sys.argv[1:]] or DEFAULT_TRIANGLES)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+mesh_compare のベンチマーク
+太さだけが GAP 違う2つのトーラス（ずれはどこでも GAP）を、点の数を変えて比べ、
+時間と tracemalloc で測ったメモリの最大値、ハウスドルフ距離・RMS が GAP に近いかを調べる
+（点をまとめて作らないので、点を増やしてもメモリは SAMPLE_CHUNK 分で止まる）
+
+使い方:
+    python3 bench_mesh_compare.py [点の数 ...]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from bench_mesh_validate import torus
+from bvh import build_bvh
+from mesh_compare import compare
+
+DEFAULT_SAMPLES = [10_000, 100_000, 1_000_000]
+TRIANGLES = 58_000  # ボディ 15.stl と同じくらい
+GAP = 0.5           # mm
+TOLERANCE = 0.05    # mm（面の粗さでずれてよい幅）
+
+
+def run(sample_counts):
+    vertices, faces = torus(TRIANGLES, minor=30.0)
+    first = vertices[faces]
+    vertices, faces = torus(TRIANGLES, minor=30.0 + GAP)
+    second = vertices[faces]
+    trees = (build_bvh(first), build_bvh(second))
+
+    print(f"{'点の数':>9} {'時間[s]':>8} {'µs/点':>7} {'メモリ[MB]':>10} {'ハウスドルフ[mm]':>16} {'RMS[mm]':>8}  結果")
+    for samples in sample_counts:
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = compare(first, second, samples, trees=trees)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        ok = abs(result.hausdorff - GAP) < TOLERANCE and abs(result.rms - GAP) < TOLERANCE
+        mark = '✅' if ok else '❌'
+        print(f"{samples:>9} {elapsed:>8.1f} {elapsed / (2 * samples) * 1e6:>7.1f} {peak / 2**20:>10.1f} "
+              f"{result.hausdorff:>16.3f} {result.rms:>8.3f}  {mark}")
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SAMPLES)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+mesh_repair のベンチマーク
+閉じたトーラスの面の一部をわざと反転させ、orient_faces で元に戻るまでの時間を測る
+Shapr3D のボディ（ボディ 15.stl）があれば repair_triangles の時間も測る
+
+使い方:
+    python3 bench_mesh_repair.py [三角形数 ...]
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from bench_mesh_validate import best_of, torus
+from mesh_repair import orient_faces, repair_triangles
+from mesh_validate import validate
+
+DEFAULT_TRIANGLES = [10_000, 100_000, 1_000_000]
+FLIP_RATIO = 0.3
+SHAPR3D_BODY = 'ボディ 15.stl'
+
+
+def run(triangle_counts):
+    rng = np.random.default_rng(0)
+    print(f"{'三角形数':>10} {'反転した面':>10} {'修正[ms]':>10}  結果")
+    for count in triangle_counts:
+        vertices, faces = torus(count)
+        broken = faces.copy()
+        flip = rng.random(len(faces)) < FLIP_RATIO
+        broken[flip] = broken[flip][:, [0, 2, 1]]
+        repeat = 3 if count <= 100_000 else 1
+
+        elapsed = best_of(lambda: orient_faces(vertices, broken), repeat)
+        fixed, reversed_count = orient_faces(vertices, broken)
+        mark = '✅' if validate(vertices, fixed).ok and np.array_equal(fixed, faces) else '❌'
+        print(f"{len(faces):>10} {reversed_count:>10} {elapsed * 1e3:>10.1f}  {mark}")
+
+    if os.path.exists(SHAPR3D_BODY):
+        from stl_reader import MappedSTL
+
+        triangles = np.array(MappedSTL(SHAPR3D_BODY).vectors)
+        elapsed = best_of(lambda: repair_triangles(triangles), 3)
+        fixed, _ = repair_triangles(triangles)
+        changed = int(np.any(fixed != triangles, axis=(1, 2)).sum())
+        print(f"{SHAPR3D_BODY}: {len(triangles)}面 {elapsed * 1e3:.1f}ms（反転 {changed}面）")
+
+
+if __name__ == "__main__":
+    run([int(s) for s in sys.argv[1:]] or DEFAULT_TRIANGLES)
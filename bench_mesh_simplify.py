@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+mesh_simplify のベンチマーク
+1. Shapr3D のボディ（約5.8万三角形）を LOD（1%, 10%）に減らす時間、閉じているか（validate）、
+   元のボディとのずれ（mesh_compare のハウスドルフ距離・RMS）
+2. 生成パーツとボディの比較（BVH を作るところから）を、元のボディと 10% のボディで比べる時間
+   （LOD のずれは 1 で見る。パーツとボディは別の形なので、2 では距離を出さない）
+
+使い方:
+    python3 bench_mesh_simplify.py [STL ...]
+"""
+
+import os
+import sys
+import time
+
+from bench_mesh_validate import best_of
+from bvh import build_bvh
+from chute_params import DEFAULT_PARAMS
+from mesh_compare import compare, load_triangles
+from mesh_simplify import lod_label, lod_meshes
+from mesh_validate import validate, weld
+
+DEFAULT_BODIES = ['ボディ 11_上.stl', 'ボディ 15.stl']
+PART = 'coin_chute_upper_snap.stl'  # 2 で比べる生成パーツ
+RATIOS = (0.01, 0.1, 1.0)
+SAMPLES = 20_000                    # ずれを調べる点の数（片側）
+MAX_RMS = 0.01                      # 10% の LOD の RMS の上限（mm）
+
+
+def run_lods(path):
+    triangles = load_triangles(path, DEFAULT_PARAMS)
+    vertices, faces = weld(triangles)
+    result = []
+    elapsed = best_of(lambda: result.append(lod_meshes(vertices, faces, RATIOS)), 1)
+    levels = result[-1]
+    print(f"{path}: 三角形 {len(faces):,} → LOD {elapsed * 1e3:.0f} ms")
+    print(f"  {'LOD':>5} {'三角形':>8} {'ハウスドルフ[mm]':>16} {'RMS[mm]':>9}  結果")
+    for ratio, (lod_vertices, lod_faces) in sorted(levels.items()):
+        if ratio >= 1:
+            continue
+        deviation = compare(lod_vertices[lod_faces], triangles, SAMPLES)
+        ok = validate(lod_vertices, lod_faces).ok and (ratio < 0.1 or deviation.rms <= MAX_RMS)
+        print(f"  {lod_label(ratio):>5} {len(lod_faces):>8,} {deviation.hausdorff:>16.3f} {deviation.rms:>9.4f}  "
+              f"{'✅' if ok else '❌'}")
+    return triangles, levels
+
+
+def run_compare(levels):
+    """生成パーツ ↔ ボディの比較時間（元 / 10%）
+
+    時間だけを比べる（パーツとボディは別の形なので、その間の距離は LOD のよしあしを表さない）
+    """
+    part = load_triangles(PART, DEFAULT_PARAMS)
+    rows = []
+    for ratio in (1.0, 0.1):
+        lod_vertices, lod_faces = levels[ratio]
+        body = lod_vertices[lod_faces]
+        start = time.perf_counter()
+        compare(part, body, SAMPLES, trees=(build_bvh(part), build_bvh(body)))
+        rows.append((ratio, len(body), time.perf_counter() - start))
+    full = rows[0][2]
+    for ratio, count, elapsed in rows:
+        print(f"  {PART} ↔ {lod_label(ratio):>4}（三角形 {count:,}）: {elapsed * 1e3:>6.0f} ms "
+              f"（{full / elapsed:.1f}倍）")
+
+
+def run(paths):
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"{path}: ファイルがありません（飛ばします）")
+            continue
+        _, levels = run_lods(path)
+        run_compare(levels)
+        print()
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:] or DEFAULT_BODIES)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+mesh_validate のベンチマーク
+閉じたトーラス（三角形数を指定）で validate の時間を測る
+三角形の並び（STLと同じ、溶接前）と、頂点+面（MeshBuilder の出力）の両方を測る
+
+使い方:
+    python3 bench_mesh_validate.py [三角形数 ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from mesh_validate import validate
+
+DEFAULT_TRIANGLES = [10_000, 100_000, 1_000_000]
+
+
+def torus(triangles, major=100.0, minor=30.0):
+    """三角形数がおよそ triangles の閉じたトーラス (頂点, 面)"""
+    n = max(int(np.sqrt(triangles / 2)), 3)
+    u = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    uu, vv = np.meshgrid(u, u, indexing='ij')
+    r = major + minor * np.cos(vv)
+    vertices = np.stack([r * np.cos(uu), r * np.sin(uu), minor * np.sin(vv)], axis=-1).reshape(-1, 3)
+
+    i, j = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    a = i * n + j
+    b = ((i + 1) % n) * n + j
+    c = ((i + 1) % n) * n + (j + 1) % n
+    d = i * n + (j + 1) % n
+    faces = np.concatenate([np.stack([a, b, c], -1).reshape(-1, 3),
+                            np.stack([a, c, d], -1).reshape(-1, 3)])
+    return vertices, faces
+
+
+def best_of(func, repeat):
+    """repeat 回実行して最速の時間（秒）を返す"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(triangle_counts):
+    print(f"{'三角形数':>10} {'頂点+面[ms]':>12} {'三角形列[ms]':>13}  結果")
+    for count in triangle_counts:
+        vertices, faces = torus(count)
+        soup = vertices[faces].astype(np.float32)
+        repeat = 3 if count <= 100_000 else 1
+
+        indexed = best_of(lambda: validate(vertices, faces), repeat)
+        loose = best_of(lambda: validate(soup), repeat)
+        report = validate(soup)
+        mark = '✅' if report.ok else '❌'
+        print(f"{len(faces):>10} {indexed * 1e3:>12.1f} {loose * 1e3:>13.1f}  {mark} {report.summary()}")
+
+
+if __name__ == "__main__":
+    run([int(s) for s in sys.argv[1:]] or DEFAULT_TRIANGLES)
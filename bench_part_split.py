@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+part_split のベンチマーク
+造形サイズより大きいトーラスで、断面の寸法を求める時間（区間インデックス / 全三角形を毎回調べる場合）と
+split_part 全体の時間を測る
+
+使い方:
+    python3 bench_part_split.py [三角形数 ...]
+"""
+
+import sys
+
+import numpy as np
+
+from bed_fit import fits_bed
+from bench_mesh_validate import best_of, torus
+from mesh_validate import validate
+from part_split import SectionIndex, split_part
+
+DEFAULT_TRIANGLES = [10_000, 100_000, 1_000_000]
+QUERIES = 64
+
+
+def scan_extents(vertices, faces, axis, start, stop):
+    """比較用: 全三角形の辺と平面の交点を毎回求める"""
+    coords = vertices[:, axis]
+    inside = vertices[(coords >= start) & (coords <= stop)]
+    points = [inside]
+    a = faces.reshape(-1)
+    b = faces[:, [1, 2, 0]].reshape(-1)
+    for offset in (start, stop):
+        sa = coords[a] - offset
+        sb = coords[b] - offset
+        hit = (sa < 0) != (sb < 0)
+        t = (sa[hit] / (sa[hit] - sb[hit]))[:, None]
+        points.append(vertices[a[hit]] + t * (vertices[b[hit]] - vertices[a[hit]]))
+    points = np.concatenate(points)
+    return points.max(axis=0) - points.min(axis=0)
+
+
+def run(counts):
+    print(f"{'三角形数':>9} {'索引作成[ms]':>12} {'索引[µs/回]':>12} {'全探索[µs/回]':>14} "
+          f"{'分割[ms]':>9}  結果")
+    for count in counts:
+        vertices, faces = torus(count, major=250.0, minor=40.0)
+        low, high = vertices[:, 0].min(), vertices[:, 0].max()
+        slabs = [(low + (high - low) * k / QUERIES, low + (high - low) * (k + 1) / QUERIES)
+                 for k in range(QUERIES)]
+
+        build = best_of(lambda: SectionIndex(vertices, faces, 0), 3)
+        index = SectionIndex(vertices, faces, 0)
+        indexed = best_of(lambda: [index.slab_extents(*slab) for slab in slabs], 3) / QUERIES
+        scanned = best_of(lambda: [scan_extents(vertices, faces, 0, *slab) for slab in slabs], 1) / QUERIES
+        elapsed = best_of(lambda: split_part(vertices, faces), 1)
+
+        pieces, planes, skipped = split_part(vertices, faces)
+        ok = skipped == 0 and all(validate(v, f).ok and fits_bed(v.max(axis=0) - v.min(axis=0), rotate=True)
+                 for v, f in pieces)
+        mark = '✅' if ok else '❌'
+        print(f"{len(faces):>9} {build * 1e3:>12.1f} {indexed * 1e6:>12.0f} {scanned * 1e6:>14.0f} "
+              f"{elapsed * 1e3:>9.0f}  {mark} {len(pieces)}分割")
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_TRIANGLES)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+save_stl ベンチマーク
+旧実装（二重ループで vectors を1点ずつ代入）と
+stl_export.build_mesh（vertices[faces] の一括取り出し）を比較する
+
+使い方:
+    python3 bench_save_stl.py [分割数 ...]
+"""
+
+import sys
+import time
+from dataclasses import replace
+
+import numpy as np
+from stl import mesh
+
+import generate_stl
+from chute_params import DEFAULT_PARAMS
+from stl_export import build_mesh
+
+DEFAULT_SEGMENTS = [32, 1024, 65536]
+
+
+def legacy_build_mesh(vertices, faces):
+    """旧 save_stl と同じ組み立て方"""
+    coin_chute = mesh.Mesh(np.zeros(faces.shape[0], dtype=mesh.Mesh.dtype))
+    for i, face in enumerate(faces):
+        for j in range(3):
+            coin_chute.vectors[i][j] = vertices[face[j]]
+    coin_chute.update_normals()
+    return coin_chute
+
+
+def best_of(func, repeat):
+    """repeat 回実行して最速の時間（秒）を返す"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(segments_list):
+    print(f"{'SEGMENTS':>9} {'三角形数':>9} {'旧実装[ms]':>11} {'新実装[ms]':>11} {'高速化':>8}")
+    for segments in segments_list:
+        params = replace(DEFAULT_PARAMS, segments=segments)
+        vertices, faces = generate_stl.create_lower_part(params)
+        repeat = 3 if segments <= 1024 else 1
+
+        legacy = best_of(lambda: legacy_build_mesh(vertices, faces), repeat)
+        fast = best_of(lambda: build_mesh(vertices, faces), repeat)
+
+        # 両者の出力が一致することを確認
+        a = legacy_build_mesh(vertices, faces).vectors
+        b = build_mesh(vertices, faces).vectors
+        assert np.array_equal(a, b)
+
+        print(f"{segments:>9} {len(faces):>9} {legacy * 1e3:>11.2f} {fast * 1e3:>11.2f} {legacy / fast:>7.0f}x")
+
+
+if __name__ == "__main__":
+    run([int(s) for s in sys.argv[1:]] or DEFAULT_SEGMENTS)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+slicer のベンチマーク
+Shapr3D のボディ（ボディ *.stl）を600層に切る時間を測る（目標: 1秒前後）
+層ごとに全三角形を調べて線分を作る素朴な方法（輪郭にはつながない）とも比べる
+
+使い方:
+    python3 bench_slicer.py [STLファイル ...]
+"""
+
+import glob
+import sys
+
+import numpy as np
+
+from bench_mesh_validate import best_of
+from mesh_validate import weld
+from slicer import estimate_print, layer_heights, slice_mesh
+from stl_reader import MappedSTL
+
+LAYERS = 600
+TARGET_SECONDS = 1.0
+
+
+def scan_layers(vertices, faces, heights):
+    """比較用: 層ごとに全三角形を調べて、交わる三角形の線分（端点2つ）を作る"""
+    face_z = vertices[:, 2][faces]
+    triangles = vertices[faces]
+    segments = []
+    for z in heights:
+        above = face_z >= z
+        ups = above.sum(axis=1)
+        crossing = (ups == 1) | (ups == 2)
+        tri, side = triangles[crossing], above[crossing]
+        points = []
+        for k in range(3):
+            a, b = tri[:, k], tri[:, (k + 1) % 3]
+            hit = side[:, k] != side[:, (k + 1) % 3]
+            t = ((z - a[hit, 2]) / (b[hit, 2] - a[hit, 2]))[:, None]
+            points.append(a[hit, :2] + t * (b[hit, :2] - a[hit, :2]))
+        segments.append(np.concatenate(points))
+    return segments
+
+
+def run(paths):
+    print(f"{'ファイル':<24} {'三角形数':>9} {'層数':>5} {'スライス[ms]':>12} {'見積もり[ms]':>12} "
+          f"{'層ごと全探索[ms]':>16}  結果")
+    for path in paths:
+        triangles = MappedSTL(path).vectors
+        vertices, faces = weld(triangles)
+        height = float(np.ptp(vertices[:, 2]))
+        layer_height = height / LAYERS
+        layers = slice_mesh(vertices, faces, layer_height)
+
+        sliced = best_of(lambda: slice_mesh(vertices, faces, layer_height), 3)
+        estimated = best_of(lambda: estimate_print(layers), 3)
+        heights = layer_heights(vertices, layer_height)
+        scanned = best_of(lambda: scan_layers(vertices, faces, heights), 1)
+        mark = '✅' if sliced < TARGET_SECONDS else '❌'
+        print(f"{path:<24} {len(triangles):>9} {len(layers):>5} {sliced * 1e3:>12.1f} "
+              f"{estimated * 1e3:>12.1f} {scanned * 1e3:>16.1f}  {mark} "
+              f"輪郭 {sum(len(layer.loops) for layer in layers)}")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:] or sorted(glob.glob('ボディ *.stl')))
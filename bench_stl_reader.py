@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+STL読み込みベンチマーク
+stl_reader.MappedSTL（np.memmap）と mesh.Mesh.from_file を比較する
+計測はファイルごと・方式ごとに別プロセスで行い、
+開く時間・バウンディングボックスまでの時間・RSSの増分を出す
+
+使い方:
+    python3 bench_stl_reader.py [STLファイル ...]
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+DEFAULT_FILES = ["ボディ 15.stl", "ボディ 11_上.stl", "ボディ 11_下.stl"]
+REPEAT = 5
+
+
+def rss_bytes():
+    """現在のRSS（Linux の /proc から）"""
+    with open('/proc/self/statm') as fh:
+        pages = int(fh.read().split()[1])
+    import os
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def measure(method, filename):
+    """1方式分の計測（子プロセス内で実行）"""
+    import numpy as np
+    if method == 'memmap':
+        from stl_reader import MappedSTL
+
+        def open_file():
+            return MappedSTL(filename)
+
+        def bounds(m):
+            return m.bounds()
+    else:
+        from stl import mesh
+
+        def open_file():
+            return mesh.Mesh.from_file(filename)
+
+        def bounds(m):
+            return m.min_, m.max_
+
+    before = rss_bytes()
+    start = time.perf_counter()
+    m = open_file()
+    open_time = time.perf_counter() - start
+    open_rss = rss_bytes() - before
+
+    start = time.perf_counter()
+    lower, upper = bounds(m)
+    bounds_time = time.perf_counter() - start
+    bounds_rss = rss_bytes() - before
+
+    # 開く時間は繰り返して最速値を取る
+    for _ in range(REPEAT - 1):
+        start = time.perf_counter()
+        open_file()
+        open_time = min(open_time, time.perf_counter() - start)
+
+    return {
+        'open_ms': open_time * 1e3,
+        'bounds_ms': bounds_time * 1e3,
+        'open_rss_kb': open_rss / 1024,
+        'bounds_rss_kb': bounds_rss / 1024,
+        'size': np.asarray(upper - lower, dtype=float).round(3).tolist(),
+    }
+
+
+def run(files):
+    print(f"{'ファイル':<18} {'方式':<10} {'open[ms]':>9} {'bbox[ms]':>9} {'RSS open[KB]':>13} {'RSS bbox[KB]':>13}")
+    for filename in files:
+        for method in ('memmap', 'numpy-stl'):
+            out = subprocess.run([sys.executable, __file__, '--child', method, filename],
+                                 check=True, capture_output=True, text=True).stdout
+            r = json.loads(out)
+            print(f"{filename:<18} {method:<10} {r['open_ms']:>9.3f} {r['bounds_ms']:>9.3f} "
+                  f"{r['open_rss_kb']:>13.0f} {r['bounds_rss_kb']:>13.0f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--child']:
+        print(json.dumps(measure(sys.argv[2], sys.argv[3])))
+    else:
+        run(sys.argv[1:] or DEFAULT_FILES)
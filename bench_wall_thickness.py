@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+wall_thickness のベンチマーク
+肉厚 WALL の中空トーラス（外側と、向きを逆にした内側のトーラス）で、BVH の作成と
+全面の光線をまとめて飛ばす時間を測り、測った肉厚が WALL に近いか確かめる
+（内側のシェルは向きが正しいので、analyze は orient=False で呼ぶ）
+
+使い方:
+    python3 bench_wall_thickness.py [三角形数 ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from bench_mesh_validate import torus
+from bvh import build_bvh
+from wall_thickness import analyze
+
+DEFAULT_TRIANGLES = [100_000, 1_000_000]
+MINOR = 30.0
+WALL = 2.0
+TOLERANCE = 0.05  # mm（面の粗さで肉厚が WALL からずれてよい幅）
+
+
+def hollow_torus(count):
+    """肉厚 WALL の中空トーラスの三角形 (N, 3, 3)（外側・内側それぞれ count / 2 面）"""
+    outer_vertices, outer_faces = torus(count // 2, minor=MINOR)
+    inner_vertices, inner_faces = torus(count // 2, minor=MINOR - WALL)
+    return np.concatenate([outer_vertices[outer_faces], inner_vertices[inner_faces[:, ::-1]]])
+
+
+def run(counts):
+    print(f"{'三角形数':>9} {'BVH[s]':>8} {'肉厚[s]':>8} {'光線[µs/本]':>12} {'最薄[mm]':>9} {'最厚[mm]':>9}  結果")
+    for count in counts:
+        triangles = hollow_torus(count)
+        start = time.perf_counter()
+        tree = build_bvh(triangles)
+        built = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, report = analyze(triangles, tree=tree, orient=False)
+        measured = time.perf_counter() - start
+
+        thickness = report.thickness
+        ok = report.measured.all() and np.abs(thickness - WALL).max() < TOLERANCE and not report.regions
+        mark = '✅' if ok else '❌'
+        print(f"{len(triangles):>9} {built:>8.1f} {measured:>8.1f} {measured / len(triangles) * 1e6:>12.1f} "
+              f"{thickness.min():>9.3f} {thickness.max():>9.3f}  {mark}")
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_TRIANGLES)
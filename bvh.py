@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+三角形の境界ボリューム階層（BVH）
+
+mesh.Mesh.vectors と同じ (N, 3, 3) の三角形から、配列だけでできた BVH を作る
+- 節は lo, hi（箱）, first, count の配列。count > 0 なら葉で order[first:first+count] の三角形、
+  count == 0 なら子が first と first + 1
+- 分割は SAH（表面積ヒューリスティック）。重心で軸ごとに並べた三角形の列を、各軸 SPLIT_CANDIDATES 個の
+  位置で区切ってコストを比べる。深さごとに全部の節をまとめて分ける（節ごとの Python ループはない）
+- 問い合わせはどれも配列でまとめて渡す（光線・最近点・箱との重なり）。問い合わせと節の組を幅優先でたどる
+- .npz に保存でき、cached_bvh は三角形の内容のハッシュで design_cache のディレクトリに保存・再利用する
+
+使い方:
+    python3 bvh.py [STLファイル ...]          # 作成（キャッシュがあれば読み込み）して統計を表示
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+
+LEAF_SIZE = 4           # これ以下なら必ず葉にする
+MAX_LEAF_SIZE = 16      # SAH で分けない方が得でも、これより多ければ分ける
+SPLIT_CANDIDATES = 16   # 各軸で試す分割位置の数
+TRAVERSAL_COST = 1.0    # 節を1つたどるコスト（三角形1つの判定を1とする）
+MAX_DEPTH = 64
+QUERY_CHUNK = 16384     # 1回にまとめてたどる問い合わせの数
+
+
+def _expand(starts, stops):
+    """各要素の [start, stop) をつなげた (要素番号, 位置)"""
+    counts = np.maximum(stops - starts, 0)
+    owner = np.repeat(np.arange(len(starts)), counts)
+    position = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(int(counts.sum()))
+    return owner, position
+
+
+def _dot(x, y):
+    return np.einsum('ij,ij->i', x, y)
+
+
+def surface_area(lo, hi):
+    """箱の表面積（空の箱は0）"""
+    size = np.maximum(hi - lo, 0)
+    return 2 * (size[..., 0] * size[..., 1] + size[..., 1] * size[..., 2] + size[..., 2] * size[..., 0])
+
+
+def closest_points(p, a, ab, ac):
+    """点 p (K, 3) に最も近い三角形 (a, a+ab, a+ac) 上の点（領域分けによる一括計算）"""
+    ap = p - a
+    d1, d2 = _dot(ab, ap), _dot(ac, ap)
+    abab, abac, acac = _dot(ab, ab), _dot(ab, ac), _dot(ac, ac)
+    d3, d4 = d1 - abab, d2 - abac  # b から見た値
+    d5, d6 = d1 - abac, d2 - acac  # c から見た値
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        total = va + vb + vc
+        on_bc = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        on_ac = d2 / (d2 - d6)
+        on_ab = d1 / (d1 - d3)
+        # 面の内側 → 辺 → 頂点 の順に、優先度の高い領域で a + s·ab + t·ac の (s, t) を上書きする
+        s, t = vb / total, vc / total
+        edge = (va <= 0) & (d4 >= d3) & (d5 >= d6)
+        s, t = np.where(edge, 1 - on_bc, s), np.where(edge, on_bc, t)
+        edge = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        s, t = np.where(edge, 0, s), np.where(edge, on_ac, t)
+        edge = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        s, t = np.where(edge, on_ab, s), np.where(edge, 0, t)
+        corner = (d6 >= 0) & (d5 <= d6)
+        s, t = np.where(corner, 0, s), np.where(corner, 1, t)
+        corner = (d3 >= 0) & (d4 <= d3)
+        s, t = np.where(corner, 1, s), np.where(corner, 0, t)
+        corner = (d1 <= 0) & (d2 <= 0)
+        s, t = np.where(corner, 0, s), np.where(corner, 0, t)
+    return a + ab * s[:, None] + ac * t[:, None]
+
+
+def ray_triangle(origins, directions, a, ab, ac):
+    """光線 origin + t·direction が三角形 (a, a+ab, a+ac) に当たる t（当たらなければ inf、裏表どちらも）"""
+    p = np.cross(directions, ac)
+    det = _dot(ab, p)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse = 1 / det
+        s = origins - a
+        u = _dot(s, p) * inverse
+        q = np.cross(s, ab)
+        v = _dot(directions, q) * inverse
+        t = _dot(ac, q) * inverse
+        hit = (det != 0) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t > 0)
+    return np.where(hit, t, np.inf)
+
+
+def _spread_bits(x):
+    """10ビットの整数の各ビットの間に0を2つずつ入れる"""
+    x = x & 0x3ff
+    x = (x | (x << 16)) & 0x30000ff
+    x = (x | (x << 8)) & 0x300f00f
+    x = (x | (x << 4)) & 0x30c30c3
+    x = (x | (x << 2)) & 0x9249249
+    return x
+
+
+def morton_codes(points):
+    """点 (N, 3) のモートン符号（各軸10ビット）"""
+    low = points.min(axis=0)
+    size = np.maximum(points.max(axis=0) - low, 1e-12)
+    cells = ((points - low) / size * 1023).astype(np.int64)
+    return (_spread_bits(cells[:, 0]) << 2) | (_spread_bits(cells[:, 1]) << 1) | _spread_bits(cells[:, 2])
+
+
+def _chunks(total):
+    """問い合わせを QUERY_CHUNK 個ずつに分ける slice（幅優先でたどる組の数を抑えるため）"""
+    return [slice(start, start + QUERY_CHUNK) for start in range(0, max(total, 1), QUERY_CHUNK)]
+
+
+def _first_per_group(group, value):
+    """group ごとに value が最小の要素の番号"""
+    order = np.lexsort((value, group))
+    head = np.ones(len(order), dtype=bool)
+    head[1:] = group[order[1:]] != group[order[:-1]]
+    return order[head]
+
+
+class BVH:
+    """配列でできた BVH（build_bvh / load_bvh / cached_bvh で作る）"""
+
+    def __init__(self, triangles, lo, hi, first, count, order):
+        triangles = np.asarray(triangles, dtype=np.float64).reshape(-1, 3, 3)
+        self.lo, self.hi = lo, hi
+        self.first, self.count = first, count
+        self.order = order
+        # 葉から直接引けるように、三角形を BVH の並びで持つ
+        placed = triangles[order]
+        self.a = placed[:, 0]
+        self.ab = placed[:, 1] - placed[:, 0]
+        self.ac = placed[:, 2] - placed[:, 0]
+        self.triangle_lo = placed.min(axis=1)
+        self.triangle_hi = placed.max(axis=1)
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def nodes(self):
+        return len(self.count)
+
+    @property
+    def leaves(self):
+        return int((self.count > 0).sum())
+
+    def depth(self):
+        """根から最も深い葉までの段数"""
+        nodes = np.zeros(1, dtype=np.int64)
+        levels = 0
+        while len(nodes):
+            levels += 1
+            inner = nodes[self.count[nodes] == 0]
+            nodes = (self.first[inner][:, None] + np.arange(2)).reshape(-1)
+        return levels
+
+    def sah_cost(self):
+        """根の表面積を1としたときの SAH コスト（小さいほど問い合わせが速い）"""
+        area = surface_area(self.lo, self.hi)
+        leaf = self.count > 0
+        total = TRAVERSAL_COST * area[~leaf].sum() + (area[leaf] * self.count[leaf]).sum()
+        return float(total / area[0]) if area[0] > 0 else 0.0
+
+    def _leaf_triangles(self, queries, nodes):
+        """(問い合わせ, 葉) の組 → (問い合わせ, BVH の並びでの三角形の位置)"""
+        owner, position = _expand(self.first[nodes], self.first[nodes] + self.count[nodes])
+        return queries[owner], position
+
+    def _children(self, queries, nodes):
+        return np.repeat(queries, 2), (self.first[nodes][:, None] + np.arange(2)).reshape(-1)
+
+    def intersect(self, origins, directions, max_distance=np.inf):
+        """光線ごとに最初に当たる三角形 → (距離, 三角形の番号)。当たらなければ (inf, -1)
+
+        origins, directions: (K, 3)。direction の長さを1にすれば距離は mm
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        parts = [self._intersect(origins[chunk], directions[chunk], max_distance) for chunk in _chunks(len(origins))]
+        return tuple(np.concatenate(values) for values in zip(*parts))
+
+    def _intersect(self, origins, directions, max_distance):
+        best = np.full(len(origins), float(max_distance))
+        hit = np.full(len(origins), -1, dtype=np.int64)
+        with np.errstate(divide='ignore'):
+            inverse = 1 / directions
+
+        rays = np.arange(len(origins))
+        nodes = np.zeros(len(origins), dtype=np.int64)
+        while len(rays):
+            origin = np.take(origins, rays, axis=0)
+            step = np.take(inverse, rays, axis=0)
+            with np.errstate(invalid='ignore'):
+                t1 = (np.take(self.lo, nodes, axis=0) - origin) * step
+                t2 = (np.take(self.hi, nodes, axis=0) - origin) * step
+            # fmin/fmax: 光線が箱の面の上を平行に進むときの nan を無視する
+            # （軸方向の reduce より、列ごとに2回比べる方が速い）
+            small = np.fmin(t1, t2)
+            large = np.fmax(t1, t2)
+            near = np.fmax(np.fmax(small[:, 0], small[:, 1]), small[:, 2])
+            far = np.fmin(np.fmin(large[:, 0], large[:, 1]), large[:, 2])
+            keep = (far >= np.maximum(near, 0)) & (near <= best[rays])
+            rays, nodes = rays[keep], nodes[keep]
+
+            leaf = self.count[nodes] > 0
+            if leaf.any():
+                r, position = self._leaf_triangles(rays[leaf], nodes[leaf])
+                t = ray_triangle(origins[r], directions[r], self.a[position], self.ab[position], self.ac[position])
+                closer = t < best[r]
+                if closer.any():
+                    r, t, position = r[closer], t[closer], position[closer]
+                    nearest = _first_per_group(r, t)
+                    best[r[nearest]] = t[nearest]
+                    hit[r[nearest]] = self.order[position[nearest]]
+            rays, nodes = self._children(rays[~leaf], nodes[~leaf])
+
+        best[hit < 0] = np.inf
+        return best, hit
+
+    def closest(self, points, max_distance=np.inf):
+        """点ごとに最も近い三角形上の点 → (最近点 (K, 3), 距離, 三角形の番号)
+
+        max_distance より遠ければ (nan, inf, -1)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        parts = [self._closest(points[chunk], max_distance) for chunk in _chunks(len(points))]
+        return tuple(np.concatenate(values) for values in zip(*parts))
+
+    def _closest(self, points, max_distance):
+        k = len(points)
+        best = np.full(k, float(max_distance) ** 2)
+        nearest = np.full((k, 3), np.nan)
+        hit = np.full(k, -1, dtype=np.int64)
+
+        def box_distance(queries, nodes):
+            point = np.take(points, queries, axis=0)
+            gap = np.maximum(np.take(self.lo, nodes, axis=0) - point, 0)
+            gap += np.maximum(point - np.take(self.hi, nodes, axis=0), 0)
+            return _dot(gap, gap)
+
+        def visit(queries, nodes):
+            q, position = self._leaf_triangles(queries, nodes)
+            point = np.take(points, q, axis=0)
+            candidate = closest_points(point, np.take(self.a, position, axis=0), np.take(self.ab, position, axis=0),
+                                       np.take(self.ac, position, axis=0))
+            offset = candidate - point
+            distance = _dot(offset, offset)
+            closer = distance < best[q]
+            if closer.any():
+                q, distance, position, candidate = q[closer], distance[closer], position[closer], candidate[closer]
+                first = _first_per_group(q, distance)
+                best[q[first]] = distance[first]
+                nearest[q[first]] = candidate[first]
+                hit[q[first]] = self.order[position[first]]
+
+        # まず近い方の子だけをたどって葉を1つ調べ、距離の上限を作る
+        node = np.zeros(k, dtype=np.int64)
+        active = np.arange(k)
+        while len(active):
+            inner = self.count[node[active]] == 0
+            active = active[inner]
+            left = self.first[node[active]]
+            closer_right = box_distance(active, left + 1) < box_distance(active, left)
+            node[active] = left + closer_right
+        visit(np.arange(k), node)
+
+        # 上限より近いかもしれない節を全部たどる
+        queries = np.arange(k)
+        nodes = np.zeros(k, dtype=np.int64)
+        while len(queries):
+            keep = box_distance(queries, nodes) < best[queries]
+            queries, nodes = queries[keep], nodes[keep]
+            leaf = self.count[nodes] > 0
+            if leaf.any():
+                visit(queries[leaf], nodes[leaf])
+            queries, nodes = self._children(queries[~leaf], nodes[~leaf])
+
+        return nearest, np.where(hit >= 0, np.sqrt(best), np.inf), hit
+
+    def overlap(self, lo, hi):
+        """箱 (lo, hi) (K, 3) ごとに、外接箱が重なる三角形 → (箱の番号, 三角形の番号)（箱の番号順）"""
+        lo = np.asarray(lo, dtype=np.float64).reshape(-1, 3)
+        hi = np.asarray(hi, dtype=np.float64).reshape(-1, 3)
+        parts = [self._overlap(lo[chunk], hi[chunk], chunk.start) for chunk in _chunks(len(lo))]
+        return tuple(np.concatenate(values) for values in zip(*parts))
+
+    def _overlap(self, lo, hi, base):
+        found_query, found_triangle = [], []
+        queries = np.arange(len(lo))
+        nodes = np.zeros(len(lo), dtype=np.int64)
+        while len(queries):
+            keep = np.all((lo[queries] <= self.hi[nodes]) & (hi[queries] >= self.lo[nodes]), axis=1)
+            queries, nodes = queries[keep], nodes[keep]
+            leaf = self.count[nodes] > 0
+            if leaf.any():
+                q, position = self._leaf_triangles(queries[leaf], nodes[leaf])
+                touching = np.all((lo[q] <= self.triangle_hi[position]) & (hi[q] >= self.triangle_lo[position]),
+                                  axis=1)
+                found_query.append(q[touching] + base)
+                found_triangle.append(self.order[position[touching]])
+            queries, nodes = self._children(queries[~leaf], nodes[~leaf])
+
+        if not found_query:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        query = np.concatenate(found_query)
+        triangle = np.concatenate(found_triangle)
+        order = np.lexsort((triangle, query))
+        return query[order], triangle[order]
+
+    def save(self, path):
+        """節の配列と三角形の並びを .npz に保存（三角形そのものは保存しない）"""
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, lo=self.lo, hi=self.hi, first=self.first, count=self.count, order=self.order)
+        os.replace(tmp, path)
+
+
+def _best_split(chunk, n_left, counts):
+    """かたまりの箱 (節, W, 6)（lo, -hi。空は inf）と、かたまり j の後ろで分けたときの左の三角形数 (節, W - 1)
+    → 節ごとの (最小の SAH コスト, そのときの左の三角形数)
+    """
+    left = np.minimum.accumulate(chunk, axis=1)[:, :-1]
+    right = np.minimum.accumulate(chunk[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    n_right = counts[:, None] - n_left
+    cost = (surface_area(left[..., :3], -left[..., 3:]) * n_left
+            + surface_area(right[..., :3], -right[..., 3:]) * n_right)
+    # 同じコストなら左右の数がそろう方を選ぶ
+    cost *= 1 + 1e-9 * np.abs(n_left - n_right)
+    cost[(n_left <= 0) | (n_right <= 0)] = np.inf
+    split = cost.argmin(axis=1)
+    rows = np.arange(len(cost))
+    return cost[rows, split], n_left[rows, split]
+
+
+def build_bvh(triangles):
+    """(N, 3, 3) の三角形から SAH で BVH を作る"""
+    triangles = np.asarray(triangles, dtype=np.float64).reshape(-1, 3, 3)
+    n = len(triangles)
+    if n == 0:
+        raise ValueError("三角形がありません")
+    triangle_lo = triangles.min(axis=1)
+    triangle_hi = triangles.max(axis=1)
+    centroid = (triangle_lo + triangle_hi) / 2
+    # 三角形をモートン順に付け直しておく（節の中の三角形がメモリ上でも近くなり、まとめて引くのが速い）
+    morton = np.argsort(morton_codes(centroid), kind='stable')
+    centroid = centroid[morton]
+    # 箱は (lo, -hi) の6成分で持つ（min だけで lo と hi をまとめて求められる）
+    box = np.concatenate([triangle_lo, -triangle_hi], axis=1)[morton]
+
+    # 軸ごとに重心で並べた三角形番号。どの並びでも、節の範囲 [start, start + count) には同じ三角形が入る
+    orders = [np.argsort(centroid[:, axis], kind='stable') for axis in range(3)]
+    capacity = 2 * n - 1
+    lo = np.empty((capacity, 3))
+    hi = np.empty((capacity, 3))
+    first = np.zeros(capacity, dtype=np.int64)
+    count = np.zeros(capacity, dtype=np.int64)
+
+    ids = np.zeros(1, dtype=np.int64)
+    starts = np.zeros(1, dtype=np.int64)
+    counts = np.array([n])
+    used = 1
+    steps = np.arange(SPLIT_CANDIDATES + 1)
+    for depth in range(MAX_DEPTH):
+        m = len(ids)
+        owner, position = _expand(starts, starts + counts)
+        offsets = np.cumsum(counts) - counts
+        rank = np.arange(len(position)) - offsets[owner]
+        placed = [np.take(orders[axis], position) for axis in range(3)]
+        placed_box = np.take(box, placed[0], axis=0)
+        bounds = np.minimum.reduceat(placed_box, offsets)
+        lo[ids], hi[ids] = bounds[:, :3], -bounds[:, 3:]
+
+        # LEAF_SIZE より多い節だけ分割位置を比べる。三角形が SPLIT_CANDIDATES 個より多い節は並びの中の位置で
+        # SPLIT_CANDIDATES 個のかたまりに区切り、それ以下の節は三角形1つずつをかたまりにする
+        best_cost = np.full(m, np.inf)
+        best_axis = np.zeros(m, dtype=np.int64)
+        best_left = counts.copy()
+        large = np.flatnonzero(counts > SPLIT_CANDIDATES)
+        small = np.flatnonzero((counts > LEAF_SIZE) & (counts <= SPLIT_CANDIDATES))
+        if len(large):
+            cuts = (counts[large, None] * steps) // SPLIT_CANDIDATES  # (節, B + 1)
+            in_large = np.zeros(m, dtype=bool)
+            in_large[large] = True
+            in_large = in_large[owner]
+            # 多い節の三角形だけを詰めた列で、節の終わりも区切りに入れて reduceat し、その分は捨てる
+            # （終わりの区切りが列の外に出ないように末尾に番兵を1つ足す）
+            begin = ((np.cumsum(counts[large]) - counts[large])[:, None] + cuts).reshape(-1)
+        if len(small):
+            width = int(counts[small].max())
+            row = np.full(m, -1)
+            row[small] = np.arange(len(small))
+            in_small = row[owner] >= 0
+            cell = (row[owner[in_small]], rank[in_small])
+            small_left = np.broadcast_to(np.arange(1, width), (len(small), width - 1))
+
+        for axis in range(3):
+            groups = []
+            if len(large):
+                values = placed_box[in_large] if axis == 0 else np.take(box, placed[axis][in_large], axis=0)
+                chunk = np.minimum.reduceat(np.append(values, values[:1], axis=0), begin)
+                groups.append((large, chunk.reshape(len(large), -1, 6)[:, :-1], cuts[:, 1:-1]))
+            if len(small):
+                chunk = np.full((len(small), width, 6), np.inf)
+                chunk[cell] = placed_box[in_small] if axis == 0 else np.take(box, placed[axis][in_small], axis=0)
+                groups.append((small, chunk, small_left))
+            for nodes, chunk, n_left in groups:
+                cost, left = _best_split(chunk, n_left, counts[nodes])
+                better = cost < best_cost[nodes]
+                best_cost[nodes[better]] = cost[better]
+                best_axis[nodes[better]] = axis
+                best_left[nodes[better]] = left[better]
+
+        node_area = surface_area(lo[ids], hi[ids])
+        leaf = ((counts <= LEAF_SIZE) | np.isinf(best_cost) | (depth == MAX_DEPTH - 1)
+                | ((TRAVERSAL_COST * node_area + best_cost >= node_area * counts) & (counts <= MAX_LEAF_SIZE)))
+        first[ids[leaf]] = starts[leaf]
+        count[ids[leaf]] = counts[leaf]
+        best_left[leaf] = counts[leaf]
+        if leaf.all():
+            break
+
+        # 選んだ軸の並びで前 best_left 個を左の子にし、3つの並びをそれぞれ節の中で安定に分ける
+        right = np.zeros(n, dtype=bool)
+        chosen = np.choose(best_axis[owner], placed)
+        right[chosen] = rank >= best_left[owner]
+        for axis in range(3):
+            sub = placed[axis]
+            side = right[sub]
+            before = np.cumsum(side) - side
+            right_rank = before - before[offsets][owner]
+            local = np.where(side, best_left[owner] + right_rank, rank - right_rank)
+            moved = np.empty_like(sub)
+            moved[offsets[owner] + local] = sub
+            orders[axis][position] = moved
+
+        split = ~leaf
+        children = used + 2 * np.arange(int(split.sum()))
+        first[ids[split]] = children
+        count[ids[split]] = 0
+        used += 2 * len(children)
+        ids = (children[:, None] + np.arange(2)).reshape(-1)
+        starts = np.stack([starts[split], starts[split] + best_left[split]], axis=1).reshape(-1)
+        counts = np.stack([best_left[split], counts[split] - best_left[split]], axis=1).reshape(-1)
+
+    return BVH(triangles, lo[:used], hi[:used], first[:used], count[:used], morton[orders[0]])
+
+
+def load_bvh(path, triangles):
+    """save した BVH を読み込む（triangles は作ったときと同じ三角形）"""
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in ('lo', 'hi', 'first', 'count', 'order')}
+    if len(arrays['order']) != len(triangles):
+        raise ValueError(f"三角形の数が違います: {len(triangles)}（BVH は {len(arrays['order'])}）")
+    return BVH(triangles, **arrays)
+
+
+def bvh_key(triangles):
+    """三角形の内容と BVH のソースから作るキャッシュキー"""
+    from design_cache import source_version
+
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(triangles, dtype=np.float64).tobytes())
+    digest.update(source_version(sys.modules[__name__]).encode('ascii'))
+    return digest.hexdigest()
+
+
+def cached_bvh(triangles, cache=None):
+    """キャッシュ（design_cache.DesignCache のディレクトリ）にあれば読み込み、なければ作って保存する
+
+    戻り値: (BVH, キャッシュから読んだか)
+    """
+    from design_cache import DesignCache
+
+    cache = cache or DesignCache()
+    path = os.path.join(cache.directory, bvh_key(triangles) + '.bvh.npz')
+    if os.path.exists(path):
+        os.utime(path, None)
+        return load_bvh(path, triangles), True
+    tree = build_bvh(triangles)
+    tree.save(path)
+    cache.evict()
+    return tree, False
+
+
+def main(argv=None):
+    import argparse
+    import glob
+
+    from stl_reader import MappedSTL
+
+    parser = argparse.ArgumentParser(description='三角形の BVH を作って統計を表示')
+    parser.add_argument('paths', nargs='*', help='STLファイル（省略時は ボディ *.stl）')
+    parser.add_argument('--no-cache', action='store_true', help='キャッシュを使わずに作り直す')
+    args = parser.parse_args(argv)
+
+    print(f"{'ファイル':<24} {'三角形数':>9} {'節':>8} {'葉':>8} {'深さ':>5} {'SAH':>7} {'時間[ms]':>9}")
+    for path in args.paths or sorted(glob.glob('ボディ *.stl')):
+        triangles = MappedSTL(path).vectors
+        start = time.perf_counter()
+        if args.no_cache:
+            tree, cached = build_bvh(triangles), False
+        else:
+            tree, cached = cached_bvh(triangles)
+        elapsed = time.perf_counter() - start
+        note = '（キャッシュ）' if cached else ''
+        print(f"{path:<24} {len(tree):>9} {tree.nodes:>8} {tree.leaves:>8} {tree.depth():>5} "
+              f"{tree.sah_cost():>7.1f} {elapsed * 1e3:>9.1f} {note}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+コインシュートの設計パラメータ
+4つの生成スクリプトで共通して使う ChuteParams
+
+- 変更不可（frozen）・__slots__ 付き。1プロセスで複数の設計を同時に扱える
+- 傾斜による高低差などの派生値は生成時に1回だけ計算する
+- 一部だけ変えたいときは dataclasses.replace(params, slope_angle=25) など
+- coin_chute.scad の先頭のパラメータ（top_width = 240; など）は from_scad で読み込める
+- ParamTrace で包んで生成関数に渡すと、どのフィールドを読んだかがわかる（param_deps の差分再生成）
+"""
+
+import math
+import re
+import sys
+from dataclasses import dataclass, field, replace
+
+# coin_chute.scad の変数名 → ChuteParams のフィールド名
+SCAD_NAMES = {
+    'top_width': 'top_width',
+    'top_depth': 'top_depth',
+    'bottom_diameter': 'bottom_diameter',
+    'wall_thickness': 'wall_thickness',
+    'height': 'height_per_part',
+    'slope_angle': 'slope_angle',
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ChuteParams:
+    """コインシュートの寸法 (mm)・角度（度）"""
+
+    # 共通
+    top_width: float = 240
+    top_depth: float = 315
+    wall_thickness: float = 2
+    height_per_part: float = 60  # 各パーツの基本高さ
+    slope_angle: float = 20  # 傾斜角度（度）
+
+    # 円形の出口（generate_stl / generate_stl_snap_fit）
+    bottom_diameter: float = 100
+    segments: int = 32  # 円周の分割数（4の倍数）
+    hole_position: float = 40  # 前端から穴の中心までの距離
+    loft_rings: int = 1  # 長方形→円の遷移面の段数
+    tolerance: float = 0  # 弦の誤差の上限（mm）。0 より大きければ segments / loft_rings の代わりに曲がり具合で分割
+
+    # 段差式嵌合（generate_stl_snap_fit）
+    clearance: float = 0.3  # クリアランス（PETG用）
+    step_height: float = 5  # 段差の高さ
+    step_thickness: float = 3  # 段差の厚み
+
+    # 開口部（generate_stl_open_slot）
+    slot_position: float = 40  # 前端からスロットまでの距離
+    slot_width: float = 100  # スロットの幅
+
+    # 前後分割（generate_stl_front_back）
+    total_height: float = 120
+    back_depth: float = 215  # 後部パーツの奥行き
+    front_depth: float = 100  # 前部パーツの奥行き
+    opening_start: float = 40  # 前端から開放が始まる位置
+    joint_depth: float = 10  # 接合部の深さ
+    joint_height: float = 5  # 接合部の高さ
+
+    # 派生値（__post_init__ で計算）
+    slope_drop: float = field(init=False, repr=False)  # 傾斜による高低差
+    hole_center_y: float = field(init=False, repr=False)  # 穴の中心のy座標
+
+    def __post_init__(self):
+        if self.segments < 4 or self.segments % 4:
+            raise ValueError(f"segments は4の倍数にしてください: {self.segments}")
+        if self.loft_rings < 1:
+            raise ValueError(f"loft_rings は1以上にしてください: {self.loft_rings}")
+        if self.tolerance < 0:
+            raise ValueError(f"tolerance は0以上にしてください: {self.tolerance}")
+
+        object.__setattr__(self, 'slope_drop',
+                           self.top_depth * math.tan(math.radians(self.slope_angle)))
+        object.__setattr__(self, 'hole_center_y', -self.top_depth/2 + self.hole_position)
+
+
+DEFAULT_PARAMS = ChuteParams()
+
+# 派生値 → 元になるフィールド
+DERIVED_FROM = {
+    'slope_drop': ('top_depth', 'slope_angle'),
+    'hole_center_y': ('top_depth', 'hole_position'),
+}
+
+
+class ParamTrace:
+    """
+    ChuteParams の代わりに生成関数に渡し、読んだフィールドを記録する
+    - reads: {フィールド名: 読んだ値}（派生値は派生値のまま）
+    - features: {読んだ関数（サブ機能）: {フィールド名, ...}}（関数の中の lambda はその関数に数える）
+    """
+
+    __slots__ = ('params', 'reads', 'features')
+
+    def __init__(self, params):
+        self.params = params
+        self.reads = {}
+        self.features = {}
+
+    def __getattr__(self, name):
+        value = getattr(self.params, name)
+        if name in ChuteParams.__dataclass_fields__:
+            self.reads[name] = value
+            feature = sys._getframe(1).f_code.co_qualname.split('.<locals>')[0]
+            self.features.setdefault(feature, set()).add(name)
+        return value
+
+
+def read_scad_params(path):
+    """SCAD ファイルの「名前 = 数値;」の行 → {名前: 数値}（式や文字列の代入は読まない）"""
+    pattern = re.compile(r'^\s*([A-Za-z_]\w*)\s*=\s*([-+]?[0-9.]+(?:[eE][-+]?\d+)?)\s*;')
+    values = {}
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            match = pattern.match(line)
+            if match:
+                values[match.group(1)] = float(match.group(2))
+    return values
+
+
+def from_scad(path, base=DEFAULT_PARAMS):
+    """coin_chute.scad のパラメータを base に反映した ChuteParams（SCAD_NAMES にない変数は無視）"""
+    values = read_scad_params(path)
+    return replace(base, **{field_name: values[name] for name, field_name in SCAD_NAMES.items() if name in values})
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+硬貨の流れのシミュレーション（個別要素法）
+
+create_*_part で生成したシュートに上から硬貨を落とし、出口から出ていくかを計算する
+- 硬貨は回転しない水平な円板（直径・厚さ・質量は硬貨ごと）で近似する。壁との接触は円板の支持距離
+  （中心から向き n の接平面までの距離 R√(1 - n_z²) + t/2·|n_z|）で判定するので、床には厚さの半分まで、
+  垂直な壁には半径まで近づける。転がらないので、斜面では tanθ が摩擦係数より大きいときだけ滑り出す
+- 硬貨どうしは直径の球として扱う（厚さで重ねると、この STIFFNESS・TIME_STEP では速い硬貨どうしが
+  すり抜け、横向きの大きな重なりになって壁の外へはじき出される）
+- 接触はばね・ダッシュポット + クーロン摩擦（滑り速度で滑らかにしたもの）
+- 三角形は空間ハッシュ（格子）に登録しておき、硬貨のいるセルの三角形だけを調べる
+- 硬貨どうし・硬貨と三角形の接触候補は余裕 SKIN をつけて作り、どれかの硬貨が SKIN/2 動くまで使い回す
+- 全硬貨をまとめて numpy で計算する（硬貨ごとのループはない）
+
+結果: 出口から出た枚数・流量（枚/秒）・詰まり（JAM_SECONDS の間1枚も出てこない）の回数・残った枚数
+
+使い方:
+    python3 coin_sim.py hole -n 1000
+    python3 coin_sim.py snap -n 10000 --coins 100,500 --feed 200
+    python3 coin_sim.py hole -p slope_angle=15      # 傾斜を変えて比べる
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from bvh import closest_points
+
+# 硬貨: (直径 mm, 厚さ mm, 質量 g)
+COINS = {
+    1: (20.0, 1.5, 1.0),
+    5: (22.0, 1.5, 3.75),
+    10: (23.5, 1.5, 4.5),
+    50: (21.0, 1.7, 4.0),
+    100: (22.6, 1.7, 4.8),
+    500: (26.5, 1.8, 7.1),
+}
+
+GRAVITY = 9810.0        # mm/s²
+STIFFNESS = 5e5         # g/s²（= 500 N/m。接触時間が TIME_STEP の20倍以上になるように選ぶ）
+RESTITUTION = 0.3       # 反発係数
+FRICTION_WALL = 0.3     # 硬貨と PLA の摩擦係数
+FRICTION_COIN = 0.25    # 硬貨どうしの摩擦係数
+FRICTION_RATE = 2000.0  # 1/s（滑り速度 × 質量 × これ が摩擦の上限に届くまでは粘性で止める）
+TIME_STEP = 2e-4        # s
+SKIN = 4.0              # mm（接触候補の余裕）
+FEED_RATE = 200.0       # 枚/s
+FEED_INTERVAL = 0.1     # s（この間隔でまとめて投入する）
+JAM_SECONDS = 1.0       # s（この間1枚も出てこなければ詰まりとみなす）
+MAX_SECONDS = 600.0     # s（シミュレーション時間の上限）
+
+# 隣のセル（半分だけ。自分のセル (0, 0, 0) が先頭）。残り半分は逆向きの組として数えられる
+_HALF_SHELL = np.array([(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)
+                        if (i, j, k) >= (0, 0, 0)])
+
+
+@dataclass
+class SimResult:
+    """シミュレーション結果（時間は秒）"""
+    coins: int
+    exited: int
+    spilled: int            # 上からあふれた・出口以外から外に出た枚数
+    residual: int           # 最後までシュートに残った枚数
+    jams: int
+    seconds: float          # シミュレーションした時間
+    exit_times: np.ndarray = field(repr=False)
+    residual_positions: np.ndarray = field(repr=False)  # 残った硬貨の中心 (residual, 3)
+
+    @property
+    def throughput(self):
+        """最初の1枚が出てから最後の1枚が出るまでの平均流量（枚/秒）"""
+        if len(self.exit_times) < 2:
+            return 0.0
+        span = self.exit_times[-1] - self.exit_times[0]
+        return (len(self.exit_times) - 1) / span if span > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.exited}/{self.coins}枚が出口へ（流量 {self.throughput:.1f}枚/秒）"
+                f" 詰まり {self.jams}回 残り {self.residual}枚 あふれ {self.spilled}枚"
+                f" / {self.seconds:.1f}秒")
+
+
+def _cell_keys(cells):
+    """整数セル座標 (N, 3) → int64 キー（各軸21ビット）"""
+    cells = cells + (1 << 20)
+    return (cells[:, 0] << 42) | (cells[:, 1] << 21) | cells[:, 2]
+
+
+def _expand(starts, stops):
+    """各要素の [start, stop) をつなげた (要素番号, 位置)"""
+    counts = np.maximum(stops - starts, 0)
+    owner = np.repeat(np.arange(len(starts)), counts)
+    position = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(int(counts.sum()))
+    return owner, position
+
+
+class TriangleGrid:
+    """三角形の空間ハッシュ（セルごとに、半径 reach 以内に入りうる三角形の一覧）"""
+
+    def __init__(self, vertices, faces, cell_size, reach):
+        triangles = np.asarray(vertices, dtype=np.float64)[np.asarray(faces)]
+        area = np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0],
+                                       triangles[:, 2] - triangles[:, 0]), axis=1)
+        triangles = triangles[area > 1e-9]
+        self.a = triangles[:, 0]
+        self.ab = triangles[:, 1] - triangles[:, 0]
+        self.ac = triangles[:, 2] - triangles[:, 0]
+        self.cell_size = cell_size
+
+        low = np.floor((triangles.min(axis=1) - reach) / cell_size).astype(np.int64)
+        high = np.floor((triangles.max(axis=1) + reach) / cell_size).astype(np.int64)
+        span = high - low + 1
+        counts = span.prod(axis=1)
+        owner, rest = _expand(np.zeros(len(counts), dtype=np.int64), counts)
+        sy, sz = span[owner, 1], span[owner, 2]
+        cells = low[owner] + np.stack([rest // (sy * sz), rest // sz % sy, rest % sz], axis=1)
+        keys = _cell_keys(cells)
+        order = np.argsort(keys)
+        self.keys = keys[order]
+        self.triangle = owner[order]
+
+    def candidates(self, points):
+        """各点のセルに登録された三角形 → (点の番号, 三角形の番号)"""
+        keys = _cell_keys(np.floor(points / self.cell_size).astype(np.int64))
+        starts = np.searchsorted(self.keys, keys, side='left')
+        stops = np.searchsorted(self.keys, keys, side='right')
+        owner, position = _expand(starts, stops)
+        return owner, self.triangle[position]
+
+
+def coin_pairs(position, radius, cell_size, reach):
+    """中心間の距離が radius_i + radius_j + reach 未満の組 (i, j)（各組1回）"""
+    cells = np.floor(position / cell_size).astype(np.int64)
+    keys = _cell_keys(cells)
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    first, second = [], []
+    for offset in _HALF_SHELL:
+        neighbor = _cell_keys(cells + offset)
+        starts = np.searchsorted(sorted_keys, neighbor, side='left')
+        stops = np.searchsorted(sorted_keys, neighbor, side='right')
+        owner, slot = _expand(starts, stops)
+        other = order[slot]
+        if not offset.any():
+            keep = owner < other  # 同じセルの中は1回だけ
+            owner, other = owner[keep], other[keep]
+        first.append(owner)
+        second.append(other)
+    i = np.concatenate(first)
+    j = np.concatenate(second)
+    gap = np.linalg.norm(position[j] - position[i], axis=1) - radius[i] - radius[j]
+    near = gap < reach
+    return i[near], j[near]
+
+
+def support(radius, half_thickness, normal):
+    """水平な円板の、中心から向き normal（単位ベクトル）の接平面までの距離"""
+    nz = np.abs(normal[:, 2])
+    return radius * np.sqrt(np.maximum(1 - nz * nz, 0)) + half_thickness * nz
+
+
+def damping(mass):
+    """反発係数 RESTITUTION になる減衰係数（質量 mass の相手との接触）"""
+    log_e = np.log(RESTITUTION)
+    ratio = -log_e / np.sqrt(np.pi ** 2 + log_e ** 2)
+    return 2 * ratio * np.sqrt(STIFFNESS * mass)
+
+
+def _contact_force(overlap, normal, relative, mass, damper, friction):
+    """重なり・法線（相手→自分）・相対速度（自分 − 相手）から自分にかかる力"""
+    normal_speed = np.einsum('ij,ij->i', relative, normal)
+    pressing = np.maximum(STIFFNESS * overlap - damper * normal_speed, 0)
+    tangent = relative - normal_speed[:, None] * normal
+    slip = np.linalg.norm(tangent, axis=1)
+    drag = np.minimum(friction * pressing, FRICTION_RATE * mass * slip)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        drag_direction = np.where(slip[:, None] > 0, tangent / slip[:, None], 0)
+    return pressing[:, None] * normal - drag[:, None] * drag_direction
+
+
+def _spawn_points(count, low, high, radius, top, rng):
+    """投入口（xy の範囲 low〜high）に重ならないように並べた位置"""
+    pitch = 2 * radius + SKIN
+    nx = max(int((high[0] - low[0]) // pitch), 1)
+    ny = max(int((high[1] - low[1]) // pitch), 1)
+    slot = rng.permutation(max(nx * ny, count))[:count] if count <= nx * ny else np.arange(count)
+    layer = slot // (nx * ny)
+    x = low[0] + (slot % nx + 0.5) * pitch + rng.uniform(-SKIN / 2, SKIN / 2, count)
+    y = low[1] + (slot // nx % ny + 0.5) * pitch + rng.uniform(-SKIN / 2, SKIN / 2, count)
+    z = top + radius + layer * pitch
+    return np.stack([x, y, z], axis=1)
+
+
+def simulate(vertices, faces, count=1000, coins=tuple(COINS), feed_rate=FEED_RATE, seed=0,
+             max_seconds=MAX_SECONDS, progress=None):
+    """シュートに count 枚の硬貨（coins の種類を同じ割合で混ぜる）を落として流れを計算する
+
+    progress: (時刻, 投入済み, 出口から出た枚数, シュート内の枚数) を受け取る関数（任意）
+    """
+    rng = np.random.default_rng(seed)
+    kinds = rng.choice(np.asarray(coins), count)
+    diameter = np.array([COINS[k][0] for k in kinds])
+    thickness = np.array([COINS[k][1] for k in kinds])
+    weight = np.array([COINS[k][2] for k in kinds])
+    largest = float(diameter.max()) / 2
+
+    vertices = np.asarray(vertices, dtype=np.float64)
+    low, high = vertices.min(axis=0), vertices.max(axis=0)
+    margin = 0.1 * (high - low)
+    spawn_low, spawn_high = low[:2] + margin[:2], high[:2] - margin[:2]
+    exit_z = low[2] - 2 * largest
+    cell_size = 2 * largest + SKIN
+    grid = TriangleGrid(vertices, faces, cell_size, largest + SKIN)
+
+    # シュート内の硬貨だけを詰めた配列で持つ
+    ids = np.zeros(0, dtype=np.int64)
+    position = np.zeros((0, 3))
+    velocity = np.zeros((0, 3))
+    fed = 0
+    exit_times = []
+    spilled = 0
+    jams = 0
+    jammed = False
+    last_exit = 0.0
+    time = 0.0
+    next_feed = 0.0
+    rebuild = True
+    anchor = position
+
+    while time < max_seconds:
+        if time >= next_feed and fed < count:
+            batch = min(max(int(round(feed_rate * FEED_INTERVAL)), 1), count - fed)
+            new = np.arange(fed, fed + batch)
+            points = _spawn_points(batch, spawn_low, spawn_high, largest, high[2] + SKIN, rng)
+            ids = np.concatenate([ids, new])
+            position = np.concatenate([position, points])
+            velocity = np.concatenate([velocity, np.zeros((batch, 3))])
+            fed += batch
+            next_feed += FEED_INTERVAL
+            if fed == batch:
+                last_exit = time
+            rebuild = True
+
+        if not rebuild and len(position):
+            moved = np.einsum('ij,ij->i', position - anchor, position - anchor).max()
+            rebuild = moved > (SKIN / 2) ** 2
+        if rebuild:
+            # 出た硬貨を外してから接触候補を作り直す
+            below = position[:, 2] < exit_z
+            outside = np.any((position[:, :2] < low[:2] - cell_size) | (position[:, :2] > high[:2] + cell_size),
+                             axis=1) | (position[:, 2] > high[2] + 50 * cell_size)
+            gone = below | outside
+            if gone.any():
+                exit_times += [time] * int(below.sum())
+                spilled += int((outside & ~below).sum())
+                if below.any():
+                    last_exit = time
+                    jammed = False
+                keep = ~gone
+                ids, position, velocity = ids[keep], position[keep], velocity[keep]
+            radius = diameter[ids] / 2
+            half = thickness[ids] / 2
+            mass = weight[ids]
+            pi, pj = coin_pairs(position, radius, cell_size, SKIN)
+            pair_mass = mass[pi] * mass[pj] / (mass[pi] + mass[pj])
+            pair_damper = damping(pair_mass)
+            owner, triangle = grid.candidates(position)
+            q = closest_points(position[owner], grid.a[triangle], grid.ab[triangle], grid.ac[triangle])
+            near = np.einsum('ij,ij->i', position[owner] - q, position[owner] - q) < (radius[owner] + SKIN) ** 2
+            owner, triangle = owner[near], triangle[near]
+            a, ab, ac = grid.a[triangle], grid.ab[triangle], grid.ac[triangle]
+            wall_damper = damping(mass[owner])
+            anchor = position.copy()
+            rebuild = False
+            if progress is not None:
+                progress(time, fed, len(exit_times), len(ids))
+
+            if len(ids) and time - last_exit > JAM_SECONDS and not jammed:
+                jams += 1
+                jammed = True
+            if fed == count and (len(ids) == 0 or (jammed and time - last_exit > 2 * JAM_SECONDS)):
+                break  # 全部出たか、投入し終えてから詰まったまま
+
+        force = np.zeros_like(position)
+        force[:, 2] -= mass * GRAVITY
+        targets, pushes = [], []
+
+        # 硬貨と三角形
+        if len(owner):
+            q = closest_points(position[owner], a, ab, ac)
+            offset = position[owner] - q
+            distance = np.sqrt(np.einsum('ij,ij->i', offset, offset))
+            normal = offset / np.maximum(distance, 1e-12)[:, None]
+            overlap = support(radius[owner], half[owner], normal) - distance
+            touching = overlap > 0
+            if touching.any():
+                who = owner[touching]
+                push = _contact_force(overlap[touching], normal[touching], velocity[who], mass[who],
+                                      wall_damper[touching], FRICTION_WALL)
+                targets.append(who)
+                pushes.append(push)
+
+        # 硬貨どうし
+        if len(pi):
+            offset = position[pi] - position[pj]
+            distance = np.sqrt(np.einsum('ij,ij->i', offset, offset))
+            touching = distance < radius[pi] + radius[pj]
+            if touching.any():
+                i, j = pi[touching], pj[touching]
+                normal = offset[touching] / np.maximum(distance[touching], 1e-12)[:, None]
+                push = _contact_force(radius[i] + radius[j] - distance[touching], normal,
+                                      velocity[i] - velocity[j], pair_mass[touching], pair_damper[touching],
+                                      FRICTION_COIN)
+                targets += [i, j]
+                pushes += [push, -push]
+
+        if targets:
+            # 3成分をまとめて1回の bincount で足し込む
+            slots = np.concatenate(targets)[:, None] * 3 + np.arange(3)
+            force += np.bincount(slots.ravel(), np.concatenate(pushes).ravel(),
+                                 minlength=3 * len(position)).reshape(-1, 3)
+
+        # 半陰的オイラー法
+        velocity += force / mass[:, None] * TIME_STEP
+        position += velocity * TIME_STEP
+        time += TIME_STEP
+
+    return SimResult(
+        coins=count,
+        exited=len(exit_times),
+        spilled=spilled,
+        residual=len(ids) + count - fed,
+        jams=jams,
+        seconds=time,
+        exit_times=np.array(exit_times),
+        residual_positions=position,
+    )
+
+
+def assemble(variant, params):
+    """バリエーションの全パーツ（組み立てた位置のまま）を1つのメッシュにまとめる → (頂点, 面)"""
+    from variants import load_parts
+
+    meshes = [func(params) for func, _ in load_parts(variant)]
+    offsets = np.cumsum([0] + [len(v) for v, _ in meshes[:-1]])
+    vertices = np.concatenate([v for v, _ in meshes])
+    faces = np.concatenate([np.asarray(f) + k for (_, f), k in zip(meshes, offsets)])
+    return vertices, faces
+
+
+def main(argv=None):
+    from coinchute import build_params, parse_param
+    from variants import VARIANTS
+
+    parser = argparse.ArgumentParser(description='硬貨の流れのシミュレーション')
+    parser.add_argument('variant', choices=list(VARIANTS), help='バリエーション（全パーツを組み立てた状態で計算）')
+    parser.add_argument('-n', '--count', type=int, default=1000, help='硬貨の枚数')
+    parser.add_argument('--coins', default=','.join(str(k) for k in COINS), help='硬貨の種類（例: 100,500）')
+    parser.add_argument('--feed', type=float, default=FEED_RATE, help='投入の速さ（枚/秒）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-p', '--param', action='append', type=parse_param, default=[], metavar='NAME=VALUE',
+                        help='ChuteParams の値を変える（例: -p slope_angle=15）')
+    args = parser.parse_args(argv)
+
+    coins = tuple(int(k) for k in args.coins.split(','))
+    unknown = [k for k in coins if k not in COINS]
+    if unknown:
+        parser.error(f"不明な硬貨: {unknown}（{', '.join(map(str, COINS))}）")
+
+    params = build_params(args.param)
+    vertices, faces = assemble(args.variant, params)
+
+    def progress(time, fed, exited, inside):
+        print(f"\r  {time:6.1f}秒 投入 {fed} / 出口 {exited} / シュート内 {inside}", end='', flush=True)
+
+    result = simulate(vertices, faces, args.count, coins, args.feed, args.seed, progress=progress)
+    print()
+    mark = '✅' if result.residual == 0 and result.jams == 0 else '❌'
+    print(f"{mark} {args.variant}: {result.summary()}")
+    return 0 if mark == '✅' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+コインシュート生成のコマンドライン（全バリエーション共通の入口）
+
+    python3 coinchute.py --list
+    python3 coinchute.py hole                    # 円形穴版（generate_stl.py と同じ）
+    python3 coinchute.py snap -p clearance=0.2   # はめ込み型
+    python3 coinchute.py slot -o out/            # 開口部版
+    python3 coinchute.py frontback               # 前後分割版
+    python3 coinchute.py snap --3mf              # 上下パーツを1枚のプレートに並べた 3MF
+    python3 coinchute.py scad --from-scad-params # coin_chute.scad の hull() 版を SCAD のパラメータで
+    python3 coinchute.py hole --tolerance 0.05mm # 曲面を誤差 0.05mm 以下になるところだけ細かく分ける
+    python3 coinchute.py hole --lod 0.05         # プレビュー用の LOD を 5% に（既定は 1%, 10%。--no-lod で書き出さない）
+    python3 coinchute.py diagram slope           # 説明図（matplotlib）
+
+numpy・numpy-stl・matplotlib は実行するサブコマンドの中でだけ import する
+（--list / --help は標準ライブラリだけで起動する）
+"""
+
+import argparse
+import os
+import sys
+
+# サブコマンド: (説明, 元の生成スクリプト)（variants.VARIANTS と同じ名前）
+VARIANT_COMMANDS = {
+    'hole': ('円形穴版', 'generate_stl.py'),
+    'snap': ('はめ込み型・PETG用', 'generate_stl_snap_fit.py'),
+    'slot': ('開口部（スロット）版', 'generate_stl_open_slot.py'),
+    'frontback': ('前後分割版', 'generate_stl_front_back.py'),
+    'scad': ('coin_chute.scad の hull() 版', 'generate_stl_scad.py'),
+}
+
+# --from-scad-params でファイルを省略したときに読む SCAD（このスクリプトと同じディレクトリ）
+SCAD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'coin_chute.scad')
+
+# 図の名前: 生成スクリプト
+DIAGRAMS = {
+    'overview': 'create_diagram.py',
+    'slope': 'create_slope_diagram.py',
+    'structure': 'create_structure_comparison.py',
+}
+
+
+def parse_param(text):
+    """'slope_angle=25' → ('slope_angle', '25')"""
+    name, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"name=value の形式で指定してください: {text}")
+    return name.strip(), value.strip()
+
+
+def parse_tolerance(text):
+    """'0.05mm' / '0.05' → 0.05"""
+    try:
+        value = float(text.strip().removesuffix('mm'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"長さ（mm）を指定してください: {text}") from None
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"0 より大きい値を指定してください: {text}")
+    return value
+
+
+def build_params(overrides, scad=None):
+    """-p の指定を反映した ChuteParams（scad: 先に読み込む coin_chute.scad のパス）"""
+    from dataclasses import fields, replace
+
+    from chute_params import DEFAULT_PARAMS, ChuteParams, from_scad
+
+    types = {f.name: f.type for f in fields(ChuteParams) if f.init}
+    values = {}
+    for name, value in overrides:
+        if name not in types:
+            raise SystemExit(f"ChuteParams にないパラメータ: {name}")
+        try:
+            values[name] = types[name](value)
+        except ValueError:
+            raise SystemExit(f"{name} には {types[name].__name__} の値を指定してください: {value}") from None
+    base = from_scad(scad) if scad else DEFAULT_PARAMS
+    try:
+        return replace(base, **values)
+    except ValueError as exc:  # ChuteParams.__post_init__ の検査
+        raise SystemExit(f"パラメータが正しくありません: {exc}") from None
+
+
+def report_parts(parts, params):
+    """パーツごとの三角形数と、曲面との最大誤差（許容誤差モードのとき）"""
+    from mesh_builder import surface_error
+    from variants import part_surfaces
+
+    print(f"許容誤差 {params.tolerance:g} mm:")
+    for func, filename, vertices, faces in parts:
+        surfaces = part_surfaces(func, params)
+        if not surfaces:
+            print(f"  {filename}: 三角形 {len(faces):,}（平面のみ）")
+            continue
+        error = surface_error(vertices, faces, surfaces)
+        mark = '✅' if error <= params.tolerance else '❌'
+        print(f"  {mark} {filename}: 三角形 {len(faces):,} / 最大誤差 {error:.4f} mm")
+
+
+def save_lods(parts, out_dir, ratios):
+    """パーツごとに mesh_simplify.write_lods で LOD（ratios: parse_ratios の結果）を <パーツ>_lod1.stl などに書き出す"""
+    from mesh_simplify import describe_lods, write_lods
+
+    print("LOD（プレビュー用）:")
+    for _, filename, vertices, faces in parts:
+        levels = write_lods(vertices, faces, os.path.join(out_dir, filename), ratios)
+        print(f"  ✅ {filename}: {describe_lods(levels)}")
+
+
+def run_variant(args):
+    from dataclasses import replace
+
+    from design_cache import DesignCache
+    from variants import load_parts
+
+    params = build_params(args.param, args.from_scad_params)
+    if args.tolerance is not None:
+        params = replace(params, tolerance=args.tolerance)
+    lod = ()
+    if not args.no_lod:
+        from mesh_simplify import parse_ratios
+
+        try:
+            lod = parse_ratios(args.lod)
+        except ValueError as exc:
+            raise SystemExit(str(exc)) from None
+    os.makedirs(args.out, exist_ok=True)
+    cache = DesignCache() if not args.no_cache else None
+
+    description, _ = VARIANT_COMMANDS[args.command]
+    if args.three_mf:
+        from export_3mf import write_3mf
+
+        print(f"コインシュート3MFファイル生成中（{description}）...")
+        build = cache.build if cache is not None else (lambda func, params: func(params))
+        parts = [(func, filename, *build(func, params)) for func, filename in load_parts(args.command)]
+        path = os.path.join(args.out, f'coin_chute_{args.command}.3mf')
+        write_3mf(path, [part[1:] for part in parts])
+        print(f"✅ {path} を生成しました")
+        if params.tolerance > 0:
+            report_parts(parts, params)
+        if lod:
+            save_lods(parts, args.out, lod)
+        return 0
+
+    print(f"コインシュートSTLファイル生成中（{description}）...")
+    parts = []
+    for func, filename in load_parts(args.command):
+        path = os.path.join(args.out, filename)
+        if cache is not None:
+            cache.save_stl(func, path, params, lod=lod)  # LOD も書き出す
+            if params.tolerance > 0:
+                parts.append((func, filename, *cache.build(func, params)))
+        else:
+            from stl_export import save_stl
+
+            vertices, faces = func(params)
+            save_stl(vertices, faces, path)
+            parts.append((func, filename, vertices, faces))
+    if params.tolerance > 0:
+        report_parts(parts, params)
+    if lod and cache is None:
+        save_lods(parts, args.out, lod)
+    return 0
+
+
+def run_diagram(args):
+    import runpy
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    names = list(DIAGRAMS) if args.name == 'all' else [args.name]
+    for name in names:
+        runpy.run_path(os.path.join(here, DIAGRAMS[name]), run_name='__main__')
+    return 0
+
+
+def list_commands():
+    print("サブコマンド:")
+    for name, (description, script) in VARIANT_COMMANDS.items():
+        print(f"  {name:<10} {description}（{script}）")
+    print(f"  {'diagram':<10} 説明図を生成（{', '.join(DIAGRAMS)}, all）")
+    return 0
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog='coinchute', description='コインシュートのSTL・図面生成')
+    parser.add_argument('--list', action='store_true', help='サブコマンドの一覧を表示')
+    subparsers = parser.add_subparsers(dest='command')
+
+    for name, (description, script) in VARIANT_COMMANDS.items():
+        sub = subparsers.add_parser(name, help=description, description=f"{description}（{script} と同じ）")
+        sub.add_argument('-o', '--out', default='.', help='出力先ディレクトリ（既定: カレント）')
+        sub.add_argument('-p', '--param', action='append', default=[], type=parse_param,
+                         metavar='NAME=VALUE', help='ChuteParams の値を変更（複数指定可）')
+        sub.add_argument('--no-cache', action='store_true', help='キャッシュを使わずに生成')
+        sub.add_argument('--3mf', dest='three_mf', action='store_true',
+                         help='全パーツを1枚のプレートに並べた coin_chute_<名前>.3mf を書き出す')
+        sub.add_argument('--from-scad-params', nargs='?', const=SCAD_FILE, metavar='SCAD',
+                         help='SCAD ファイルのパラメータを使う（既定: coin_chute.scad。-p の指定が優先）')
+        sub.add_argument('--tolerance', type=parse_tolerance, metavar='MM',
+                         help='曲面と三角形のずれの上限（例: 0.05mm）。曲がっているところだけ細かく分け、'
+                              'パーツごとの三角形数と誤差を表示する')
+        sub.add_argument('--lod', nargs='?', const='0.01,0.1', default='0.01,0.1', metavar='RATIOS',
+                         help='面を減らしたプレビュー用の <パーツ>_lod1.stl などの比率（既定: 0.01,0.1）')
+        sub.add_argument('--no-lod', action='store_true', help='プレビュー用の LOD を書き出さない')
+        sub.set_defaults(func=run_variant)
+
+    sub = subparsers.add_parser('diagram', help='説明図を生成（matplotlib）')
+    sub.add_argument('name', nargs='?', default='all', choices=list(DIAGRAMS) + ['all'])
+    sub.set_defaults(func=run_diagram)
+    return parser
+
+
+def main(argv=None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.list:
+        return list_commands()
+    if args.command is None:
+        parser.print_help()
+        return 0
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
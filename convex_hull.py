@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+3D 凸包（quickhull）と内側へのオフセット
+
+OpenSCAD の hull() と同じく、点群を包む最小の凸多面体を閉じたメッシュ (頂点, 面) で返す
+- 四面体から始め、まだ外にある点のうち面から最も遠い点を1つずつ足す（quickhull）
+- 1回の追加で見える面・地平線の辺・外の点の付け替えを NumPy でまとめて行う
+  （点ごと・面ごとの Python ループはない。ループの回数は凸包の頂点の数）
+- 見える面は、足す点が外にある面から隣の面へ広げて探す（全部の面を調べないので、凸包が大きくなっても
+  1回の追加の手間は見える面の数くらいで済む）
+- 内側の点は最初の四面体や途中の面の外にないとわかった時点で候補から外れる
+
+inset_hull は凸包の各面を内側へ thickness だけ平行移動した立体（半空間の交わり）を、
+双対（面 n·x = d → 点 n / d）の凸包から作る。MERGE_DISTANCE より近い頂点（ほぼ1点で交わる面）は1つにまとめる。
+shell は外側と内側の凸包の差（OpenSCAD の difference() { hull() ...; hull() ...; } と同じ）
+
+使い方:
+    python3 convex_hull.py part.stl -o hull.stl
+    python3 convex_hull.py part.stl --inset 2 -o shell.stl   # 肉厚 2mm の中空の凸包
+"""
+
+import sys
+
+import numpy as np
+
+from mesh_validate import WELD_TOLERANCE
+
+HULL_TOLERANCE = 1e-10  # 点群の大きさに対する割合（面からこれより近い点は面の上とみなす）
+MERGE_DISTANCE = 2 * WELD_TOLERANCE  # inset_hull でまとめる頂点の距離（溶接の格子で重なりうる √3 倍より広く）
+MERGE_ROUNDS = 8        # inset_hull で近い頂点をまとめて作り直す回数の上限
+
+
+def _plane(points, faces):
+    """面の単位法線 (F, 3) と原点からの距離 (F,)（n·x = d）"""
+    a = points[faces[:, 0]]
+    u, v = points[faces[:, 1]] - a, points[faces[:, 2]] - a
+    # np.cross は呼び出しが重いので成分で書く（1点足すたびに呼ぶ）
+    normal = np.column_stack([u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1],
+                              u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2],
+                              u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]])
+    normal /= np.maximum(np.linalg.norm(normal, axis=1), 1e-300)[:, None]
+    return normal, np.einsum('ij,ij->i', normal, a)
+
+
+def _initial_simplex(points, tolerance):
+    """離れた4点の四面体（外向きの面 (4, 3)）"""
+    axis = int(np.argmax(np.ptp(points, axis=0)))
+    i0, i1 = int(np.argmin(points[:, axis])), int(np.argmax(points[:, axis]))
+    line = points[i1] - points[i0]
+    i2 = int(np.argmax(np.linalg.norm(np.cross(points - points[i0], line), axis=1)))
+    normal = np.cross(line, points[i2] - points[i0])
+    height = (points - points[i0]) @ normal
+    i3 = int(np.argmax(np.abs(height)))
+    if np.linalg.norm(line) <= tolerance or np.linalg.norm(normal) <= tolerance * np.linalg.norm(line) \
+            or abs(height[i3]) <= tolerance * np.linalg.norm(normal):
+        raise ValueError("点が一直線上か同じ平面上にあり、立体の凸包を作れません")
+
+    faces = np.array([[i0, i1, i2], [i0, i3, i1], [i1, i3, i2], [i2, i3, i0]])
+    if height[i3] > 0:
+        faces = faces[:, [0, 2, 1]]  # 4点目が (i0, i1, i2) の表側にあるときは全部裏返す
+    return faces
+
+
+def _neighbors(faces):
+    """面の辺 k（k→k+1）の向こうの面 (F, 3)（閉じた面の組だけ）"""
+    across = {(a, b): number for number, face in enumerate(faces.tolist())
+              for a, b in zip(face, face[1:] + face[:1])}
+    return np.array([[across[b, a] for a, b in zip(face, face[1:] + face[:1])] for face in faces.tolist()])
+
+
+def quickhull(points, tolerance=None):
+    """凸包の面 (F, 3)（points の番号、外向き）
+
+    tolerance: 面の上とみなす距離（省略時は点群の大きさ × HULL_TOLERANCE）
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if len(points) < 4:
+        raise ValueError(f"凸包には4点以上が必要です: {len(points)}")
+    if tolerance is None:
+        tolerance = HULL_TOLERANCE * max(float(np.abs(points).max()), float(np.ptp(points, axis=0).max()), 1.0)
+
+    # 面は配列の末尾に足していき、消した面は alive を False にする
+    # neighbor: 辺の向こうの面。seen / visible: 何回目の追加で調べた・見えた面か（毎回クリアしない）
+    capacity = 64
+    faces = np.zeros((capacity, 3), dtype=np.int64)
+    neighbor = np.zeros((capacity, 3), dtype=np.int64)
+    normals = np.zeros((capacity, 3))
+    offsets = np.zeros(capacity)
+    alive = np.zeros(capacity, dtype=bool)
+    seen = np.full(capacity, -1)
+    visible_in = np.full(capacity, -1)
+    count = 4
+    faces[:4] = _initial_simplex(points, tolerance)
+    neighbor[:4] = _neighbors(faces[:4])
+    normals[:4], offsets[:4] = _plane(points, faces[:4])
+    alive[:4] = True
+
+    # 外の点: 点の番号、一番遠い面、その面からの距離
+    distance = points @ normals[:4].T - offsets[:4]
+    owner = np.argmax(distance, axis=1)
+    height = distance[np.arange(len(points)), owner]
+    outside = np.flatnonzero(height > tolerance)
+    owner, height = owner[outside], height[outside]
+
+    step = 0
+    while len(outside):
+        step += 1
+        pick = int(np.argmax(height))
+        eye = outside[pick]
+        point = points[eye]
+
+        # 見える面: 最も遠い面から、辺でつながる面を表側かどうか調べながら広げる（見える面はひとつながり）
+        frontier = owner[pick:pick + 1]
+        seen[frontier] = visible_in[frontier] = step
+        visible = [frontier]
+        while len(frontier):
+            candidates = np.unique(neighbor[frontier].reshape(-1))
+            candidates = candidates[seen[candidates] != step]
+            seen[candidates] = step
+            frontier = candidates[normals[candidates] @ point - offsets[candidates] > tolerance]
+            visible_in[frontier] = step
+            visible.append(frontier)
+        visible = np.concatenate(visible)
+
+        # 地平線: 見える面の辺のうち、向こうの面が見えないもの → 新しい面 (a, b, eye)
+        across = neighbor[visible]
+        horizon = visible_in[across] != step
+        start = faces[visible][horizon]
+        end = faces[visible][:, [1, 2, 0]][horizon]
+        outer = across[horizon]
+        inner = np.repeat(visible, 3)[horizon.reshape(-1)]
+        added = len(start)
+        new = np.arange(count, count + added)
+
+        if count + added > capacity:
+            capacity = max(2 * capacity, count + added)
+            grow = capacity - len(faces)
+            faces = np.concatenate([faces, np.zeros((grow, 3), dtype=np.int64)])
+            neighbor = np.concatenate([neighbor, np.zeros((grow, 3), dtype=np.int64)])
+            normals = np.concatenate([normals, np.zeros((grow, 3))])
+            offsets = np.concatenate([offsets, np.zeros(grow)])
+            alive = np.concatenate([alive, np.zeros(grow, dtype=bool)])
+            seen = np.concatenate([seen, np.full(grow, -1)])
+            visible_in = np.concatenate([visible_in, np.full(grow, -1)])
+        alive[visible] = False
+        faces[new, 0], faces[new, 1], faces[new, 2] = start, end, eye
+        normals[new], offsets[new] = _plane(points, faces[new])
+        alive[new] = True
+
+        # つなぎ直す: 辺 a→b は外の面と、b→eye は b から始まる新しい面、eye→a は a で終わる新しい面と
+        neighbor[new, 0] = outer
+        slot = np.argmax(neighbor[outer] == inner[:, None], axis=1)
+        neighbor[outer, slot] = new
+        order = np.argsort(start)
+        neighbor[new, 1] = new[order[np.searchsorted(start[order], end)]]
+        order = np.argsort(end)
+        neighbor[new, 2] = new[order[np.searchsorted(end[order], start)]]
+
+        # 消えた面の外にあった点を新しい面に付け替える（どの新しい面の外にもなければ内側）
+        moved = ~alive[owner]
+        moved[pick] = False
+        candidates = outside[moved]
+        distance = points[candidates] @ normals[new].T - offsets[new]
+        best = np.argmax(distance, axis=1)
+        best_height = distance[np.arange(len(candidates)), best]
+        still = best_height > tolerance
+        stay = ~moved
+        stay[pick] = False
+        outside = np.concatenate([outside[stay], candidates[still]])
+        owner = np.concatenate([owner[stay], new[best[still]]])
+        height = np.concatenate([height[stay], best_height[still]])
+        count += added
+
+    return faces[:count][alive[:count]]
+
+
+def merge_close(vertices, faces, distance):
+    """凸包の辺のうち distance より短いものの両端を1点（平均）にまとめた点 → 凸包を作り直す点"""
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    short = edges[np.linalg.norm(vertices[edges[:, 0]] - vertices[edges[:, 1]], axis=1) < distance]
+    # 短い辺でつながる頂点に同じ番号（つながりの中の最小の番号）を付ける
+    label = np.arange(len(vertices))
+    while True:
+        low = np.minimum(label[short[:, 0]], label[short[:, 1]])
+        merged = label.copy()
+        np.minimum.at(merged, short[:, 0], low)
+        np.minimum.at(merged, short[:, 1], low)
+        merged = merged[merged]
+        if np.array_equal(merged, label):
+            break
+        label = merged
+    _, group = np.unique(label, return_inverse=True)
+    points = np.zeros((group.max() + 1, 3))
+    np.add.at(points, group, vertices)
+    return points / np.bincount(group)[:, None]
+
+
+def convex_hull(points, tolerance=None):
+    """点群 (N, 3) の凸包 → (頂点, 面)（閉じたメッシュ、面は外向き、頂点は凸包の頂点だけ）"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    faces = quickhull(points, tolerance)
+    used, faces = np.unique(faces, return_inverse=True)
+    return points[used], faces.reshape(-1, 3)
+
+
+def inset_hull(points, thickness):
+    """凸包の面をすべて内側へ thickness だけ移した凸多面体 → (頂点, 面)
+
+    面 n·x = d を n·x = d - thickness にした半空間の交わりを、内部の点 c から見た双対
+    n / (d - thickness - n·c) の凸包で求める（双対の面 → 3平面の交点が頂点）
+    """
+    vertices, faces = convex_hull(points)
+    normals, offsets = _plane(vertices, faces)
+    center = vertices.mean(axis=0)
+    shifted = offsets - thickness - normals @ center
+    if shifted.min() <= 0:
+        raise ValueError(f"厚み {thickness} mm が大きすぎて内側が残りません")
+
+    # 三角形に分かれた同じ平面は1つにまとめる
+    planes = np.unique(np.round(np.column_stack([normals, shifted]), 9), axis=0)
+    dual = planes[:, :3] / planes[:, 3:]
+    triples = quickhull(dual)
+    corners = np.linalg.solve(planes[triples, :3], planes[triples, 3][..., None])[..., 0] + center
+
+    # 4つ以上の面がほぼ1点で交わると、頂点がとても近い細い面ができる → 近い頂点をまとめて作り直す
+    vertices, faces = convex_hull(corners)
+    for _ in range(MERGE_ROUNDS):
+        edges = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+        if np.linalg.norm(vertices[edges[:, 0]] - vertices[edges[:, 1]], axis=1).min() >= MERGE_DISTANCE:
+            break
+        vertices, faces = convex_hull(merge_close(vertices, faces, MERGE_DISTANCE))
+    return vertices, faces
+
+
+def shell(outer, inner):
+    """外側の点群の凸包から内側の点群の凸包を引いた立体 → (頂点, 面)
+
+    内側を外側の面の外まで伸ばせば、そこが開いた殻になる（coin_chute.scad のくり抜きと同じ）
+    """
+    from mesh_boolean import difference
+
+    return difference(convex_hull(outer), convex_hull(inner))
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from mesh_validate import validate
+    from stl_export import save_stl
+    from stl_reader import MappedSTL
+
+    parser = argparse.ArgumentParser(description='STLの頂点の凸包（OpenSCAD の hull()）')
+    parser.add_argument('stl', help='STLファイル')
+    parser.add_argument('-o', '--out', default='hull.stl', help='出力する STL ファイル')
+    parser.add_argument('--inset', type=float, metavar='MM', help='この肉厚の中空にする（内側の凸包を引く）')
+    args = parser.parse_args(argv)
+
+    points = np.asarray(MappedSTL(args.stl).vectors, dtype=np.float64).reshape(-1, 3)
+    start = time.perf_counter()
+    vertices, faces = convex_hull(points)
+    if args.inset:
+        from mesh_boolean import difference
+
+        vertices, faces = difference((vertices, faces), inset_hull(vertices, args.inset))
+    elapsed = time.perf_counter() - start
+    report = validate(vertices, faces)
+    mark = '✅' if report.ok else '❌'
+    print(f"{mark} 凸包: 点 {len(points)} → 頂点 {len(vertices)} / 面 {len(faces)}（{elapsed * 1e3:.0f} ms）")
+    save_stl(vertices, faces, args.out)
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
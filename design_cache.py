@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+パラメータのハッシュをキーにした生成結果のディスクキャッシュ
+
+- キー: 生成関数名 + モジュールのパラメータ（大文字の定数）+ 引数 + ソースのハッシュ
+  → パラメータもコードも変わっていなければ再生成しない
+- 値: メッシュ（vertices, faces の .npz）と書き出したSTL
+- 上限サイズを超えたら、最後に使ってから最も時間が経ったものから削除（LRU）
+- 生成時に読んだ ChuteParams のフィールドも記録し（chute_params.ParamTrace）、save_stl は出力先の
+  param_deps.BuildState と比べて、読んだ値が変わっていないパーツは作り直さず、中身が同じファイルは書き換えない
+- save_stl はプレビュー用の LOD（mesh_simplify、既定 1%, 10%）も書き出す（lod=() で書き出さない）
+
+環境変数 COIN_CHUTE_CACHE でキャッシュの場所を変えられる
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+from mesh_simplify import LOD_RATIOS
+from stl_export import iter_triangle_blocks, write_stl
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'coin_chute')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# 生成結果に影響する共通モジュール（変わったらキャッシュを無効にする）
+SHARED_SOURCES = ['chute_params.py', 'mesh_builder.py', 'stl_export.py', 'mesh_repair.py', 'mesh_validate.py',
+                  'convex_hull.py', 'mesh_boolean.py', 'bvh.py']
+
+
+def module_params(module):
+    """モジュールの大文字の定数（数値・文字列）をパラメータとして集める"""
+    return {
+        name: value for name, value in sorted(vars(module).items())
+        if name.isupper() and isinstance(value, (int, float, str))
+    }
+
+
+def arg_key(arg):
+    """キーに入れる引数の表現（dataclass は repr=False の派生値も含めた全フィールド）"""
+    if dataclasses.is_dataclass(arg) and not isinstance(arg, type):
+        return repr(dataclasses.asdict(arg))
+    return repr(arg)
+
+
+def source_version(module):
+    """生成モジュールと共通モジュールのソースのハッシュ"""
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    paths = [module.__file__] + [os.path.join(here, name) for name in SHARED_SOURCES]
+    for path in paths:
+        with open(path, 'rb') as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+class DesignCache:
+    """生成したメッシュ・STLをパラメータのハッシュで保存する"""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get('COIN_CHUTE_CACHE', DEFAULT_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, func, *args):
+        """生成関数とその引数からキャッシュキーを作る"""
+        module = sys.modules[func.__module__]
+        payload = json.dumps({
+            'function': func.__qualname__,
+            'params': module_params(module),
+            'args': [arg_key(arg) for arg in args],
+            'source': source_version(module),
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def _touch(self, path):
+        """最終使用時刻を更新（LRU用）"""
+        os.utime(path, None)
+
+    def get(self, key):
+        """キャッシュ済みの (vertices, faces)。なければ None"""
+        path = self._path(key, '.npz')
+        if not os.path.exists(path):
+            return None
+        self._touch(path)
+        with np.load(path) as data:
+            return data['vertices'], data['faces']
+
+    def put(self, key, vertices, faces):
+        path = self._path(key, '.npz')
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, vertices=vertices, faces=faces)
+        os.replace(tmp, path)
+        self.evict()
+
+    def build(self, func, *args):
+        """func(*args) の結果をキャッシュ経由で返す（作ったときは読んだパラメータも記録）"""
+        key = self.key(func, *args)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        vertices, faces = self._build_traced(key, func, *args)
+        self.put(key, vertices, faces)
+        return vertices, faces
+
+    def _build_traced(self, key, func, *args):
+        """ChuteParams を ParamTrace で包んで func を実行し、読んだフィールドを <キー>.reads.json に書く"""
+        from chute_params import ChuteParams, ParamTrace
+
+        traced = [ParamTrace(arg) if isinstance(arg, ChuteParams) else arg for arg in args]
+        vertices, faces = func(*traced)
+        reads, features = {}, {}
+        for trace in traced:
+            if isinstance(trace, ParamTrace):
+                reads.update(trace.reads)
+                for feature, names in trace.features.items():
+                    features.setdefault(feature, set()).update(names)
+        path = self._path(key, '.reads.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as fh:
+            json.dump({'reads': reads, 'features': {feature: sorted(names) for feature, names in features.items()}},
+                      fh, sort_keys=True)
+        os.replace(path + '.tmp', path)
+        return vertices, faces
+
+    def reads(self, func, *args):
+        """func(*args) が読んだパラメータ {'reads': {名前: 値}, 'features': {サブ機能: [名前, ...]}}"""
+        key = self.key(func, *args)
+        path = self._path(key, '.reads.json')
+        if not os.path.exists(path):  # 記録より前のキャッシュ・消えたとき
+            self._build_traced(key, func, *args)
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+
+    def save_stl(self, func, filename, *args, lod=LOD_RATIOS):
+        """
+        func(*args) のメッシュを STL に保存
+        - 出力先の記録（param_deps.BuildState）と読んだパラメータ・コード・中身が同じなら何もしない
+        - キャッシュにSTLがあればそれを、なければ生成して使い、中身が出力先と同じなら書き換えない
+        - lod: プレビュー用の LOD の比率（既定 1%, 10%。空なら書き出さない）。STL を書き換えたときと
+          LOD のファイルが足りないときだけ mesh_simplify.write_lods で <名前>_lod1.stl などを書き出す
+        """
+        from mesh_repair import orient_faces  # mesh_repair が stl_export を import するため
+        from param_deps import BuildState, file_hash
+
+        state = BuildState(os.path.dirname(filename) or '.')
+        if state.is_current(func, filename, *args):
+            print(f"✅ {filename} は変更なし（読むパラメータが同じ）")
+            self._save_lods(func, filename, lod, False, *args)
+            return
+
+        key = self.key(func, *args)
+        cached_stl = self._path(key, '.stl')
+        from_cache = os.path.exists(cached_stl)
+        if from_cache:
+            self._touch(cached_stl)
+        else:
+            vertices, faces = self.build(func, *args)
+            faces, _ = orient_faces(vertices, faces)
+            write_stl(cached_stl + '.tmp', iter_triangle_blocks(vertices, faces))
+            os.replace(cached_stl + '.tmp', cached_stl)
+
+        digest = file_hash(cached_stl)
+        changed = not (os.path.exists(filename) and file_hash(filename) == digest)
+        if changed:
+            shutil.copyfile(cached_stl, filename)
+            print(f"✅ {filename} を生成しました" + ("（キャッシュ）" if from_cache else ""))
+        else:
+            print(f"✅ {filename} は変更なし（中身が同じ）")
+        state.record(func, filename, self.reads(func, *args), digest, *args)
+        state.save()
+        self._save_lods(func, filename, lod, changed, *args)
+        self.evict()
+
+    def _save_lods(self, func, filename, lod, changed, *args):
+        from mesh_simplify import describe_lods, lods_current, write_lods
+
+        if not lod or (not changed and lods_current(filename, lod)):
+            return
+        levels = write_lods(*self.build(func, *args), filename, lod)
+        print(f"  LOD: {describe_lods(levels)}")
+
+    def entries(self):
+        """(最終使用時刻, サイズ, パス) の一覧"""
+        result = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(('.tmp.npz', '.tmp')):
+                stat = entry.stat()
+                result.append((stat.st_mtime, stat.st_size, entry.path))
+        return result
+
+    def evict(self):
+        """合計サイズが上限を超えていれば古いものから削除"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
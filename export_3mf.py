@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+3MF 出力（1枚のプレートに複数パーツ）
+
+- パーツごとに頂点を mesh_repair.clean_mesh でまとめ、頂点表 + 三角形の番号の表として書く（STL のように頂点を三角形ごとに持たない）
+- 上下（前後）のパーツを1つのモデルに入れ、<build> の変換行列でプレート上に並べる
+  （向きは bed_fit.fit_part の回転。ベッドの中心に X 方向へ PLATE_GAP ずつ離して並べる。
+  ベッドに収まらないパーツは元の向きのまま置き、プレートがはみ出すときは警告する）
+- 見積もりに使うスライサー設定の仮定値（mesh_props.PRINT_SETTINGS, slicer.PRINT_SPEEDS）をメタデータとして入れる
+- XML は zipfile に直接流し込む。頂点・三角形は BLOCK_SIZE 個ずつ1つの書式文字列でまとめて文字にする
+  （頂点ごとに文字列を作ってつながない）
+
+使い方:
+    python3 export_3mf.py                        # 全バリエーション → coin_chute_<名前>.3mf
+    python3 export_3mf.py snap -p clearance=0.2 -o out/
+"""
+
+import datetime
+import os
+import sys
+import time
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+from bed_fit import BED_SIZE
+from mesh_props import PRINT_SETTINGS
+from mesh_repair import clean_mesh
+
+BLOCK_SIZE = 65536  # 1回に文字にする頂点・三角形の数
+PLATE_GAP = 10.0    # mm（プレート上のパーツの間隔）
+NAMESPACE = 'urn:coin-chute:print-settings'  # 設定のメタデータ用の名前空間
+
+MODEL_PATH = '3D/3dmodel.model'
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
+    ' <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\n'
+    ' <Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>\n'
+    '</Types>\n'
+)
+RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">\n'
+    f' <Relationship Target="/{MODEL_PATH}" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>\n'
+    '</Relationships>\n'
+)
+VERTEX = '<vertex x="%.6g" y="%.6g" z="%.6g"/>\n'
+TRIANGLE = '<triangle v1="%d" v2="%d" v3="%d"/>\n'
+
+
+def plate_transforms(meshes, orient=True, bed=BED_SIZE, gap=PLATE_GAP, names=None):
+    """パーツ [(頂点, 面)] をプレートに並べる変換 [(回転 (3, 3), 移動 (3,))]（ベッド座標 = 回転 @ 頂点 + 移動）
+
+    orient=True なら bed_fit.fit_part の向き、False なら元の向きのまま
+    （どの向きでもベッドに収まらないパーツは、傾けても意味がないので元の向きのまま置いて警告する）
+    底を z=0 に置き、X 方向に gap ずつ離してベッドの中心に並べる（並べたプレートがはみ出すときも警告する）
+    """
+    from bed_fit import fit_part
+
+    names = names or [f"パーツ {number + 1}" for number in range(len(meshes))]
+    rotations, boxes = [], []
+    for name, (vertices, faces) in zip(names, meshes):
+        rotation = np.eye(3)
+        if orient:
+            fit = fit_part(vertices, faces, bed)
+            if fit.fits:
+                rotation = fit.rotation
+            else:
+                print(f"❌ {name} はどの向きでもベッド {bed[0]:g}×{bed[1]:g}×{bed[2]:g}mm に収まりません"
+                      f"（元の向きのまま置きます。part_split.py で分割できます）")
+        placed = vertices @ rotation.T
+        rotations.append(rotation)
+        boxes.append((placed.min(axis=0), placed.max(axis=0)))
+
+    widths = [hi[0] - lo[0] for lo, hi in boxes]
+    size = np.array([sum(widths) + gap * (len(widths) - 1),
+                     max((hi[1] - lo[1] for lo, hi in boxes), default=0),
+                     max((hi[2] - lo[2] for lo, hi in boxes), default=0)])
+    if np.any(size > np.asarray(bed)):
+        print(f"❌ 並べたプレート {size[0]:.0f}×{size[1]:.0f}×{size[2]:.0f}mm がベッド "
+              f"{bed[0]:g}×{bed[1]:g}×{bed[2]:g}mm からはみ出します（パーツを分けて印刷してください）")
+    x = bed[0] / 2 - size[0] / 2
+    transforms = []
+    for rotation, (lo, hi), width in zip(rotations, boxes, widths):
+        offset = np.array([x - lo[0], bed[1] / 2 - (lo[1] + hi[1]) / 2, -lo[2]])
+        transforms.append((rotation, offset))
+        x += width + gap
+    return transforms
+
+
+def _transform_attribute(rotation, offset):
+    """3MF の transform（行ベクトル × 行列なので回転は転置して、m00 m01 m02 ... m30 m31 m32 の順）"""
+    matrix = np.vstack([rotation.T, offset])
+    return ' '.join('%.9g' % value for value in matrix.reshape(-1))
+
+
+def _write_rows(fh, template, rows):
+    """(k, 3) の行を BLOCK_SIZE 行ずつ、1回の % でまとめて文字にして書く"""
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block = rows[start:start + BLOCK_SIZE]
+        fh.write(((template * len(block)) % tuple(block.reshape(-1).tolist())).encode('ascii'))
+
+
+def settings_metadata():
+    """スライサー設定の仮定値（PRINT_SETTINGS, PRINT_SPEEDS）→ [(名前, 値)]"""
+    from slicer import PRINT_SPEEDS
+
+    return [(f'cc:{name}', value) for name, value in {**PRINT_SETTINGS, **PRINT_SPEEDS}.items()]
+
+
+def write_3mf(path, parts, orient=True, title=None, metadata=None):
+    """パーツ [(名前, 頂点, 面)] を1枚のプレートに並べた 3MF を書き出す
+
+    metadata: 追加の [(名前, 値)]（省略時は settings_metadata()）
+    戻り値: 書き出した三角形の数
+    """
+    meshes = [clean_mesh(vertices, faces) for _, vertices, faces in parts]
+    transforms = plate_transforms(meshes, orient, names=[name for name, _, _ in parts])
+    title = title or os.path.splitext(os.path.basename(path))[0]
+    entries = [('Title', title), ('Application', 'coin_chute'),
+               ('CreationDate', datetime.date.today().isoformat())]
+    entries += settings_metadata() if metadata is None else metadata
+
+    triangles = 0
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('_rels/.rels', RELATIONSHIPS)
+        info = zipfile.ZipInfo(MODEL_PATH, time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        # 大きさは書き終わるまでわからないので、2GB を超えそうなら最初から ZIP64 にする
+        large = sum(len(v) * len(VERTEX) + len(f) * len(TRIANGLE) for v, f in meshes) > 2**31
+        with archive.open(info, 'w', force_zip64=large) as fh:
+            fh.write(('<?xml version="1.0" encoding="UTF-8"?>\n'
+                      '<model unit="millimeter" xml:lang="ja-JP" '
+                      'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02" '
+                      f'xmlns:cc="{NAMESPACE}">\n').encode('utf-8'))
+            for name, value in entries:
+                preserve = ' preserve="1"' if name.startswith('cc:') else ''
+                fh.write(f' <metadata name="{name}"{preserve}>{escape(str(value))}</metadata>\n'.encode('utf-8'))
+
+            fh.write(b' <resources>\n')
+            for number, ((name, _, _), (vertices, faces)) in enumerate(zip(parts, meshes), start=1):
+                label = quoteattr(os.path.splitext(os.path.basename(name))[0])
+                fh.write(f'  <object id="{number}" name={label} type="model">\n   <mesh>\n    <vertices>\n'
+                         .encode('utf-8'))
+                _write_rows(fh, VERTEX, vertices.astype(np.float32).astype(np.float64))
+                fh.write(b'    </vertices>\n    <triangles>\n')
+                _write_rows(fh, TRIANGLE, faces)
+                fh.write(b'    </triangles>\n   </mesh>\n  </object>\n')
+                triangles += len(faces)
+            fh.write(b' </resources>\n <build>\n')
+            for number, (rotation, offset) in enumerate(transforms, start=1):
+                fh.write(f'  <item objectid="{number}" transform="{_transform_attribute(rotation, offset)}"/>\n'
+                         .encode('ascii'))
+            fh.write(b' </build>\n</model>\n')
+    return triangles
+
+
+def main(argv=None):
+    import argparse
+
+    from coinchute import build_params, parse_param
+    from design_cache import DesignCache
+    from stl_export import HEADER_SIZE, STL_RECORD
+    from variants import VARIANTS, load_parts
+
+    parser = argparse.ArgumentParser(description='バリエーションの全パーツを1枚のプレートに並べた 3MF を書き出す')
+    parser.add_argument('variants', nargs='*', help=f"バリエーション（{', '.join(VARIANTS)}。省略時は全部）")
+    parser.add_argument('-o', '--out', default='.', help='出力先ディレクトリ（既定: カレント）')
+    parser.add_argument('-p', '--param', action='append', type=parse_param, default=[], metavar='NAME=VALUE',
+                        help='ChuteParams の値を変える（例: -p slope_angle=15）')
+    parser.add_argument('--no-orient', action='store_true', help='向きを変えずに並べる')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.variants if name not in VARIANTS]
+    if unknown:
+        parser.error(f"不明なバリエーション: {unknown}（{', '.join(VARIANTS)}）")
+
+    params = build_params(args.param)
+    cache = DesignCache()
+    os.makedirs(args.out, exist_ok=True)
+    for variant in args.variants or list(VARIANTS):
+        parts = [(filename, *cache.build(func, params)) for func, filename in load_parts(variant)]
+        path = os.path.join(args.out, f'coin_chute_{variant}.3mf')
+        write_3mf(path, parts, orient=not args.no_orient)
+        size = os.path.getsize(path)
+        stl_size = sum(HEADER_SIZE + 4 + STL_RECORD.itemsize * len(faces) for _, _, faces in parts)
+        print(f"✅ {path} を生成しました（{size / 1024:.1f} KB、STL {len(parts)} 個の {size / stl_size:.0%}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+コイン計算機用シュート STL生成スクリプト（coin_chute.scad の hull() 版）
+2分割設計: 上部パーツ（長方形 → 楕円）+ 下部パーツ（楕円 → 円形の出口）
+
+coin_chute.scad と同じ形を OpenSCAD なしで作る
+- 外側: 上下の薄い板（cube / 拡大した cylinder、厚さ SLAB）の hull()（convex_hull）
+- 内側: 壁厚だけ小さく、上下に少しはみ出させた板の hull() を引く（mesh_boolean の difference）
+- 上部パーツの突起・下部パーツの穴（4箇所）も SCAD と同じ位置・大きさ
+- 円の分割数は OpenSCAD の既定（$fa=12, $fs=2。$fn があればそれ）と同じ
+
+寸法は ChuteParams（top_width, top_depth, bottom_diameter, wall_thickness, height_per_part）から取る
+coin_chute.scad のパラメータは chute_params.from_scad で読み込める（coinchute.py の --from-scad-params）
+"""
+
+import math
+import os
+
+import numpy as np
+
+from chute_params import DEFAULT_PARAMS, from_scad
+from convex_hull import convex_hull
+from design_cache import DesignCache
+from mesh_boolean import cylinder, difference, union
+
+SCAD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'coin_chute.scad')
+
+SLAB = 0.1              # hull() の上下の板の厚さ（cube / cylinder の h=0.1）
+INNER_OVERSHOOT = 0.1   # 内側の板を外側の板より上下にずらす量（くり抜きが上下に抜けるように）
+ELLIPSE_SCALE = (1.8, 2.2)  # 中間の楕円（scale([1.8, 2.2, 1])）
+FRAGMENT_ANGLE = 12.0   # OpenSCAD の $fa（度）
+FRAGMENT_SIZE = 2.0     # OpenSCAD の $fs（mm）
+
+PEG_DIAMETER = 4.0      # 上部パーツの突起（cylinder(h=5, d=4, $fn=20)）
+PEG_HEIGHT = 5.0
+PEG_DROP = 2.0          # 突起の下端（下の面から下へ）
+PEG_RADIUS = 0.9        # 中心からの距離（bottom_diameter に対する割合）
+PEG_FRAGMENTS = 20
+HOLE_DIAMETER = 4.2     # 下部パーツの穴（cylinder(h=6, d=4.2, $fn=20)）
+HOLE_HEIGHT = 6.0
+HOLE_DEPTH = 3.0        # 穴の下端（上の面から下へ）
+
+
+def fragments(radius, fn=0):
+    """OpenSCAD の円の分割数（get_fragments_from_r と同じ）"""
+    if fn > 0:
+        return max(int(fn), 3)
+    return int(math.ceil(max(min(360.0 / FRAGMENT_ANGLE, radius * 2 * math.pi / FRAGMENT_SIZE), 5)))
+
+
+def slab(outline, z):
+    """xy の輪郭を z を中心に厚さ SLAB の板にした点 (2k, 3)"""
+    outline = np.asarray(outline, dtype=np.float64)
+    return np.concatenate([np.column_stack([outline, np.full(len(outline), z + dz)]) for dz in (-SLAB / 2, SLAB / 2)])
+
+
+def rectangle(width, depth):
+    """中心が原点の長方形（cube(center=true) の xy）"""
+    w, d = width / 2, depth / 2
+    return [(-w, -d), (w, -d), (w, d), (-w, d)]
+
+
+def ellipse(radius, scale=(1.0, 1.0)):
+    """半径 radius の円（分割数は拡大前の半径で決まる）を scale 倍した輪郭"""
+    angle = np.linspace(0, 2 * np.pi, fragments(radius), endpoint=False)
+    return np.column_stack([scale[0] * radius * np.cos(angle), scale[1] * radius * np.sin(angle)])
+
+
+def ring_cylinders(radius, diameter, z0, z1, fn):
+    """中心から radius の距離に 90 度おきに置いた4本の円柱（rotate([0, 0, angle]) translate(...)）"""
+    return [cylinder((radius * math.cos(angle), radius * math.sin(angle)), diameter / 2, z0, z1, fn)
+            for angle in np.radians([0, 90, 180, 270])]
+
+
+def create_upper_part_scad(p=DEFAULT_PARAMS):
+    """
+    上部パーツを生成（SCAD の upper_part）
+    外側：上の長方形 top_width × top_depth と、下の楕円（直径 bottom_diameter*2 を 1.8 × 2.2 倍）の hull()
+    内側：どちらも壁厚だけ小さくした hull() をくり抜く（上下は開いている）
+    """
+    t, h = p.wall_thickness, p.height_per_part
+    outer = np.concatenate([slab(rectangle(p.top_width, p.top_depth), h),
+                            slab(ellipse(p.bottom_diameter, ELLIPSE_SCALE), 0)])
+    inner = np.concatenate([slab(rectangle(p.top_width - 2 * t, p.top_depth - 2 * t), h + INNER_OVERSHOOT),
+                            slab(ellipse(p.bottom_diameter - t, ELLIPSE_SCALE), -INNER_OVERSHOOT)])
+    part = difference(convex_hull(outer), convex_hull(inner))
+
+    # 組み立て用のスナップフィット突起（4箇所）
+    for peg in ring_cylinders(p.bottom_diameter * PEG_RADIUS, PEG_DIAMETER, -PEG_DROP,
+                              PEG_HEIGHT - PEG_DROP, PEG_FRAGMENTS):
+        part = union(part, peg)
+    return part
+
+
+def create_lower_part_scad(p=DEFAULT_PARAMS):
+    """
+    下部パーツを生成（SCAD の lower_part）
+    外側：上の楕円（上部パーツの下と同じ）と、下の円（出口、直径 bottom_diameter）の hull()
+    内側：どちらも壁厚だけ小さくした hull() をくり抜き、突起が入る穴（4箇所）を開ける
+    """
+    t, h = p.wall_thickness, p.height_per_part
+    outer = np.concatenate([slab(ellipse(p.bottom_diameter, ELLIPSE_SCALE), h),
+                            slab(ellipse(p.bottom_diameter / 2), 0)])
+    inner = np.concatenate([slab(ellipse(p.bottom_diameter - t, ELLIPSE_SCALE), h + INNER_OVERSHOOT),
+                            slab(ellipse(p.bottom_diameter / 2 - t), -INNER_OVERSHOOT)])
+    part = difference(convex_hull(outer), convex_hull(inner))
+
+    # スナップフィット用の穴（4箇所）
+    for hole in ring_cylinders(p.bottom_diameter * PEG_RADIUS, HOLE_DIAMETER, h - HOLE_DEPTH,
+                               h - HOLE_DEPTH + HOLE_HEIGHT, PEG_FRAGMENTS):
+        part = difference(part, hole)
+    return part
+
+
+if __name__ == "__main__":
+    params = from_scad(SCAD_PATH) if os.path.exists(SCAD_PATH) else DEFAULT_PARAMS
+    cache = DesignCache()
+
+    print("コインシュートSTLファイル生成中（coin_chute.scad の hull() 版）...")
+    print(f"設計: 上部 {params.top_width}×{params.top_depth}mm → 下部 直径{params.bottom_diameter}mm")
+    print(f"各パーツの高さ: {params.height_per_part}mm、壁厚: {params.wall_thickness}mm")
+
+    # 上部パーツ生成
+    print("\n上部パーツ生成中（長方形 → 楕円）...")
+    cache.save_stl(create_upper_part_scad, "coin_chute_upper_scad.stl", params)
+
+    # 下部パーツ生成
+    print("下部パーツ生成中（楕円 → 円形の出口）...")
+    cache.save_stl(create_lower_part_scad, "coin_chute_lower_scad.stl", params)
+
+    print("\n✅ 完了！以下のファイルが生成されました:")
+    print("- coin_chute_upper_scad.stl (上部パーツ: 突起付き)")
+    print("- coin_chute_lower_scad.stl (下部パーツ: 穴付き)")
@@ -11,335 +11,210 @@
 """
 
 import numpy as np
-from stl import mesh
-import math
-
-# パラメータ (mm)
-TOP_WIDTH = 240
-TOP_DEPTH = 315
-BOTTOM_DIAMETER = 100
-WALL_THICKNESS = 2
-HEIGHT_PER_PART = 60  # 各パーツの基本高さ
-SEGMENTS = 32  # 円周の分割数
-SLOPE_ANGLE = 20  # 傾斜角度（度）
-HOLE_POSITION = 40  # 前端から穴の中心までの距離
-
-# 嵌合機構のパラメータ
-CLEARANCE = 0.3  # クリアランス（PETG用）
-STEP_HEIGHT = 5  # 段差の高さ
-STEP_THICKNESS = 3  # 段差の厚み
-
-# 傾斜による高低差
-slope_drop = TOP_DEPTH * math.tan(math.radians(SLOPE_ANGLE))
-
-def create_upper_part_snap():
+
+from chute_params import DEFAULT_PARAMS
+from design_cache import DesignCache
+from mesh_builder import (MeshBuilder, circle_segments, corner_phase, loft_rect_to_circle, rect_circle_surface,
+                          ruled_loft, slanted_circle)
+
+
+def _step_ring(p, z):
+    """段差のクリアランス側の長方形（手前の高さ z、奥は傾斜の分だけ高い）。上部の凸部と下部の凹部で共通"""
+    w = p.top_width/2 - p.wall_thickness - p.step_thickness + p.clearance
+    d = p.top_depth/2 - p.wall_thickness - p.step_thickness + p.clearance
+    return [
+        [-w, -d, z],  # 手前左
+        [w, -d, z],   # 手前右
+        [w, d, z + p.slope_drop],   # 奥右
+        [-w, d, z + p.slope_drop],  # 奥左
+    ]
+
+
+def create_upper_part_snap(p=DEFAULT_PARAMS):
     """
     上部パーツを生成（はめ込み型・凸部付き）
     外側：240mm × 315mm × 60mm の直方体
     内側：底面が20度傾斜
     下端：段差（凸部）付き
     """
-    vertices = []
-    faces = []
-
     # 上部 - 長方形の頂点（外側は平行）
     top_outer = [
-        [-TOP_WIDTH/2, -TOP_DEPTH/2, HEIGHT_PER_PART],  # 手前左
-        [TOP_WIDTH/2, -TOP_DEPTH/2, HEIGHT_PER_PART],   # 手前右
-        [TOP_WIDTH/2, TOP_DEPTH/2, HEIGHT_PER_PART],   # 奥右
-        [-TOP_WIDTH/2, TOP_DEPTH/2, HEIGHT_PER_PART],  # 奥左
+        [-p.top_width/2, -p.top_depth/2, p.height_per_part],  # 手前左
+        [p.top_width/2, -p.top_depth/2, p.height_per_part],   # 手前右
+        [p.top_width/2, p.top_depth/2, p.height_per_part],   # 奥右
+        [-p.top_width/2, p.top_depth/2, p.height_per_part],  # 奥左
     ]
 
     # 内側の上部（外側より少し低い）
     top_inner = [
-        [-(TOP_WIDTH/2 - WALL_THICKNESS), -(TOP_DEPTH/2 - WALL_THICKNESS), HEIGHT_PER_PART - WALL_THICKNESS],
-        [(TOP_WIDTH/2 - WALL_THICKNESS), -(TOP_DEPTH/2 - WALL_THICKNESS), HEIGHT_PER_PART - WALL_THICKNESS],
-        [(TOP_WIDTH/2 - WALL_THICKNESS), (TOP_DEPTH/2 - WALL_THICKNESS), HEIGHT_PER_PART - WALL_THICKNESS],
-        [-(TOP_WIDTH/2 - WALL_THICKNESS), (TOP_DEPTH/2 - WALL_THICKNESS), HEIGHT_PER_PART - WALL_THICKNESS],
+        [-(p.top_width/2 - p.wall_thickness), -(p.top_depth/2 - p.wall_thickness), p.height_per_part - p.wall_thickness],
+        [(p.top_width/2 - p.wall_thickness), -(p.top_depth/2 - p.wall_thickness), p.height_per_part - p.wall_thickness],
+        [(p.top_width/2 - p.wall_thickness), (p.top_depth/2 - p.wall_thickness), p.height_per_part - p.wall_thickness],
+        [-(p.top_width/2 - p.wall_thickness), (p.top_depth/2 - p.wall_thickness), p.height_per_part - p.wall_thickness],
     ]
 
     # 下部 - 外側は平行（直方体）
     bottom_outer = [
-        [-TOP_WIDTH/2, -TOP_DEPTH/2, 0],  # 手前左
-        [TOP_WIDTH/2, -TOP_DEPTH/2, 0],   # 手前右
-        [TOP_WIDTH/2, TOP_DEPTH/2, 0],   # 奥右
-        [-TOP_WIDTH/2, TOP_DEPTH/2, 0],  # 奥左
+        [-p.top_width/2, -p.top_depth/2, 0],  # 手前左
+        [p.top_width/2, -p.top_depth/2, 0],   # 手前右
+        [p.top_width/2, p.top_depth/2, 0],   # 奥右
+        [-p.top_width/2, p.top_depth/2, 0],  # 奥左
     ]
 
     # 内側の底面は傾斜（手前が低く、奥が高い）
     bottom_inner = [
-        [-(TOP_WIDTH/2 - WALL_THICKNESS), -(TOP_DEPTH/2 - WALL_THICKNESS), WALL_THICKNESS],  # 手前左
-        [(TOP_WIDTH/2 - WALL_THICKNESS), -(TOP_DEPTH/2 - WALL_THICKNESS), WALL_THICKNESS],   # 手前右
-        [(TOP_WIDTH/2 - WALL_THICKNESS), (TOP_DEPTH/2 - WALL_THICKNESS), WALL_THICKNESS + slope_drop],   # 奥右
-        [-(TOP_WIDTH/2 - WALL_THICKNESS), (TOP_DEPTH/2 - WALL_THICKNESS), WALL_THICKNESS + slope_drop],  # 奥左
+        [-(p.top_width/2 - p.wall_thickness), -(p.top_depth/2 - p.wall_thickness), p.wall_thickness],  # 手前左
+        [(p.top_width/2 - p.wall_thickness), -(p.top_depth/2 - p.wall_thickness), p.wall_thickness],   # 手前右
+        [(p.top_width/2 - p.wall_thickness), (p.top_depth/2 - p.wall_thickness), p.wall_thickness + p.slope_drop],   # 奥右
+        [-(p.top_width/2 - p.wall_thickness), (p.top_depth/2 - p.wall_thickness), p.wall_thickness + p.slope_drop],  # 奥左
     ]
 
     # === 嵌合用の凸部（段差）を追加 ===
     # 凸部の外側（クリアランスを考慮）
     step_outer = [
-        [-(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS), -(TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS), -STEP_HEIGHT],
-        [(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS), -(TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS), -STEP_HEIGHT],
-        [(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS), (TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS), -STEP_HEIGHT + slope_drop],
-        [-(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS), (TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS), -STEP_HEIGHT + slope_drop],
+        [-(p.top_width/2 - p.wall_thickness - p.step_thickness), -(p.top_depth/2 - p.wall_thickness - p.step_thickness), -p.step_height],
+        [(p.top_width/2 - p.wall_thickness - p.step_thickness), -(p.top_depth/2 - p.wall_thickness - p.step_thickness), -p.step_height],
+        [(p.top_width/2 - p.wall_thickness - p.step_thickness), (p.top_depth/2 - p.wall_thickness - p.step_thickness), -p.step_height + p.slope_drop],
+        [-(p.top_width/2 - p.wall_thickness - p.step_thickness), (p.top_depth/2 - p.wall_thickness - p.step_thickness), -p.step_height + p.slope_drop],
     ]
 
+    # 凸部の底面の内側（少し細くしてクリアランスを確保）
+    step_inner = _step_ring(p, -p.step_height)
+
+    builder = MeshBuilder()
+
     # 外側の4つの壁
-    for i in range(4):
-        next_i = (i + 1) % 4
-        v_idx = len(vertices)
-        vertices.extend([
-            top_outer[i],
-            top_outer[next_i],
-            bottom_outer[next_i],
-            bottom_outer[i]
-        ])
-        faces.append([v_idx, v_idx+1, v_idx+2])
-        faces.append([v_idx, v_idx+2, v_idx+3])
+    builder.quad_strip(top_outer, bottom_outer)
 
     # 内側の4つの壁（上部から段差まで）
-    for i in range(4):
-        next_i = (i + 1) % 4
-        v_idx = len(vertices)
-        vertices.extend([
-            top_inner[i],
-            top_inner[next_i],
-            bottom_inner[next_i],
-            bottom_inner[i]
-        ])
-        faces.append([v_idx, v_idx+2, v_idx+1])
-        faces.append([v_idx, v_idx+3, v_idx+2])
+    builder.quad_strip(top_inner, bottom_inner, flip=True)
 
     # 凸部の壁（段差）
-    for i in range(4):
-        next_i = (i + 1) % 4
-        v_idx = len(vertices)
-        vertices.extend([
-            bottom_inner[i],
-            bottom_inner[next_i],
-            step_outer[next_i],
-            step_outer[i]
-        ])
-        faces.append([v_idx, v_idx+1, v_idx+2])
-        faces.append([v_idx, v_idx+2, v_idx+3])
+    builder.quad_strip(bottom_inner, step_outer)
 
     # 上部の蓋（長方形のリング）
-    for i in range(4):
-        next_i = (i + 1) % 4
-        v_idx = len(vertices)
-        vertices.extend([top_outer[i], top_outer[next_i], top_inner[next_i], top_inner[i]])
-        faces.append([v_idx, v_idx+1, v_idx+2])
-        faces.append([v_idx, v_idx+2, v_idx+3])
+    builder.cap(top_outer, top_inner)
 
     # 凸部の底面（リング）
-    for i in range(4):
-        next_i = (i + 1) % 4
-        v_idx = len(vertices)
-        # 内側を少し細くしてクリアランスを確保
-        step_inner = [
-            [-(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE),
-             -(TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE), -STEP_HEIGHT],
-            [(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE),
-             -(TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE), -STEP_HEIGHT],
-            [(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE),
-             (TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE), -STEP_HEIGHT + slope_drop],
-            [-(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE),
-             (TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE), -STEP_HEIGHT + slope_drop],
-        ]
-        vertices.extend([step_outer[i], step_outer[next_i], step_inner[next_i], step_inner[i]])
-        faces.append([v_idx, v_idx+2, v_idx+1])
-        faces.append([v_idx, v_idx+3, v_idx+2])
-
-    return np.array(vertices), np.array(faces)
-
-def create_lower_part_snap():
-    """
-    下部パーツを生成（はめ込み型・凹部付き）
-    外側：240mm × 315mm × 60mm の直方体
-    内側：底面が傾斜し、前端40mmの位置で直径100mmの円形穴に集約
-    上端：段差（凹部）付き
-    """
-    vertices = []
-    faces = []
-
-    # 上部 - 外側は平行（直方体）
-    top_outer = [
-        [-TOP_WIDTH/2, -TOP_DEPTH/2, 0],  # 手前左
-        [TOP_WIDTH/2, -TOP_DEPTH/2, 0],   # 手前右
-        [TOP_WIDTH/2, TOP_DEPTH/2, 0],   # 奥右
-        [-TOP_WIDTH/2, TOP_DEPTH/2, 0],  # 奥左
-    ]
+    builder.cap(step_outer, step_inner, flip=True)
 
-    # === 嵌合用の凹部（段差）を追加 ===
-    # 凹部の内側（上部パーツの凸部を受ける）
-    step_inner = [
-        [-(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE),
-         -(TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE), STEP_HEIGHT],
-        [(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE),
-         -(TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE), STEP_HEIGHT],
-        [(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE),
-         (TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE), STEP_HEIGHT + slope_drop],
-        [-(TOP_WIDTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE),
-         (TOP_DEPTH/2 - WALL_THICKNESS - STEP_THICKNESS + CLEARANCE), STEP_HEIGHT + slope_drop],
-    ]
+    return builder.to_arrays()
 
+def _lower_part_snap_inner(p):
+    """下部パーツの内側の上の長方形と、下の円（外側・内側の (中心, 半径, z(y))）"""
     # 内側の上部は傾斜（段差の底から）
     top_inner = [
-        [-(TOP_WIDTH/2 - WALL_THICKNESS), -(TOP_DEPTH/2 - WALL_THICKNESS), -WALL_THICKNESS],  # 手前左
-        [(TOP_WIDTH/2 - WALL_THICKNESS), -(TOP_DEPTH/2 - WALL_THICKNESS), -WALL_THICKNESS],   # 手前右
-        [(TOP_WIDTH/2 - WALL_THICKNESS), (TOP_DEPTH/2 - WALL_THICKNESS), -WALL_THICKNESS + slope_drop],   # 奥右
-        [-(TOP_WIDTH/2 - WALL_THICKNESS), (TOP_DEPTH/2 - WALL_THICKNESS), -WALL_THICKNESS + slope_drop],  # 奥左
+        [-(p.top_width/2 - p.wall_thickness), -(p.top_depth/2 - p.wall_thickness), -p.wall_thickness],  # 手前左
+        [(p.top_width/2 - p.wall_thickness), -(p.top_depth/2 - p.wall_thickness), -p.wall_thickness],   # 手前右
+        [(p.top_width/2 - p.wall_thickness), (p.top_depth/2 - p.wall_thickness), -p.wall_thickness + p.slope_drop],   # 奥右
+        [-(p.top_width/2 - p.wall_thickness), (p.top_depth/2 - p.wall_thickness), -p.wall_thickness + p.slope_drop],  # 奥左
     ]
 
     # 下部 - 円形（前端から40mmの位置、傾斜を考慮）
-    hole_center_y = -TOP_DEPTH/2 + HOLE_POSITION
+    # 円周上の各点での高さ（内側の傾斜に沿う）
+    circles = [
+        ((0, p.hole_center_y), p.bottom_diameter / 2,
+         lambda y: (y + p.top_depth/2) / p.top_depth * p.slope_drop - p.height_per_part - p.wall_thickness),
+        ((0, p.hole_center_y), p.bottom_diameter / 2 - p.wall_thickness,
+         lambda y: (y + p.top_depth/2) / p.top_depth * p.slope_drop - p.height_per_part - p.wall_thickness * 2),
+    ]
+    return top_inner, circles
 
-    bottom_outer_points = []
-    bottom_inner_points = []
 
-    for i in range(SEGMENTS):
-        angle = 2 * math.pi * i / SEGMENTS
-        x_outer = (BOTTOM_DIAMETER / 2) * math.cos(angle)
-        y_outer = hole_center_y + (BOTTOM_DIAMETER / 2) * math.sin(angle)
-        x_inner = (BOTTOM_DIAMETER / 2 - WALL_THICKNESS) * math.cos(angle)
-        y_inner = hole_center_y + (BOTTOM_DIAMETER / 2 - WALL_THICKNESS) * math.sin(angle)
+def lower_part_snap_surfaces(p=DEFAULT_PARAMS):
+    """下部パーツの曲面（内側の長方形 → 出口の円の線織面）。許容誤差モードの分割と誤差の測定に使う"""
+    top_inner, circles = _lower_part_snap_inner(p)
+    return [rect_circle_surface(top_inner, *circles[0])]
 
-        # 円周上の各点での高さ（内側の傾斜に沿う）
-        z_outer = (y_outer + TOP_DEPTH/2) / TOP_DEPTH * slope_drop - HEIGHT_PER_PART - WALL_THICKNESS
-        z_inner = (y_inner + TOP_DEPTH/2) / TOP_DEPTH * slope_drop - HEIGHT_PER_PART - WALL_THICKNESS * 2
 
-        bottom_outer_points.append([x_outer, y_outer, z_outer])
-        bottom_inner_points.append([x_inner, y_inner, z_inner])
+def create_lower_part_snap(p=DEFAULT_PARAMS):
+    """
+    下部パーツを生成（はめ込み型・凹部付き）
+    外側：240mm × 315mm × 60mm の直方体
+    内側：底面が傾斜し、前端40mmの位置で直径100mmの円形穴に集約
+    上端：段差（凹部）付き
+    p.tolerance > 0 なら、長方形→円の面を誤差 tolerance 以下になるところまでだけ細かく分ける
+    """
+    # 上部 - 外側は平行（直方体）
+    top_outer = [
+        [-p.top_width/2, -p.top_depth/2, 0],  # 手前左
+        [p.top_width/2, -p.top_depth/2, 0],   # 手前右
+        [p.top_width/2, p.top_depth/2, 0],   # 奥右
+        [-p.top_width/2, p.top_depth/2, 0],  # 奥左
+    ]
 
-    # 外側の4つの壁
-    for i in range(4):
-        next_i = (i + 1) % 4
-        v_idx = len(vertices)
-        vertices.extend([
-            top_outer[i],
-            top_outer[next_i],
-            top_outer[next_i],  # 下部は同じ位置（直方体の底）
-            top_outer[i]
-        ])
-        # 外壁は底まで延長する必要があるので、別途処理
+    # === 嵌合用の凹部（段差）を追加 ===
+    # 凹部の内側（上部パーツの凸部を受ける）
+    step_inner = _step_ring(p, p.step_height)
 
     # 外壁を底まで延長
     bottom_outer_base = [
-        [-TOP_WIDTH/2, -TOP_DEPTH/2, -HEIGHT_PER_PART],
-        [TOP_WIDTH/2, -TOP_DEPTH/2, -HEIGHT_PER_PART],
-        [TOP_WIDTH/2, TOP_DEPTH/2, -HEIGHT_PER_PART],
-        [-TOP_WIDTH/2, TOP_DEPTH/2, -HEIGHT_PER_PART],
+        [-p.top_width/2, -p.top_depth/2, -p.height_per_part],
+        [p.top_width/2, -p.top_depth/2, -p.height_per_part],
+        [p.top_width/2, p.top_depth/2, -p.height_per_part],
+        [-p.top_width/2, p.top_depth/2, -p.height_per_part],
     ]
 
-    for i in range(4):
-        next_i = (i + 1) % 4
-        v_idx = len(vertices)
-        vertices.extend([
-            top_outer[i],
-            top_outer[next_i],
-            bottom_outer_base[next_i],
-            bottom_outer_base[i]
-        ])
-        faces.append([v_idx, v_idx+1, v_idx+2])
-        faces.append([v_idx, v_idx+2, v_idx+3])
+    top_inner, circles = _lower_part_snap_inner(p)
+    builder = MeshBuilder()
+
+    # 外側の4つの壁（底まで）
+    builder.quad_strip(top_outer, bottom_outer_base)
 
     # 凹部の壁（段差）
-    for i in range(4):
-        next_i = (i + 1) % 4
-        v_idx = len(vertices)
-        vertices.extend([
-            top_outer[i],
-            top_outer[next_i],
-            step_inner[next_i],
-            step_inner[i]
-        ])
-        faces.append([v_idx, v_idx+2, v_idx+1])
-        faces.append([v_idx, v_idx+3, v_idx+2])
+    builder.quad_strip(top_outer, step_inner, flip=True)
+
+    if p.tolerance > 0:
+        # 許容誤差モード：曲がっているところだけ細かく分けた遷移面と、点の数が違う縁をつなぐ壁・蓋
+        inner_u, inner_shell = ruled_loft(lower_part_snap_surfaces(p)[0], p.tolerance)
+        center, radius, z_of_y = circles[1]
+        segments = circle_segments(radius, p.tolerance)
+        # 遷移面の下の縁（u = 0 が角度 corner_phase）と同じ角度から始める
+        bottom_inner_points = slanted_circle(center, radius, segments, z_of_y, corner_phase(top_inner, center))
+        builder.zip_strip(step_inner, inner_shell[0], range(4), inner_u)
+        builder.loft(inner_shell, flip=True)
+        builder.zip_strip(inner_shell[-1], bottom_inner_points, inner_u, 4 * np.arange(segments) / segments)
+        return builder.to_arrays()
+
+    bottom_outer_points, bottom_inner_points = (
+        slanted_circle(center, radius, p.segments, z_of_y) for center, radius, z_of_y in circles)
+
+    # 長方形→円の遷移面
+    inner_shell = loft_rect_to_circle(top_inner, bottom_outer_points, rings=p.loft_rings)
 
     # 段差から内側への壁
-    for i in range(4):
-        next_i = (i + 1) % 4
-        v_idx = len(vertices)
-        vertices.extend([
-            step_inner[i],
-            step_inner[next_i],
-            top_inner[next_i],
-            top_inner[i]
-        ])
-        faces.append([v_idx, v_idx+1, v_idx+2])
-        faces.append([v_idx, v_idx+2, v_idx+3])
+    builder.quad_strip(step_inner, top_inner)
 
     # 内側の面：長方形から円への接続
-    segments_per_edge = SEGMENTS // 4
-
-    for i in range(4):
-        next_i = (i + 1) % 4
-        top_start = np.array(top_inner[i])
-        top_end = np.array(top_inner[next_i])
-
-        for j in range(segments_per_edge):
-            circle_idx = i * segments_per_edge + j
-            next_circle_idx = (circle_idx + 1) % SEGMENTS
-
-            t1 = j / segments_per_edge
-            t2 = (j + 1) / segments_per_edge
-            rect_p1 = top_start + t1 * (top_end - top_start)
-            rect_p2 = top_start + t2 * (top_end - top_start)
-
-            circle_p1 = bottom_outer_points[circle_idx]
-            circle_p2 = bottom_outer_points[next_circle_idx]
-
-            v_idx = len(vertices)
-            vertices.extend([rect_p1.tolist(), rect_p2.tolist(), circle_p2, circle_p1])
-            faces.append([v_idx, v_idx+2, v_idx+1])
-            faces.append([v_idx, v_idx+3, v_idx+2])
+    builder.loft(inner_shell, flip=True)
 
     # 下部の蓋（円形のリング）
-    for i in range(SEGMENTS):
-        next_i = (i + 1) % SEGMENTS
-        v_idx = len(vertices)
-        vertices.extend([
-            bottom_outer_points[i],
-            bottom_outer_points[next_i],
-            bottom_inner_points[next_i],
-            bottom_inner_points[i]
-        ])
-        faces.append([v_idx, v_idx+1, v_idx+2])
-        faces.append([v_idx, v_idx+2, v_idx+3])
-
-    return np.array(vertices), np.array(faces)
-
-def save_stl(vertices, faces, filename):
-    """STLファイルに保存"""
-    coin_chute = mesh.Mesh(np.zeros(faces.shape[0], dtype=mesh.Mesh.dtype))
-
-    for i, face in enumerate(faces):
-        for j in range(3):
-            coin_chute.vectors[i][j] = vertices[face[j]]
-
-    coin_chute.save(filename)
-    print(f"✅ {filename} を生成しました")
+    builder.cap(bottom_outer_points, bottom_inner_points)
+
+    return builder.to_arrays()
 
 if __name__ == "__main__":
+    params = DEFAULT_PARAMS
+    cache = DesignCache()
+
     print("コインシュートSTLファイル生成中（はめ込み型・PETG用）...")
-    print(f"設計: 外見は240×315×{HEIGHT_PER_PART * 2}mmの直方体")
-    print(f"内側の底面のみ20度傾斜（高低差: {slope_drop:.1f}mm）")
-    print(f"穴の位置: 前端から{HOLE_POSITION}mm")
-    print(f"嵌合機構: 段差式（クリアランス: {CLEARANCE}mm、PETG用）")
+    print(f"設計: 外見は240×315×{params.height_per_part * 2}mmの直方体")
+    print(f"内側の底面のみ20度傾斜（高低差: {params.slope_drop:.1f}mm）")
+    print(f"穴の位置: 前端から{params.hole_position}mm")
+    print(f"嵌合機構: 段差式（クリアランス: {params.clearance}mm、PETG用）")
 
     # 上部パーツ生成
     print("\n上部パーツ生成中（はめ込み型・凸部付き）...")
-    upper_vertices, upper_faces = create_upper_part_snap()
-    save_stl(upper_vertices, upper_faces, "coin_chute_upper_snap.stl")
+    cache.save_stl(create_upper_part_snap, "coin_chute_upper_snap.stl", params)
 
     # 下部パーツ生成
     print(f"下部パーツ生成中（はめ込み型・凹部付き）...")
-    lower_vertices, lower_faces = create_lower_part_snap()
-    save_stl(lower_vertices, lower_faces, "coin_chute_lower_snap.stl")
+    cache.save_stl(create_lower_part_snap, "coin_chute_lower_snap.stl", params)
 
     print("\n✅ 完了！以下のファイルが生成されました:")
     print("- coin_chute_upper_snap.stl (上部パーツ: はめ込み型・凸部)")
     print("- coin_chute_lower_snap.stl (下部パーツ: はめ込み型・凹部)")
-    print(f"\n外見: 240×315×{HEIGHT_PER_PART * 2}mmの直方体")
-    print(f"内側傾斜角度: {SLOPE_ANGLE}度")
-    print(f"穴の位置: 前端から{HOLE_POSITION}mm")
-    print(f"嵌合: 段差式（段差{STEP_HEIGHT}mm、クリアランス{CLEARANCE}mm、PETG用）")
+    print(f"\n外見: 240×315×{params.height_per_part * 2}mmの直方体")
+    print(f"内側傾斜角度: {params.slope_angle}度")
+    print(f"穴の位置: 前端から{params.hole_position}mm")
+    print(f"嵌合: 段差式（段差{params.step_height}mm、クリアランス{params.clearance}mm、PETG用）")
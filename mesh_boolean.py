@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+メッシュのブーリアン演算（和・差・積）
+
+OpenSCAD の union() / difference() / intersection() と同じことを、閉じたインデックス付きメッシュ同士で行う
+1. A の三角形の外接箱で B の BVH を引き、交わるかもしれない三角形の組だけを残す
+2. 「A の辺 × B の三角形」「B の辺 × A の三角形」の交点を、辺と三角形の組ごとに1回だけまとめて求める
+   （隣り合う三角形が同じ交点を共有するので、切り口に T 字の継ぎ目ができない）
+3. 三角形の組ごとに、交点のうち交線の向きで両端の2点を切り口の線分とする
+4. 切り口の通る三角形だけ、その平面上で点を足して分け、線分が辺になるまで辺を入れ替える（Python のループ）
+5. 相手の近くの面は、中心から3方向に光線を飛ばし（bvh.BVH.intersect）、最初に当たった面の表裏の多数決で
+   相手の内側か外側かを決める。相手の面と重なる面は法線の向き（同じ / 逆）で決める
+   離れた面は、切り口を越えずにつながる領域ごとにまとめ、領域の判定の多数決にする（光線を飛ばさない）
+6. 演算ごとに残す面を選ぶ（差では B の内側の面を裏返して使う）
+
+面がぴったり重なる（同じ平面で一部だけ重なる）ところは分けないので、切り取る立体は相手の面から
+少しはみ出させる（OpenSCAD で difference() の相手を少し大きくするのと同じ）
+
+使い方:
+    python3 mesh_boolean.py difference a.stl b.stl -o out.stl
+"""
+
+import math
+import sys
+
+import numpy as np
+
+from mesh_builder import MeshBuilder
+from mesh_repair import clean_mesh
+from mesh_validate import AREA_EPSILON, WELD_TOLERANCE, group_keys, twin_half_edges, weld
+
+POINT_TOLERANCE = 1e-6   # mm（これより近い交点・頂点は同じ点にする）
+PLANE_TOLERANCE = 1e-7   # mm（平面からこれより近い頂点は平面上とみなす）
+COPLANAR_TOLERANCE = 1e-5  # mm（面の中心が相手の面からこれより近ければ、重なっている面とする）
+FLIP_LIMIT = 10000       # 1本の線分を辺にするための入れ替え回数の上限
+
+# 内外判定の光線の向き（辺や頂点をちょうど通りにくい、軸からずらした向き）
+RAY_DIRECTIONS = np.array([[0.5395, 0.6818, 0.4941], [-0.7071, 0.1531, 0.6903], [0.2213, -0.8346, -0.5043]])
+RAY_DIRECTIONS /= np.linalg.norm(RAY_DIRECTIONS, axis=1)[:, None]
+
+# 演算 → (A の残す面, B の残す面, B を裏返すか)
+# 面の状態: 外側 'outside' / 内側 'inside' / 重なって同じ向き 'same' / 重なって逆向き 'opposite'
+OPERATIONS = {
+    'union': ({'outside', 'same'}, {'outside'}, False),
+    'intersection': ({'inside', 'same'}, {'inside'}, False),
+    'difference': ({'outside', 'opposite'}, {'inside'}, True),
+}
+
+
+def _dot(x, y):
+    return np.einsum('ij,ij->i', x, y)
+
+
+def _edges(faces):
+    """半辺 3*面+k（辺 k→k+1）ごとの無向の辺の番号と、辺 (E, 2)"""
+    a = faces.reshape(-1)
+    b = faces[:, [1, 2, 0]].reshape(-1)
+    count = np.int64(max(int(faces.max()) + 1, 1)) if len(faces) else np.int64(1)
+    keys = np.minimum(a, b) * count + np.maximum(a, b)
+    order, starts, inverse = group_keys(keys)
+    return inverse, np.stack([a[order[starts]], b[order[starts]]], axis=1)
+
+
+def edge_triangle_points(p, q, a, b, c):
+    """線分 p→q と三角形 (a, b, c) の交点（各 (K, 3)）→ (交わるか, 交点)
+
+    端点が平面上にあればその端点、線分が平面に乗っている（同じ平面）ときは交わらないとする
+    """
+    normal = np.cross(b - a, c - a)
+    length = np.linalg.norm(normal, axis=1)
+    valid = length > 0
+    unit = normal / np.where(valid, length, 1)[:, None]
+    dp, dq = _dot(p - a, unit), _dot(q - a, unit)
+    on_p, on_q = np.abs(dp) <= PLANE_TOLERANCE, np.abs(dq) <= PLANE_TOLERANCE
+    crossing = (dp * dq < 0) & ~on_p & ~on_q
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(crossing, dp / (dp - dq), np.where(on_q & ~on_p, 1.0, 0.0))
+    point = p + t[:, None] * (q - p)
+    hit = valid & (crossing | (on_p ^ on_q))
+
+    # 三角形の中（辺の上も含む）か: 各辺から見た面積の符号
+    area = length ** 2
+    tolerance = -1e-9 * area
+    for u, v in [(a, b), (b, c), (c, a)]:
+        hit &= _dot(np.cross(v - u, point - u), normal) >= tolerance
+    return hit, point
+
+
+def _pair_segments(vertices_a, faces_a, vertices_b, faces_b, first, second):
+    """三角形の組 (first: A の番号, second: B の番号) の切り口 → (点の表, 組の番号, 始点, 終点, 点の表での A・B の頂点の番号)"""
+    edge_of_a, edges_a = _edges(faces_a)
+    edge_of_b, edges_b = _edges(faces_b)
+    pairs = len(first)
+
+    def hits(edge_of, edges, vertices, triangles_vertices, triangles_faces, own, other):
+        # 辺と相手の三角形の組を一意にしてから交点を求める
+        edge = edge_of.reshape(-1, 3)[own].reshape(-1)
+        target = np.repeat(other, 3)
+        keys = edge * np.int64(len(triangles_faces)) + target
+        order, starts, inverse = group_keys(keys)
+        unique_edge, unique_target = edge[order[starts]], target[order[starts]]
+        tri = triangles_vertices[triangles_faces[unique_target]]
+        hit, point = edge_triangle_points(vertices[edges[unique_edge, 0]], vertices[edges[unique_edge, 1]],
+                                          tri[:, 0], tri[:, 1], tri[:, 2])
+        return hit, point, inverse.reshape(pairs, 3)
+
+    hit_a, point_a, combo_a = hits(edge_of_a, edges_a, vertices_a, vertices_b, faces_b, first, second)
+    hit_b, point_b, combo_b = hits(edge_of_b, edges_b, vertices_b, vertices_a, faces_a, second, first)
+
+    # 頂点と交点をまとめて溶接し、同じ位置の点を1つにする
+    pool = np.concatenate([vertices_a, vertices_b, point_a[hit_a], point_b[hit_b]])
+    points, ids = weld(pool, np.arange(len(pool)), POINT_TOLERANCE)
+    offset = len(vertices_a) + len(vertices_b)
+    id_a = np.full(len(hit_a), -1)
+    id_a[hit_a] = ids[offset:offset + hit_a.sum()]
+    id_b = np.full(len(hit_b), -1)
+    id_b[hit_b] = ids[offset + hit_a.sum():]
+    candidates = np.concatenate([id_a[combo_a], id_b[combo_b]], axis=1)  # (組, 6)
+
+    # 交線の向きに並べて両端を取る（同じ平面の組は切り口を作らない）
+    tri_a = vertices_a[faces_a[first]]
+    tri_b = vertices_b[faces_b[second]]
+    direction = np.cross(np.cross(tri_a[:, 1] - tri_a[:, 0], tri_a[:, 2] - tri_a[:, 0]),
+                         np.cross(tri_b[:, 1] - tri_b[:, 0], tri_b[:, 2] - tri_b[:, 0]))
+    position = np.einsum('pkj,pj->pk', points[np.maximum(candidates, 0)], direction)
+    valid = candidates >= 0
+    start = candidates[np.arange(pairs), np.argmin(np.where(valid, position, np.inf), axis=1)]
+    stop = candidates[np.arange(pairs), np.argmax(np.where(valid, position, -np.inf), axis=1)]
+    keep = (valid.sum(axis=1) >= 2) & (start != stop) & np.any(direction != 0, axis=1)
+    return points, np.flatnonzero(keep), start[keep], stop[keep], ids[:len(vertices_a)], \
+        ids[len(vertices_a):len(vertices_a) + len(vertices_b)]
+
+
+def _orient(p, q, r):
+    return (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+
+
+def _crosses(p, q, r, s):
+    """線分 pq と rs が端点以外で交わる"""
+    return (_orient(p, q, r) * _orient(p, q, s) < 0) and (_orient(r, s, p) * _orient(r, s, q) < 0)
+
+
+def _edge_points(mesh, points, cuts):
+    """切り口の端が三角形の辺の上にあるとき、その辺の向こうの三角形にも足す点 → {面の番号: [点の番号]}
+
+    （交点が三角形の対角線にちょうど乗ると、隣の三角形には切り口がなくても頂点が要る。足さないと T 字になる）
+    """
+    twin = twin_half_edges(mesh)
+    extra = {}
+    for number, segments in cuts.items():
+        corners = points[mesh[number]]
+        ends = sorted({index for cut in segments for index in cut} - set(mesh[number].tolist()))
+        for k in range(3):
+            neighbor = twin[3 * number + k]
+            if neighbor < 0:
+                continue
+            p, q = corners[k], corners[(k + 1) % 3]
+            length = np.dot(q - p, q - p)
+            for index in ends:
+                t = np.dot(points[index] - p, q - p) / length
+                offset = points[index] - (p + t * (q - p))
+                if 0 < t < 1 and np.dot(offset, offset) <= POINT_TOLERANCE ** 2:
+                    extra.setdefault(int(neighbor) // 3, []).append(index)
+    return extra
+
+
+def split_triangle(corners, normal, points, cuts, extra=()):
+    """三角形 corners（点の番号3つ）を、切り口の線分 cuts [(始点, 終点)] が辺になるように分ける
+
+    points: 点の表 (P, 3)。extra: 頂点として足すだけの点（隣の三角形の切り口が辺の上で終わる点）
+    戻り値: 三角形 [(i, j, k)]（元の三角形と同じ向き）
+    """
+    # 法線の成分が最も大きい軸を落として 2D にする（向きが変わらないよう軸の順番を選ぶ）
+    axis = int(np.argmax(np.abs(normal)))
+    keep = [(axis + 1) % 3, (axis + 2) % 3] if normal[axis] > 0 else [(axis + 2) % 3, (axis + 1) % 3]
+    used = set(corners) | set(extra)
+    for cut in cuts:
+        used.update(cut)
+    order = sorted(used)
+    xy = dict(zip(order, map(tuple, points[order][:, keep].tolist())))
+    scale = max(abs(value) for x, y in xy.values() for value in (x, y)) or 1.0
+    epsilon = 1e-12 * scale
+    snap = max(epsilon, POINT_TOLERANCE)  # 辺の上とみなす距離（_edge_points と同じ）
+
+    triangles = [tuple(corners)]
+    if _orient(*(xy[i] for i in corners)) <= 0:
+        return triangles
+
+    def distance(i, j, k):
+        """k の、辺 i→j からの左側への距離"""
+        p, q = xy[i], xy[j]
+        return _orient(p, q, xy[k]) / (math.hypot(q[0] - p[0], q[1] - p[1]) or 1.0)
+
+    # 点を1つずつ足す（三角形の中なら3つに、辺の上ならその辺の両側を2つずつに分ける）
+    # 切り口の点は続けて近くに来ることが多いので、新しくできた三角形から探す
+    for index in sorted(used - set(corners)):
+        for number in range(len(triangles) - 1, -1, -1):
+            i, j, k = triangles[number]
+            sides = [distance(i, j, index), distance(j, k, index), distance(k, i, index)]
+            if min(sides) < -snap:
+                continue
+            on_edge = [side <= snap for side in sides]
+            if sum(on_edge) >= 2:
+                break  # 既存の頂点と同じ位置
+            del triangles[number]
+            if not any(on_edge):
+                triangles += [(i, j, index), (j, k, index), (k, i, index)]
+                break
+            u, v, w = [(i, j, k), (j, k, i), (k, i, j)][on_edge.index(True)]
+            triangles += [(u, index, w), (index, v, w)]
+            for other, (x, y, z) in enumerate(triangles):
+                for a, b, c in [(x, y, z), (y, z, x), (z, x, y)]:
+                    if (a, b) == (v, u):
+                        del triangles[other]
+                        triangles += [(v, index, c), (index, u, c)]
+                        break
+                else:
+                    continue
+                break
+            break
+
+    # 線分が辺になるまで、線分と交わる辺を入れ替える（Sloan の方法）
+    pending = list(cuts)
+    while pending:
+        u, v = pending.pop()
+        if u == v:
+            continue
+        # 線分の途中に乗っている点があれば、そこで2本に分ける
+        inner = [k for k in xy if k not in (u, v) and abs(distance(u, v, k)) <= epsilon
+                 and 0 < np.dot(np.subtract(xy[k], xy[u]), np.subtract(xy[v], xy[u]))
+                 < np.dot(np.subtract(xy[v], xy[u]), np.subtract(xy[v], xy[u]))]
+        if inner:
+            pending += [(u, inner[0]), (inner[0], v)]
+            continue
+        edges = {(a, b) for t in triangles for a, b in [(t[0], t[1]), (t[1], t[2]), (t[2], t[0])]}
+        if (u, v) in edges or (v, u) in edges:
+            continue
+        crossing = [(a, b) for a, b in edges if a < b and not {a, b} & {u, v}
+                    and _crosses(xy[u], xy[v], xy[a], xy[b])]
+        for _ in range(FLIP_LIMIT):
+            if not crossing:
+                break
+            a, b = crossing.pop(0)
+            first = next(t for t in triangles if (a, b) in [(t[0], t[1]), (t[1], t[2]), (t[2], t[0])])
+            second = next(t for t in triangles if (b, a) in [(t[0], t[1]), (t[1], t[2]), (t[2], t[0])])
+            k = next(x for x in first if x not in (a, b))
+            l = next(x for x in second if x not in (a, b))
+            if distance(l, b, k) <= epsilon or distance(k, a, l) <= epsilon:
+                crossing.append((a, b))  # 凸でない（または3点が一直線の）四角形は後回し
+                continue
+            triangles.remove(first)
+            triangles.remove(second)
+            triangles += [(k, a, l), (l, b, k)]
+            if not {k, l} & {u, v} and _crosses(xy[u], xy[v], xy[k], xy[l]):
+                crossing.append((k, l))
+    return triangles
+
+
+def classify(triangles, tree, normals):
+    """面 (K, 3, 3) を相手のメッシュ（tree: BVH, normals: 相手の面の外向き法線）から見た状態の配列にする"""
+    centers = triangles.mean(axis=1)
+    own = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    own /= np.maximum(np.linalg.norm(own, axis=1), 1e-300)[:, None]
+    state = np.full(len(triangles), 'outside', dtype=object)
+
+    votes = np.zeros(len(triangles), dtype=np.int64)
+    for direction in RAY_DIRECTIONS:
+        _, hit = tree.intersect(centers, np.broadcast_to(direction, centers.shape))
+        votes += (hit >= 0) & (normals[np.maximum(hit, 0)] @ direction > 0)
+    state[votes * 2 > len(RAY_DIRECTIONS)] = 'inside'
+
+    _, distance, nearest = tree.closest(centers, COPLANAR_TOLERANCE)
+    touching = np.flatnonzero(np.isfinite(distance))
+    alignment = _dot(own[touching], normals[nearest[touching]])
+    parallel = np.abs(alignment) > 1 - 1e-6
+    state[touching[parallel & (alignment > 0)]] = 'same'
+    state[touching[parallel & (alignment < 0)]] = 'opposite'
+    return state
+
+
+def _edge_keys(faces, count):
+    """半辺 3*面+k（辺 k→k+1）の無向の辺のキー"""
+    a = faces.reshape(-1)
+    b = faces[:, [1, 2, 0]].reshape(-1)
+    return np.minimum(a, b) * np.int64(count) + np.maximum(a, b)
+
+
+def _regions(faces, blocked):
+    """blocked でない半辺でつながる面に同じ番号を付ける → 面ごとの番号（番号はその中の最小の面の番号）"""
+    twin = twin_half_edges(faces)
+    linked = (twin >= 0) & ~blocked
+    a, b = np.flatnonzero(linked) // 3, twin[linked] // 3
+
+    # 隣の小さいラベルをもらい、ラベルの先のラベルへ飛ぶ（ポインタジャンプ）を変わらなくなるまでくり返す
+    label = np.arange(len(faces))
+    while True:
+        smaller = label.copy()
+        np.minimum.at(smaller, a, label[b])
+        smaller = smaller[smaller]
+        if np.array_equal(smaller, label):
+            return label
+        label = smaller
+
+
+def classify_pieces(points, faces, near, seam, tree, normals):
+    """分けた面 faces の状態を決める（光線を飛ばすのは相手の近くの面と、離れた領域ごとに1面だけ）
+
+    near: 相手と外接箱が重なる元の面から分けた面。seam: 切り口の半辺（ここで内外が入れ替わる）
+    切り口を越えずにつながる面は内外が同じなので、離れた面は同じ領域の判定の多数決にする
+    """
+    label = _regions(faces, seam)
+    _, first = np.unique(label, return_index=True)
+    cast = near.copy()
+    cast[first[~np.isin(first, np.flatnonzero(near))]] = True  # 近くの面がない領域は代表の1面
+    state = np.full(len(faces), 'outside', dtype=object)
+    state[cast] = classify(points[faces[cast]], tree, normals)
+
+    voted = cast & np.isin(state, ['inside', 'outside'])
+    inside = np.bincount(label[voted], weights=state[voted] == 'inside', minlength=len(faces))
+    total = np.bincount(label[voted], minlength=len(faces))
+    state[~cast] = np.where(inside[label[~cast]] * 2 > total[label[~cast]], 'inside', 'outside')
+    return state
+
+
+def boolean(first, second, operation):
+    """閉じたメッシュ (頂点, 面) 2つのブーリアン演算 → (頂点, 面)
+
+    operation: 'union'（和）/ 'difference'（first から second を引く）/ 'intersection'（積）
+    """
+    from bvh import build_bvh
+    from stl_export import face_normals
+
+    if operation not in OPERATIONS:
+        raise ValueError(f"不明な演算: {operation}（{', '.join(OPERATIONS)}）")
+    vertices_a, faces_a = clean_mesh(*first)
+    vertices_b, faces_b = clean_mesh(*second)
+    triangles_a, triangles_b = vertices_a[faces_a], vertices_b[faces_b]
+    tree_a, tree_b = build_bvh(triangles_a), build_bvh(triangles_b)
+
+    # 外接箱が重なる三角形の組だけを調べる
+    lo, hi = triangles_a.min(axis=1), triangles_a.max(axis=1)
+    pair_a, pair_b = tree_b.overlap(lo - PLANE_TOLERANCE, hi + PLANE_TOLERANCE)
+    points, pair, start, stop, ids_a, ids_b = _pair_segments(vertices_a, faces_a, vertices_b, faces_b,
+                                                            pair_a, pair_b)
+    mesh_a, mesh_b = ids_a[faces_a], ids_b[faces_b]
+
+    def pieces(mesh, triangles, owner):
+        """切り口の通る三角形を分けた面 (F, 3) と、元の面の番号"""
+        cuts = {}
+        for number, u, v in zip(owner[pair].tolist(), start.tolist(), stop.tolist()):
+            cuts.setdefault(number, []).append((u, v))
+        extra = _edge_points(mesh, points, cuts)
+        for number in extra:
+            cuts.setdefault(number, [])
+        uncut = np.ones(len(mesh), dtype=bool)
+        uncut[list(cuts)] = False
+        faces, source = [mesh[uncut]], [np.flatnonzero(uncut)]
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        for number, segments in cuts.items():
+            split = split_triangle(mesh[number].tolist(), normals[number], points, segments, extra.get(number, ()))
+            faces.append(np.array(split, dtype=np.int64).reshape(-1, 3))
+            source.append(np.full(len(split), number))
+        return np.concatenate(faces), np.concatenate(source)
+
+    keep_a, keep_b, flip_b = OPERATIONS[operation]
+    pieces_a, source_a = pieces(mesh_a, triangles_a, pair_a)
+    pieces_b, source_b = pieces(mesh_b, triangles_b, pair_b)
+
+    # 切り口は A と B の両方の面の辺になっている
+    keys_a, keys_b = _edge_keys(pieces_a, len(points)), _edge_keys(pieces_b, len(points))
+    seam = np.intersect1d(keys_a, keys_b)
+    state_a = classify_pieces(points, pieces_a, np.isin(source_a, pair_a), np.isin(keys_a, seam),
+                              tree_b, face_normals(triangles_b.copy()))
+    state_b = classify_pieces(points, pieces_b, np.isin(source_b, pair_b), np.isin(keys_b, seam),
+                              tree_a, face_normals(triangles_a.copy()))
+    kept_b = pieces_b[np.isin(state_b, list(keep_b))]
+    if flip_b:
+        kept_b = kept_b[:, [0, 2, 1]]
+    faces = np.concatenate([pieces_a[np.isin(state_a, list(keep_a))], kept_b])
+
+    # 使わない点を除いて番号を詰め、STL の精度（WELD_TOLERANCE）より短い辺は潰す
+    # （ほとんど接するところの交点は細い面になり、保存すると縮退するため）
+    used, faces = np.unique(faces, return_inverse=True)
+    vertices, faces = weld(points[used], faces.reshape(-1, 3), WELD_TOLERANCE)
+    distinct = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+    return vertices, flip_slivers(vertices, faces[distinct])
+
+
+def flip_slivers(vertices, faces, rounds=3):
+    """面積がほぼゼロの面（3点が一直線）を、一番長い辺を隣の面と入れ替えてなくす → 面
+
+    一直線の3点の真ん中を m、長い辺を a→b、隣の面を (b, a, c) とすると、(a, c, m) と (c, b, m) にする
+    （面を消すと T 字の継ぎ目になるが、入れ替えなら閉じたまま）
+    """
+    faces = faces.copy()
+    for _ in range(rounds):
+        t = vertices[faces]
+        cross = np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])
+        slivers = np.flatnonzero(_dot(cross, cross) <= AREA_EPSILON ** 2)
+        if len(slivers) == 0:
+            break
+        twin = twin_half_edges(faces)
+        lengths = np.linalg.norm(t[slivers][:, [1, 2, 0]] - t[slivers], axis=2)
+        done = set()
+        for number, k in zip(slivers.tolist(), np.argmax(lengths, axis=1).tolist()):
+            half = int(twin[3 * number + k])
+            other = half // 3
+            if half < 0 or number in done or other in done:
+                continue
+            a, b, m = faces[number, k], faces[number, (k + 1) % 3], faces[number, (k + 2) % 3]
+            c = faces[other, (half % 3 + 2) % 3]
+            if c == m:
+                continue
+            faces[number], faces[other] = (a, c, m), (c, b, m)
+            done.update((number, other))
+    return faces
+
+
+def union(first, second):
+    return boolean(first, second, 'union')
+
+
+def difference(first, second):
+    return boolean(first, second, 'difference')
+
+
+def intersection(first, second):
+    return boolean(first, second, 'intersection')
+
+
+def prism(polygon, z0, z1):
+    """xy の多角形（凸、反時計回り）を z0 から z1 まで押し出した閉じた立体 (頂点, 面)"""
+    polygon = np.asarray(polygon, dtype=np.float64)
+    bottom = np.column_stack([polygon, np.full(len(polygon), z0)])
+    top = np.column_stack([polygon, np.full(len(polygon), z1)])
+    builder = MeshBuilder()
+    builder.quad_strip(bottom, top)
+    builder.cap(top)
+    builder.cap(bottom, flip=True)
+    return builder.to_arrays()
+
+
+def box(lo, hi):
+    """軸に平行な直方体 (頂点, 面)"""
+    (x0, y0, z0), (x1, y1, z1) = lo, hi
+    return prism([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], z0, z1)
+
+
+def cylinder(center, radius, z0, z1, segments=64):
+    """z 軸に平行な円柱（正 segments 角柱）(頂点, 面)"""
+    angle = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    return prism(np.column_stack([center[0] + radius * np.cos(angle), center[1] + radius * np.sin(angle)]), z0, z1)
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from mesh_validate import validate
+    from stl_export import save_stl
+    from stl_reader import MappedSTL
+
+    parser = argparse.ArgumentParser(description='2つの閉じたメッシュのブーリアン演算')
+    parser.add_argument('operation', choices=list(OPERATIONS))
+    parser.add_argument('first', help='STLファイル A')
+    parser.add_argument('second', help='STLファイル B（difference では A から引く側）')
+    parser.add_argument('-o', '--out', default='boolean.stl', help='出力する STL ファイル')
+    args = parser.parse_args(argv)
+
+    meshes = [weld(MappedSTL(path).vectors) for path in (args.first, args.second)]
+    start = time.perf_counter()
+    vertices, faces = boolean(meshes[0], meshes[1], args.operation)
+    elapsed = time.perf_counter() - start
+    report = validate(vertices, faces)
+    mark = '✅' if report.ok else '❌'
+    print(f"{mark} {args.operation}: {elapsed * 1e3:.0f} ms / {report.summary()}")
+    save_stl(vertices, faces, args.out)
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+インデックス付きメッシュ構築モジュール
+各 create_*_part で共通して使う MeshBuilder
+
+- 頂点・面は事前確保した NumPy 配列に書き込む（足りなくなったら倍に拡張）
+- 同じ座標の頂点は1つのインデックスに溶接する
+- 四角形はすべて (a, b, c, d) → [a, b, c], [a, c, d] の2三角形に分割
+  flip=True のときは [a, c, b], [a, d, c]（法線が逆向き）
+- 許容誤差モード: 長方形 → 円の線織面 S(u, v) を、弦の誤差（曲面と三角形のずれ）が tolerance を
+  超えるところだけ u 方向に細かく分ける（adaptive_rulings）。点の数が違う2本の点列は zip_strip でつなぐ
+"""
+
+import math
+
+import numpy as np
+
+ADAPTIVE_LEVELS = 24         # adaptive_rulings の分割のくり返しの上限
+ADAPTIVE_MAX_RULINGS = 100_000  # これを超えたら分割をやめる
+RULING_SAMPLES = (7, 16)     # adaptive_rulings で帯1つの誤差を測る点の数（u 方向, v 方向）
+RULING_MARGIN = 0.9          # 測った点の間で誤差が少し大きくなる分、tolerance より少し細かく分ける
+ERROR_SAMPLES = (509, 31)    # surface_error で曲面を測る格子（u 方向, v 方向。頂点の u, v と重ならない素数）
+
+
+class MeshBuilder:
+    """頂点を溶接しながら三角形メッシュを組み立てる"""
+
+    def __init__(self, vertex_capacity=64, face_capacity=128):
+        self._vertices = np.empty((vertex_capacity, 3), dtype=np.float64)
+        self._faces = np.empty((face_capacity, 3), dtype=np.intp)
+        self.vertex_count = 0
+        self.face_count = 0
+        # 座標 → 頂点インデックス（溶接用）
+        self._index = {}
+
+    @property
+    def vertices(self):
+        return self._vertices[:self.vertex_count]
+
+    @property
+    def faces(self):
+        return self._faces[:self.face_count]
+
+    def _reserve_vertices(self, count):
+        needed = self.vertex_count + count
+        if needed > len(self._vertices):
+            capacity = max(needed, 2 * len(self._vertices))
+            grown = np.empty((capacity, 3), dtype=np.float64)
+            grown[:self.vertex_count] = self.vertices
+            self._vertices = grown
+
+    def _reserve_faces(self, count):
+        needed = self.face_count + count
+        if needed > len(self._faces):
+            capacity = max(needed, 2 * len(self._faces))
+            grown = np.empty((capacity, 3), dtype=np.intp)
+            grown[:self.face_count] = self.faces
+            self._faces = grown
+
+    def add_points(self, points):
+        """
+        点列 (N, 3) を追加して頂点インデックス (N,) を返す
+        既に登録済みの座標は同じインデックスを再利用する
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        # 新しい座標には登録順に連番を振る（インデックス = 辞書の大きさ）
+        index = self._index
+        start = len(index)
+        indices = np.fromiter(
+            (index.setdefault(key, len(index)) for key in map(tuple, points.tolist())),
+            dtype=np.intp, count=len(points))
+
+        if len(index) > start:
+            self._reserve_vertices(len(index) - start)
+            new = indices >= start
+            self._vertices[indices[new]] = points[new]
+            self.vertex_count = len(index)
+
+        return indices
+
+    def add_faces(self, faces):
+        """三角形の頂点インデックス (M, 3) をそのまま追加"""
+        faces = np.asarray(faces, dtype=np.intp).reshape(-1, 3)
+        self._reserve_faces(len(faces))
+        end = self.face_count + len(faces)
+        self._faces[self.face_count:end] = faces
+        self.face_count = end
+
+    def add_quads(self, a, b, c, d, flip=False):
+        """
+        四角形 (a, b, c, d) の並びを2三角形ずつ追加
+        a, b, c, d は頂点インデックスの配列（同じ長さ）
+        """
+        a, b, c, d = (np.asarray(x, dtype=np.intp).reshape(-1) for x in (a, b, c, d))
+        quads = np.empty((len(a), 2, 3), dtype=np.intp)
+        if flip:
+            quads[:, 0] = np.stack([a, c, b], axis=1)
+            quads[:, 1] = np.stack([a, d, c], axis=1)
+        else:
+            quads[:, 0] = np.stack([a, b, c], axis=1)
+            quads[:, 1] = np.stack([a, c, d], axis=1)
+        self.add_faces(quads.reshape(-1, 3))
+
+    def quad(self, p0, p1, p2, p3, flip=False):
+        """座標で指定した四角形を1つ追加"""
+        a, b, c, d = self.add_points([p0, p1, p2, p3])
+        self.add_quads(a, b, c, d, flip=flip)
+
+    def quad_strip(self, ring_a, ring_b, closed=True, flip=False):
+        """
+        2本の点列の間を四角形で埋める
+        四角形 i は (a[i], a[i+1], b[i+1], b[i])
+        closed=True なら最後の点から最初の点へも接続する
+        """
+        a = self.add_points(ring_a)
+        b = self.add_points(ring_b)
+        if closed:
+            a_next = np.roll(a, -1)
+            b_next = np.roll(b, -1)
+        else:
+            a, a_next = a[:-1], a[1:]
+            b, b_next = b[:-1], b[1:]
+        self.add_quads(a, a_next, b_next, b, flip=flip)
+
+    def loft(self, rings, closed=True, flip=False):
+        """リング列 [r0, r1, ...] を順に quad_strip でつなぐ"""
+        for ring_a, ring_b in zip(rings[:-1], rings[1:]):
+            self.quad_strip(ring_a, ring_b, closed=closed, flip=flip)
+
+    def cap(self, outer, inner=None, flip=False):
+        """
+        蓋を追加
+        inner があれば outer と inner の間のリング状の蓋、
+        なければ outer[0] を中心にした扇形分割
+        """
+        if inner is not None:
+            self.quad_strip(outer, inner, closed=True, flip=flip)
+            return
+
+        ring = self.add_points(outer)
+        center = np.full(len(ring) - 2, ring[0])
+        b, c = ring[1:-1], ring[2:]
+        if flip:
+            b, c = c, b
+        self.add_faces(np.stack([center, b, c], axis=1))
+
+    def zip_strip(self, ring_a, ring_b, t_a, t_b, flip=False):
+        """
+        点の数が違う2本の閉じた点列の間を三角形で埋める（quad_strip と同じ向き）
+        t_a, t_b: 各点のパラメータ（どちらも同じ値から始まって増える。例: adaptive_rulings の u）
+        次の点のパラメータが小さい方の列を1つ進め、進めた列の2点と相手の1点で三角形を作る
+        """
+        a = self.add_points(ring_a)
+        b = self.add_points(ring_b)
+        t_a, t_b = np.asarray(t_a, dtype=np.float64), np.asarray(t_b, dtype=np.float64)
+        end = max(t_a[-1], t_b[-1]) + 1.0  # 最後の点から最初の点へ戻る辺は一番後に進める
+        events = np.concatenate([np.append(t_a[1:], end), np.append(t_b[1:], end)])
+        on_a = np.arange(len(events)) < len(a)
+        order = np.lexsort((~on_a, events))  # 同じ値なら a を先に進める
+        on_a = on_a[order]
+        i = np.cumsum(on_a) - on_a   # それまでに進めた a の数
+        j = np.cumsum(~on_a) - ~on_a
+        a0, a1 = a[i % len(a)], a[(i + 1) % len(a)]
+        b0, b1 = b[j % len(b)], b[(j + 1) % len(b)]
+        faces = np.where(on_a[:, None], np.stack([a0, a1, b0], axis=1), np.stack([a0, b1, b0], axis=1))
+        self.add_faces(faces[:, [0, 2, 1]] if flip else faces)
+
+    def to_arrays(self):
+        """(vertices, faces) のコピーを返す"""
+        return self.vertices.copy(), self.faces.copy()
+
+
+def rectangle_ring(corners, segments_per_edge):
+    """
+    4頂点の長方形の各辺を segments_per_edge 等分した点列を返す
+    辺 i 上の点 j は corners[i] + (j / segments_per_edge) * (corners[i+1] - corners[i])
+    corners は (..., 4, 3)、戻り値は (..., 4 * segments_per_edge, 3)
+    """
+    starts = np.asarray(corners, dtype=np.float64)
+    ends = np.roll(starts, -1, axis=-2)
+    t = np.arange(segments_per_edge) / segments_per_edge
+    points = starts[..., :, None, :] + t[:, None] * (ends - starts)[..., :, None, :]
+    return points.reshape(*starts.shape[:-2], -1, 3)
+
+
+def slanted_circle(center, radius, segments, z_of_y, start=0.0):
+    """
+    円周上の点列 (segments, 3) を返す（角度 start から反時計回り）
+    z は y の関数 z_of_y(y)（傾斜面に沿わせる）
+    """
+    angle = start + 2 * np.pi * np.arange(segments) / segments
+    x = center[0] + radius * np.cos(angle)
+    y = center[1] + radius * np.sin(angle)
+    return np.stack([x, y, z_of_y(y)], axis=-1)
+
+
+def corner_phase(corners, center):
+    """
+    長方形の角 i を円周の角度 φ + π/2·i の点につなぐときの φ（面のねじれが一番小さくなる角度）
+    円の中心から見た角 i の向きと π/2·i との差の円周平均。左右対称な長方形なら手前左の角の 225°
+    corners は (..., 4, 3)、center は (..., 2)
+    """
+    corners = np.asarray(corners, dtype=np.float64)
+    offset = corners[..., :2] - np.asarray(center, dtype=np.float64)[..., None, :]
+    angle = np.arctan2(offset[..., 1], offset[..., 0]) - np.pi / 2 * np.arange(4)
+    return np.arctan2(np.sin(angle).sum(axis=-1), np.cos(angle).sum(axis=-1))
+
+
+def smoothstep(t):
+    """端で接線が0になる補間係数（3t² - 2t³）"""
+    return t * t * (3 - 2 * t)
+
+
+def loft_rect_to_circle(corners, circle, rings=1, blend=None):
+    """
+    長方形から円周へのロフト面のリング列を一括生成
+
+    corners: 長方形の4頂点 (..., 4, 3)
+    circle:  円周の点列 (..., N, 3)、N は4の倍数
+    rings:   長方形と円の間の分割数（rings=1 なら長方形と円を直接つなぐ）
+    blend:   水平方向の補間係数 t → w（None なら線形、smoothstep で滑らかに）
+
+    外側と内側を (2, 4, 3), (2, N, 3) で渡せば両方のシェルを1回で作れる
+    戻り値は (..., rings + 1, N, 3)。そのまま MeshBuilder.loft に渡せる
+
+    円周の点列は、長方形の角 i が角度 corner_phase + π/2·i に一番近い点とつながるように回してから使う
+    （回さないと、円の1点目（0°）と手前左の角（225°）を結ぶので面が 135° ねじれて出口の上をふさぐ）
+    """
+    circle = np.asarray(circle, dtype=np.float64)
+    segments = circle.shape[-2]
+    rect = rectangle_ring(corners, segments // 4)
+
+    center = circle[..., :2].mean(axis=-2)
+    first = circle[..., 0, :2] - center
+    turn = corner_phase(corners, center) - np.arctan2(first[..., 1], first[..., 0])
+    shift = np.round(turn / (2 * np.pi / segments)).astype(np.intp) % segments
+    circle = np.take_along_axis(circle, ((np.arange(segments) + shift[..., None]) % segments)[..., None], axis=-2)
+
+    t = np.arange(rings + 1) / rings
+    w = t if blend is None else blend(t)
+    weights = np.stack([w, w, t], axis=-1)[:, None, :]  # (rings + 1, 1, 3)
+
+    start = rect[..., None, :, :]
+    rings_out = start + weights * (circle[..., None, :, :] - start)
+    # 両端は元の点列と完全に一致させる（蓋との溶接のため）
+    rings_out[..., 0, :, :] = rect
+    rings_out[..., -1, :, :] = circle
+    return rings_out
+
+
+def circle_segments(radius, tolerance):
+    """弦と円弧のずれ（矢高 r(1 - cos(π/n))）が tolerance 以下になる分割数（4の倍数）"""
+    if tolerance >= radius:
+        return 4
+    n = math.pi / math.acos(1 - tolerance / radius)
+    return max(4, 4 * math.ceil(n / 4))
+
+
+def rect_circle_surface(corners, circle_center, radius, z_of_y):
+    """
+    長方形 → 円のロフト面（loft_rect_to_circle を細かくしていった極限の曲面）S(u, v) を返す
+    u ∈ [0, 4): 長方形の辺 floor(u) の上の点と、角度 φ + π/2·u（φ = corner_phase）の円周の点を結ぶ
+               （loft_rect_to_circle と同じ対応。円周の点を回す分だけ φ が丸められる）
+    v ∈ [0, 1]: 長方形（v=0）から円（v=1）までの直線（線織面）
+    v=0 では長方形の点、v=1 では円周の点と完全に同じ座標を返す（蓋との溶接のため）
+    """
+    corners = np.asarray(corners, dtype=np.float64)
+    phase = corner_phase(corners, circle_center)
+
+    def surface(u, v):
+        u, v = np.asarray(u, dtype=np.float64), np.asarray(v, dtype=np.float64)
+        edge = np.floor(u).astype(np.intp) % 4
+        along = (u - np.floor(u))[:, None]
+        rect = corners[edge] + along * (corners[(edge + 1) % 4] - corners[edge])
+        angle = phase + np.pi / 2 * u
+        x = circle_center[0] + radius * np.cos(angle)
+        y = circle_center[1] + radius * np.sin(angle)
+        circle = np.stack([x, y, z_of_y(y)], axis=-1)
+        points = rect + v[:, None] * (circle - rect)
+        points[v == 0] = rect[v == 0]
+        points[v == 1] = circle[v == 1]
+        return points
+
+    return surface
+
+
+def adaptive_rulings(surface, tolerance, knots=(0, 1, 2, 3), period=4):
+    """
+    線織面 S(u, v)（u を止めると v 方向は直線。u は period で一周）を loft でつなぐときの u の列
+    戻り値: 増えていく u (K,)。S(u, 0) と S(u, 1) の2本の点列を loft（rings=1）でつなげば、
+    曲面とのずれ（弦の誤差）が tolerance 以下になる
+
+    knots の u（折れ目。長方形の角など）で区切った帯から始め、帯の中の点 S(u, v) と
+    その帯の2つの三角形との距離を測り、tolerance を超えた帯だけ u の中点で2つに分ける
+    - ねじれの小さい帯・円の曲がりの小さい帯は分けないので、一様な分割より三角形が少なくて済む
+    - 線織面では u 方向を細かくするのが一番効く（v 方向に段を入れても誤差はほとんど減らない）
+    """
+    from bvh import closest_points
+
+    fractions = np.arange(1, RULING_SAMPLES[0] + 1) / (RULING_SAMPLES[0] + 1)
+    heights = np.arange(1, RULING_SAMPLES[1] + 1) / RULING_SAMPLES[1]
+    rulings = np.sort(np.asarray(knots, dtype=np.float64))
+    pending = np.ones(len(rulings), dtype=bool)  # 帯 [rulings[i], rulings[i+1]] を測るか
+    for _ in range(ADAPTIVE_LEVELS):
+        start = rulings[pending]
+        end = np.append(rulings, rulings[0] + period)[1:][pending]
+        a0, a1 = surface(start, np.zeros(len(start))), surface(end, np.zeros(len(end)))
+        b0, b1 = surface(start, np.ones(len(start))), surface(end, np.ones(len(end)))
+
+        # 帯の中の点（u, v とも RULING_SAMPLES 等分）と、quad_strip と同じ2つの三角形
+        u, v = np.broadcast_arrays((start[:, None] + fractions * (end - start)[:, None])[:, :, None], heights)
+        points = surface(u.reshape(-1), v.reshape(-1))
+        count = u.shape[1] * u.shape[2]
+        a0, a1, b0, b1 = (np.repeat(x, count, axis=0) for x in (a0, a1, b0, b1))
+        first = closest_points(points, a0, a1 - a0, b1 - a0)
+        second = closest_points(points, a0, b1 - a0, b0 - a0)
+        distance = np.minimum(np.linalg.norm(points - first, axis=1), np.linalg.norm(points - second, axis=1))
+        too_far = distance.reshape(-1, count).max(axis=1) > tolerance * RULING_MARGIN
+        if not too_far.any():
+            break
+
+        # 離れすぎた帯に中点を足し、次は分けた帯だけ測る
+        split = np.flatnonzero(pending)[too_far]
+        middle = (rulings[split] + np.append(rulings, rulings[0] + period)[split + 1]) / 2
+        rulings = np.insert(rulings, split + 1, middle % period)
+        pending = np.zeros(len(rulings), dtype=bool)
+        pending[split + np.arange(len(split))] = True
+        pending[split + np.arange(len(split)) + 1] = True
+        if len(rulings) > ADAPTIVE_MAX_RULINGS:
+            break
+    return rulings
+
+
+def ruled_loft(surface, tolerance):
+    """
+    adaptive_rulings の u で線織面を分けたリング列 → (u (K,), リング (2, K, 3))
+    リングはそのまま MeshBuilder.loft に、u は縁の蓋をつなぐ zip_strip に渡す
+    """
+    u = adaptive_rulings(surface, tolerance)
+    return u, np.stack([surface(u, np.zeros(len(u))), surface(u, np.ones(len(u)))])
+
+
+def surface_error(vertices, faces, surfaces, samples=ERROR_SAMPLES, period=4):
+    """
+    曲面 S(u, v) の一覧をメッシュがどれだけの誤差で表しているか（mm）
+    各曲面を samples の格子（と v=0, 1 の縁）の点で測り、メッシュまでの最短距離の最大を返す（曲面がなければ 0）
+    """
+    from bvh import build_bvh
+
+    if not surfaces:
+        return 0.0
+    u, v = np.meshgrid((np.arange(samples[0]) + 0.5) * period / samples[0],
+                       np.concatenate([[0.0], (np.arange(samples[1]) + 0.5) / samples[1], [1.0]]))
+    points = np.concatenate([surface(u.reshape(-1), v.reshape(-1)) for surface in surfaces])
+    _, distance, _ = build_bvh(np.asarray(vertices)[faces]).closest(points)
+    return float(distance.max())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+メッシュの比較（Shapr3D のボディと生成パーツのずれ）
+
+- 両方の表面から面積に比例して点を取り、相手の表面の最近点までの距離を bvh.BVH.closest で調べる
+  （点は SAMPLE_CHUNK 個ずつ作って調べ、最大・2乗和・合計だけを足していくので、点を増やしてもメモリは増えない）
+- 片側ハウスドルフ距離（A→B, B→A）、対称ハウスドルフ距離（その大きい方）、RMS・平均のずれを出す
+- 座標系が違うときは位置合わせをする（center: 外接箱の中心をそろえる / icp: さらに ICP で回転・平行移動を合わせる）
+- --ply で A の頂点ごとのずれ（B の面の表側なら正、裏側なら負）を色にした PLY を書き出す
+- --simplify で両方を mesh_simplify で減らしてから比べる（5.8万三角形の Shapr3D のボディを手早く比べるとき）
+
+使い方:
+    python3 mesh_compare.py coin_chute_upper_snap.stl ボディ\\ 11_上.stl --align icp
+    python3 mesh_compare.py coin_chute_upper_snap.stl ボディ\\ 15.stl -p slope_angle=25 --ply upper.ply
+    python3 mesh_compare.py coin_chute_upper_snap.stl ボディ\\ 11_上.stl --simplify 0.1
+    （生成パーツのファイル名は variants.py のものなら、ファイルがなくてもその場で生成する）
+"""
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from mesh_validate import weld
+from stl_export import face_normals, write_ply
+
+SAMPLES = 100_000        # 片側あたりの点の数
+SAMPLE_CHUNK = 65536     # 1回に作って調べる点の数
+ICP_SAMPLES = 5000
+ICP_ITERATIONS = 30
+ICP_TOLERANCE = 1e-6     # mm（RMS の変化がこれより小さくなったら止める）
+
+# 頂点の色（RGB）: 負（B の内側）→ 0 → 正（B の外側）
+HEATMAP = [(40, 80, 255), (240, 240, 240), (230, 30, 30)]
+
+
+@dataclass(frozen=True)
+class Deviation:
+    """片側（点を取った側 → 相手の表面）のずれ"""
+    samples: int
+    maximum: float       # 片側ハウスドルフ距離 mm
+    sum_squares: float   # mm²
+    total: float         # mm
+    worst: tuple         # いちばん遠い点 (x, y, z)
+
+    @property
+    def rms(self):
+        return float(np.sqrt(self.sum_squares / self.samples)) if self.samples else 0.0
+
+    @property
+    def mean(self):
+        return self.total / self.samples if self.samples else 0.0
+
+
+@dataclass(frozen=True)
+class Comparison:
+    forward: Deviation   # A → B
+    backward: Deviation  # B → A
+
+    @property
+    def hausdorff(self):
+        return max(self.forward.maximum, self.backward.maximum)
+
+    @property
+    def rms(self):
+        """両側の点をまとめた RMS"""
+        samples = self.forward.samples + self.backward.samples
+        return float(np.sqrt((self.forward.sum_squares + self.backward.sum_squares) / samples)) if samples else 0.0
+
+
+def iter_samples(triangles, count, seed=0, chunk=SAMPLE_CHUNK):
+    """三角形 (N, 3, 3) の表面から面積に比例して取った点を、chunk 個ずつの (k, 3) で返す"""
+    rng = np.random.default_rng(seed)
+    a = triangles[:, 0]
+    ab = triangles[:, 1] - a
+    ac = triangles[:, 2] - a
+    cumulative = np.cumsum(np.linalg.norm(np.cross(ab, ac), axis=1))
+    if len(cumulative) == 0 or cumulative[-1] <= 0:
+        return
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        index = np.minimum(np.searchsorted(cumulative, rng.random(size) * cumulative[-1], side='right'),
+                           len(cumulative) - 1)
+        # 平行四辺形の点を、対角線の外なら折り返して三角形の中に入れる
+        u, v = rng.random(size), rng.random(size)
+        outside = u + v > 1
+        u[outside], v[outside] = 1 - u[outside], 1 - v[outside]
+        yield a[index] + u[:, None] * ab[index] + v[:, None] * ac[index]
+
+
+def one_sided(triangles, tree, samples=SAMPLES, seed=0):
+    """triangles の表面の点から tree の表面までの距離をまとめる → Deviation"""
+    count, maximum, sum_squares, total, worst = 0, 0.0, 0.0, 0.0, (np.nan,) * 3
+    for points in iter_samples(triangles, samples, seed):
+        _, distance, _ = tree.closest(points)
+        far = int(np.argmax(distance))
+        if distance[far] > maximum:
+            maximum, worst = float(distance[far]), tuple(points[far])
+        count += len(points)
+        sum_squares += float(distance @ distance)
+        total += float(distance.sum())
+    return Deviation(count, maximum, sum_squares, total, worst)
+
+
+def compare(first, second, samples=SAMPLES, seed=0, trees=None):
+    """三角形 (N, 3, 3) 2つを比べる → Comparison
+
+    trees: (first の BVH, second の BVH)（省略時は作る）
+    """
+    from bvh import build_bvh
+
+    first_tree, second_tree = trees or (build_bvh(first), build_bvh(second))
+    return Comparison(one_sided(first, second_tree, samples, seed), one_sided(second, first_tree, samples, seed + 1))
+
+
+def rigid_fit(source, target):
+    """source を target に重ねる回転と平行移動（Kabsch 法）→ (回転 (3, 3), 移動 (3,))"""
+    source_center = source.mean(axis=0)
+    target_center = target.mean(axis=0)
+    u, _, vt = np.linalg.svd((source - source_center).T @ (target - target_center))
+    sign = np.sign(np.linalg.det(vt.T @ u.T)) or 1.0
+    rotation = vt.T @ np.diag([1.0, 1.0, sign]) @ u.T
+    return rotation, target_center - rotation @ source_center
+
+
+def align(triangles, target, method='center', tree=None, seed=0):
+    """triangles (N, 3, 3) を target (M, 3, 3) に合わせて動かした三角形を返す
+
+    method: 'none' / 'center'（外接箱の中心をそろえる）/ 'icp'（中心をそろえてから ICP）
+    tree: target の BVH（icp のとき。省略時は作る）
+    """
+    if method == 'none':
+        return triangles
+    flat, goal = triangles.reshape(-1, 3), target.reshape(-1, 3)
+    shift = (goal.min(axis=0) + goal.max(axis=0)) / 2 - (flat.min(axis=0) + flat.max(axis=0)) / 2
+    triangles = triangles + shift
+    if method == 'center':
+        return triangles
+    if method != 'icp':
+        raise ValueError(f"不明な位置合わせ: {method}（none, center, icp）")
+
+    from bvh import build_bvh
+
+    tree = tree or build_bvh(target)
+    points = next(iter_samples(triangles, ICP_SAMPLES, seed), np.zeros((0, 3)))
+    rotation, offset = np.eye(3), np.zeros(3)
+    previous = np.inf
+    for _ in range(ICP_ITERATIONS):
+        moved = points @ rotation.T + offset
+        nearest, distance, _ = tree.closest(moved)
+        rms = float(np.sqrt(np.mean(distance ** 2)))
+        if previous - rms < ICP_TOLERANCE:
+            break
+        previous = rms
+        rotation, offset = rigid_fit(points, nearest)
+    return triangles @ rotation.T + offset
+
+
+def vertex_deviation(vertices, tree, triangles):
+    """頂点ごとに tree の表面までの距離（tree の面の表側なら正、裏側なら負）"""
+    nearest, distance, index = tree.closest(vertices)
+    normals = face_normals(triangles[index].astype(np.float64))
+    side = np.einsum('ij,ij->i', vertices - nearest, normals)
+    return np.where(side < 0, -distance, distance)
+
+
+def heatmap_colors(deviation, scale):
+    """ずれ → 頂点の色 (N, 3) uint8（-scale で青、0 で白、+scale で赤）"""
+    colors = np.empty((len(deviation), 3), dtype=np.uint8)
+    stops = [-scale, 0.0, scale] if scale > 0 else [-1.0, 0.0, 1.0]
+    for channel in range(3):
+        colors[:, channel] = np.rint(np.interp(deviation, stops, [color[channel] for color in HEATMAP]))
+    return colors
+
+
+def load_triangles(target, params):
+    """variants.py の出力ファイル名なら生成、それ以外は STL ファイルとして読む → 三角形 (N, 3, 3)"""
+    from variants import VARIANTS, load_parts
+
+    for variant, (_, parts) in VARIANTS.items():
+        if target in [filename for _, filename in parts]:
+            func = dict((filename, func) for func, filename in load_parts(variant))[target]
+            vertices, faces = func(params)
+            return np.asarray(vertices, dtype=np.float64)[np.asarray(faces)]
+
+    from stl_reader import MappedSTL
+
+    return np.asarray(MappedSTL(target).vectors, dtype=np.float64)
+
+
+def simplified(triangles, ratio):
+    """三角形 (N, 3, 3) を mesh_simplify で面の数 ratio 倍に減らした三角形（LOD と同じく小さいメッシュはそのまま）"""
+    from mesh_simplify import lod_meshes
+
+    vertices, faces = lod_meshes(*weld(triangles), (ratio,))[ratio]
+    return vertices[faces]
+
+
+def main(argv=None):
+    import argparse
+
+    from bvh import build_bvh, cached_bvh
+    from coinchute import build_params, parse_param
+
+    parser = argparse.ArgumentParser(description='2つのメッシュのずれ（ハウスドルフ距離・RMS）を調べる')
+    parser.add_argument('first', help='比べるメッシュ A（生成パーツのファイル名またはSTLファイル）')
+    parser.add_argument('second', help='基準のメッシュ B（Shapr3D のボディなど）')
+    parser.add_argument('-n', '--samples', type=int, default=SAMPLES, help='片側あたりの点の数')
+    parser.add_argument('--align', choices=['none', 'center', 'icp'], default='center', help='A を B に合わせる方法')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ply', metavar='PATH', help='A の頂点ごとのずれを色にした PLY を書き出す')
+    parser.add_argument('-p', '--param', action='append', type=parse_param, default=[], metavar='NAME=VALUE',
+                        help='生成パーツの ChuteParams の値を変える（例: -p slope_angle=15）')
+    parser.add_argument('--simplify', type=float, metavar='RATIO',
+                        help='両方の面の数をこの割合に減らしてから比べる（例: 0.1）')
+    args = parser.parse_args(argv)
+    if args.simplify is not None and not 0 < args.simplify <= 1:
+        parser.error(f"--simplify は 0 より大きく 1 以下にしてください: {args.simplify}")
+
+    params = build_params(args.param)
+    first = load_triangles(args.first, params)
+    second = load_triangles(args.second, params)
+    if args.simplify is not None:
+        first, second = simplified(first, args.simplify), simplified(second, args.simplify)
+        print(f"簡略化（{args.simplify:g}）: A 三角形 {len(first):,} / B 三角形 {len(second):,}")
+    second_tree, _ = cached_bvh(second)
+    first = align(first, second, args.align, second_tree, args.seed)
+    result = compare(first, second, args.samples, args.seed, (build_bvh(first), second_tree))
+
+    print(f"{'向き':<8} {'点数':>9} {'最大[mm]':>10} {'RMS[mm]':>9} {'平均[mm]':>9}  いちばん遠い点")
+    for name, side in [('A → B', result.forward), ('B → A', result.backward)]:
+        x, y, z = side.worst
+        print(f"{name:<8} {side.samples:>9} {side.maximum:>10.3f} {side.rms:>9.3f} {side.mean:>9.3f}  "
+              f"({x:.1f}, {y:.1f}, {z:.1f})")
+    print(f"ハウスドルフ距離 {result.hausdorff:.3f} mm / RMS {result.rms:.3f} mm")
+
+    if args.ply:
+        vertices, faces = weld(first)
+        deviation = vertex_deviation(vertices, second_tree, second)
+        write_ply(args.ply, vertices, faces, vertex_colors=heatmap_colors(deviation, np.abs(deviation).max()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
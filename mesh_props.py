@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+メッシュの物性値と印刷材料の見積もり
+
+- 表面積・符号付き体積・重心・慣性テンソルを三角形配列から一括計算
+  （各三角形と原点で作る四面体の積分を足し合わせる）
+- 三角形はブロックごとに処理するので、MappedSTL（memmap）はファイル全体をコピーしない
+- 壁ライン数・インフィル率（PRINT_SETTINGS）から PLA / PETG の質量と材料費を見積もる
+
+使い方:
+    python3 mesh_props.py                    # 全バリエーション
+    python3 mesh_props.py snap ボディ\\ 15.stl  # バリエーション名またはSTLファイル
+"""
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+BLOCK_SIZE = 65536  # 1ブロックの三角形数
+
+# スライサー設定の仮定値（Bambu Studio 0.20mm Standard @BBL A1 の既定値と仮定。PRINT_SETTINGS.md の
+# 2025-11-26 の記録は温度・ファンだけで、壁・インフィルは測っていない）
+PRINT_SETTINGS = {
+    'layer_height': 0.2,  # mm
+    'wall_loops': 2,
+    'line_width': 0.42,  # mm
+    'infill': 0.15,
+    'top_layers': 5,
+    'bottom_layers': 3,
+}
+
+# 材料: (密度 g/cm³, 価格 円/kg)
+MATERIALS = {
+    'PLA': (1.24, 2000),
+    'PETG': (1.27, 2500),
+}
+
+
+@dataclass(frozen=True)
+class MeshProperties:
+    """mm 単位の物性値（慣性テンソルは密度 1 のときの重心まわりの値 mm⁵）"""
+    triangles: int
+    area: float
+    volume: float
+    centroid: np.ndarray
+    inertia: np.ndarray
+
+    def print_estimate(self, material='PLA', settings=PRINT_SETTINGS):
+        """印刷時の質量と材料費の見積もり
+
+        壁（表面積 × 壁ライン数 × ライン幅）は中実、残りはインフィル率で埋まるものとする
+        壁が肉厚より厚くなる薄いパーツは全体を中実として扱う
+        """
+        density, price = MATERIALS[material]
+        volume = abs(self.volume)
+        shell = min(self.area * settings['wall_loops'] * settings['line_width'], volume)
+        printed = shell + (volume - shell) * settings['infill']  # mm³
+        grams = printed / 1000 * density
+        return {
+            'material': material,
+            'printed_cm3': printed / 1000,
+            'grams': grams,
+            'cost_yen': grams / 1000 * price,
+        }
+
+
+def iter_triangles(source, block_size=BLOCK_SIZE):
+    """三角形 (k, 3, 3) のブロックを順に返す
+
+    source: mesh.Mesh / MappedSTL / 三角形配列 (N, 3, 3) / (頂点, 面) のタプル
+    """
+    if isinstance(source, tuple):
+        from stl_export import iter_triangle_blocks
+
+        yield from iter_triangle_blocks(*source, chunk_size=block_size)
+        return
+    if hasattr(source, 'iter_blocks'):  # MappedSTL
+        yield from source.iter_blocks(block_size)
+        return
+    triangles = getattr(source, 'vectors', source)  # mesh.Mesh は vectors がビュー
+    for start in range(0, len(triangles), block_size):
+        yield triangles[start:start + block_size]
+
+
+def mesh_properties(source, block_size=BLOCK_SIZE):
+    """表面積・体積・重心・慣性テンソルを計算する"""
+    count = 0
+    area = 0.0
+    volume = 0.0
+    moment = np.zeros(3)         # ∫ x dV
+    second = np.zeros((3, 3))    # ∫ x xᵀ dV
+
+    for block in iter_triangles(source, block_size):
+        tri = np.asarray(block, dtype=np.float64)
+        a, b, c = tri[:, 0], tri[:, 1], tri[:, 2]
+        cross = np.cross(b - a, c - a)
+        det = np.einsum('ij,ij->i', a, np.cross(b, c))  # 原点との四面体の体積 × 6
+        s = a + b + c
+
+        count += len(tri)
+        area += 0.5 * np.sqrt(np.einsum('ij,ij->i', cross, cross)).sum()
+        volume += det.sum() / 6
+        moment += det @ s / 24
+        # 四面体 (0, a, b, c) の ∫ x xᵀ dV = det/120 × (aaᵀ + bbᵀ + ccᵀ + ssᵀ)
+        # a, b, c, s を縦に並べて重みつきの積1回にまとめる
+        points = np.concatenate([tri.reshape(-1, 3), s])
+        weights = np.concatenate([np.repeat(det, 3), det])
+        second += (points * weights[:, None]).T @ points
+
+    second /= 120
+    centroid = moment / volume if volume else np.zeros(3)
+    # 重心まわりに移してから慣性テンソル I = tr(C)·E − C に変換
+    covariance = second - volume * np.outer(centroid, centroid)
+    inertia = np.trace(covariance) * np.eye(3) - covariance
+    return MeshProperties(count, area, volume, centroid, inertia)
+
+
+def print_table(results):
+    """[(名前, MeshProperties, 水密か), ...] を材料ごとの見積もりつきで表示"""
+    materials = list(MATERIALS)
+    header = f"{'パーツ':<28} {'面積[cm²]':>10} {'体積[cm³]':>10}"
+    for material in materials:
+        header += f" {material + '[g]':>9} {material + '[円]':>9}"
+    print(header)
+    total = dict.fromkeys(materials, (0.0, 0.0))
+    for name, props, watertight in results:
+        name = name if watertight else name + ' *'
+        line = f"{name:<28} {props.area / 100:>10.1f} {abs(props.volume) / 1000:>10.1f}"
+        for material in materials:
+            estimate = props.print_estimate(material)
+            grams, cost = total[material]
+            total[material] = (grams + estimate['grams'], cost + estimate['cost_yen'])
+            line += f" {estimate['grams']:>9.1f} {estimate['cost_yen']:>9.0f}"
+        print(line)
+    line = f"{'合計':<28} {'':>10} {'':>10}"
+    for material in materials:
+        grams, cost = total[material]
+        line += f" {grams:>9.1f} {cost:>9.0f}"
+    print(line)
+    if not all(watertight for _, _, watertight in results):
+        print("* 閉じていないメッシュ（体積・質量は参考値）")
+
+
+def main(argv=None):
+    from mesh_validate import validate
+    from variants import VARIANTS
+
+    targets = (sys.argv[1:] if argv is None else argv) or list(VARIANTS)
+    results = []
+    for target in targets:
+        if target in VARIANTS:
+            from chute_params import DEFAULT_PARAMS
+            from variants import load_parts
+
+            for func, filename in load_parts(target):
+                vertices, faces = func(DEFAULT_PARAMS)
+                results.append((filename, mesh_properties((vertices, faces)),
+                                validate(vertices, faces).watertight))
+        else:
+            from stl_reader import MappedSTL
+
+            stl = MappedSTL(target)
+            results.append((target, mesh_properties(stl), validate(stl.vectors).watertight))
+    print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+面の向き（巻き順）の自動修正
+
+- 溶接したメッシュで、2面が共有するエッジから面の隣接配列（CSR形式）を作る
+- 隣接面をたどる幅優先探索（フロンティア単位で一括処理）で、つながった面の向きをそろえる
+- 閉じたシェルは符号付き体積が負なら全体を反転（法線が外向きになる）
+  開いたシェルは元の向きに多く合っている側を残す
+- 法線は stl_export.face_normals で一括で計算し直す
+
+向きを変えるのは面の頂点の順番だけで、頂点の座標と面の並びはそのまま
+
+使い方:
+    python3 mesh_repair.py 入力.stl [出力.stl]
+"""
+
+import sys
+
+import numpy as np
+
+from mesh_validate import WELD_TOLERANCE, group_keys, weld
+from stl_export import face_normals
+
+
+def face_adjacency(faces):
+    """2面で共有するエッジから面の隣接を作る
+
+    戻り値: (indptr, 隣の面, 向きが逆か, 境界に接する面か)
+    隣の面 neighbors[indptr[f]:indptr[f+1]] の向きが逆（同じ向きに辺をたどる）なら
+    その面は f と反対の向きにそろえる必要がある
+    """
+    count = len(faces)
+    a = faces.reshape(-1)
+    b = faces[:, [1, 2, 0]].reshape(-1)
+    forward = a < b
+    n = np.int64(int(faces.max()) + 1) if count else np.int64(1)
+    keys = np.minimum(a, b) * n + np.maximum(a, b)
+    # 潰れた面（同じ頂点を含む）はどの面ともつながないよう、辺に負の別々のキーを振る
+    collapsed = np.repeat((faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2])
+                          | (faces[:, 2] == faces[:, 0]), 3)
+    keys[collapsed] = -1 - np.flatnonzero(collapsed)
+    order, starts, _ = group_keys(keys, with_inverse=False)
+    uses = np.diff(np.append(starts, len(keys)))
+
+    # ちょうど2面で共有するエッジだけを隣接とする（境界・非多様体エッジは越えない）
+    paired = starts[uses == 2]
+    h1 = order[paired]
+    h2 = order[paired + 1]
+    mismatch = forward[h1] == forward[h2]
+    open_faces = np.zeros(count, dtype=bool)
+    open_faces[order[np.repeat(starts, uses)[np.repeat(uses != 2, uses)]] // 3] = True
+
+    src = np.concatenate([h1 // 3, h2 // 3])
+    dst = np.concatenate([h2 // 3, h1 // 3])
+    parity = np.concatenate([mismatch, mismatch]).astype(np.int8)
+    by_face = np.argsort(src)
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=count), out=indptr[1:])
+    return indptr, dst[by_face], parity[by_face], open_faces
+
+
+def propagate(indptr, neighbors, parity):
+    """幅優先探索で各面の (反転するか 0/1, シェル番号) を決める"""
+    count = len(indptr) - 1
+    flip = np.full(count, -1, dtype=np.int8)
+    shell = np.full(count, -1, dtype=np.int64)
+    slot = np.empty(count, dtype=np.int64)  # フロンティア内の重複を除くための作業配列
+
+    # 隣のない面はそれだけで1つのシェル
+    isolated = np.flatnonzero(indptr[1:] == indptr[:-1])
+    flip[isolated] = 0
+    shell[isolated] = np.arange(len(isolated))
+    shells = len(isolated)
+
+    seed = 0
+    while True:
+        rest = np.flatnonzero(flip[seed:] < 0)
+        if len(rest) == 0:
+            break
+        seed += int(rest[0])
+        flip[seed] = 0
+        shell[seed] = shells
+        frontier = np.array([seed])
+        while len(frontier):
+            begin = indptr[frontier]
+            degree = indptr[frontier + 1] - begin
+            # フロンティア全体の隣接リストを1本につなげる
+            idx = np.repeat(begin - (np.cumsum(degree) - degree), degree) + np.arange(degree.sum())
+            nearby = neighbors[idx]
+            nearby_flip = np.repeat(flip[frontier], degree) ^ parity[idx]
+            new = flip[nearby] < 0
+            nearby = nearby[new]
+            flip[nearby] = nearby_flip[new]
+            shell[nearby] = shells
+            # 同じ面が複数回出てきたら最後の1つだけ残す（並べ替えなしで重複を除く）
+            order = np.arange(len(nearby))
+            slot[nearby] = order
+            frontier = nearby[slot[nearby] == order]
+        shells += 1
+    return flip, shell
+
+
+def signed_volumes(vertices, faces, shell, shells):
+    """シェルごとの符号付き体積（原点との四面体の和）"""
+    v0, v1, v2 = (vertices[faces[:, k]] for k in range(3))
+    volumes = np.einsum('ij,ij->i', v0, np.cross(v1, v2)) / 6.0
+    return np.bincount(shell, weights=volumes, minlength=shells)
+
+
+def orient_faces(vertices, faces, tol=WELD_TOLERANCE):
+    """面の向きをそろえた面配列と、反転した面の数を返す"""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.array(faces, dtype=np.int64)
+    if len(faces) == 0:
+        return faces, 0
+
+    welded_vertices, welded = weld(vertices, faces, tol)
+    indptr, neighbors, parity, open_faces = face_adjacency(welded)
+    flip, shell = propagate(indptr, neighbors, parity)
+    shells = int(shell.max()) + 1
+
+    # シェルごとに全体を反転するか決める
+    size = np.bincount(shell, minlength=shells)
+    flipped = np.bincount(shell, weights=flip, minlength=shells)
+    closed = np.bincount(shell, weights=open_faces, minlength=shells) == 0
+    invert = flipped * 2 > size  # 開いたシェル: 元の向きに多く合っている側を残す
+    oriented = np.where(flip[:, None] == 1, welded[:, [0, 2, 1]], welded)
+    volumes = signed_volumes(welded_vertices, oriented, shell, shells)
+    invert[closed] = volumes[closed] < 0  # 閉じたシェル: 法線を外向きに
+
+    flip ^= invert[shell].astype(np.int8)
+    reverse = flip == 1
+    faces[reverse] = faces[reverse][:, [0, 2, 1]]
+    return faces, int(reverse.sum())
+
+
+def repair(vertices, faces, tol=WELD_TOLERANCE):
+    """向きをそろえた面配列と、計算し直した単位法線 (N, 3) を返す"""
+    faces, _ = orient_faces(vertices, faces, tol)
+    return faces, face_normals(np.asarray(vertices, dtype=np.float64)[faces])
+
+
+def clean_mesh(vertices, faces, tol=WELD_TOLERANCE):
+    """頂点をまとめ、面の向きをそろえ（閉じたシェルは外向き）、縮退した面（同じ頂点を2回使う面）を除く → (頂点, 面)"""
+    vertices, faces = weld(vertices, faces, tol)
+    faces, _ = orient_faces(vertices, faces, tol)
+    distinct = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+    return vertices, faces[distinct]
+
+
+def repair_triangles(triangles, tol=WELD_TOLERANCE):
+    """三角形の並び (N, 3, 3)（mesh.Mesh.vectors など）を向きをそろえて返す → (三角形, 法線)"""
+    triangles = np.asarray(triangles)
+    count = len(triangles)
+    faces, _ = orient_faces(triangles.reshape(-1, 3), np.arange(count * 3).reshape(-1, 3), tol)
+    # orient_faces は各行の2番目と3番目を入れ替えるだけなので、三角形も同じく入れ替える
+    reverse = faces[:, 1] != np.arange(count) * 3 + 1
+    fixed = triangles.copy()
+    fixed[reverse] = triangles[reverse][:, [0, 2, 1]]
+    return fixed, face_normals(fixed.astype(np.float64))
+
+
+def main(argv=None):
+    from stl_export import write_stl
+    from stl_reader import MappedSTL
+
+    args = sys.argv[1:] if argv is None else argv
+    if not 1 <= len(args) <= 2:
+        print(__doc__)
+        return 1
+    source = args[0]
+    target = args[1] if len(args) == 2 else source
+
+    triangles = np.array(MappedSTL(source).vectors)
+    fixed, _ = repair_triangles(triangles)
+    reversed_count = int(np.any(fixed != triangles, axis=(1, 2)).sum())
+    write_stl(target, [fixed])
+    print(f"✅ {target} を生成しました（反転した面: {reversed_count}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
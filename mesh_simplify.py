@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+メッシュの簡略化（二次誤差 QEM による辺の縮約）と LOD（詳細度）メッシュ
+
+- 頂点ごとに、周りの面の平面までの距離の2乗和を 4×4 の二次形式 Q で持つ（Garland–Heckbert）
+  穴の縁の辺には、辺を含み面に垂直な平面を重く足して縁を動かさない
+- 辺 (a, b) を1点にまとめるときの位置は Q_a + Q_b を最小にする点（解けなければ a, b, 中点のよい方）、
+  その値がまとめる費用
+- 1回ごとに全部の辺の費用を NumPy でまとめて計算し、費用の小さい辺から「周りの面が他の候補と重ならない」
+  ものを一度にまとめる（ヒープで1本ずつ縮約する代わり。ループの回数は数十回）
+- 多様体でなくなる縮約（a と b の共通の隣が辺を挟む面の数より多い）と、
+  周りの面が裏返る縮約はしない
+
+LOD は比率ごと（既定 1%, 10%, 100%）に面の数を減らしたメッシュ。100% は元のまま
+（write_lods が <名前>_lod1.stl などに書き出す。design_cache.DesignCache.save_stl と sweep.py は既定で書き出す）
+
+使い方:
+    python3 mesh_simplify.py ボディ\\ 11_上.stl -r 0.1 -o body_10.stl
+    python3 mesh_simplify.py ボディ\\ 11_上.stl --lod      # ボディ 11_上_lod1.stl, _lod10.stl を書き出す
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from mesh_validate import group_keys, twin_half_edges, weld
+
+LOD_RATIOS = (0.01, 0.1, 1.0)  # 元の面の数に対する割合
+BOUNDARY_WEIGHT = 1e3   # 穴の縁の辺に足す、面に垂直な平面の重み
+FLIP_COSINE = 0.2       # 縮約で周りの面の法線がこれ（cos）より大きく回るなら縮約しない
+PASS_FRACTION = 0.125   # 1回でまとめる候補（費用の小さい順）の、辺の数に対する割合の上限
+SELECT_ROUNDS = 4       # 重ならない候補を選ぶくり返しの回数
+VERTEX_CANDIDATES = 3   # 1回で候補にする辺の数（頂点ごと、費用の小さい順）
+MIN_FACES = 4           # これより少なくはしない（四面体）
+LOD_MIN_FACES = 200     # LOD はこれより少なくしない（もとから小さいメッシュはそのまま）
+
+
+def vertex_quadrics(vertices, faces):
+    """頂点ごとの二次形式 Q (V, 4, 4)（面の平面 + 穴の縁の垂直な平面、どちらも面積・長さの重み付き）"""
+    a, b, c = (vertices[faces[:, k]] for k in range(3))
+    normal = np.cross(b - a, c - a)
+    double_area = np.linalg.norm(normal, axis=1)
+    unit = normal / np.maximum(double_area, 1e-300)[:, None]
+    planes = np.column_stack([unit, -np.einsum('ij,ij->i', unit, a)])
+    weights = double_area / 2
+    corners = faces.reshape(-1)
+    plane_corners = np.repeat(planes, 3, axis=0)
+    weight_corners = np.repeat(weights, 3)
+
+    # 穴の縁（向かいの半辺がない辺）: 辺を含み面に垂直な平面を両端に足す
+    border = np.flatnonzero(twin_half_edges(faces) < 0)
+    if len(border):
+        face, k = border // 3, border % 3
+        start, end = faces[face, k], faces[face, (k + 1) % 3]
+        edge = vertices[end] - vertices[start]
+        side = np.cross(edge, unit[face])
+        side /= np.maximum(np.linalg.norm(side, axis=1), 1e-300)[:, None]
+        side_planes = np.column_stack([side, -np.einsum('ij,ij->i', side, vertices[start])])
+        corners = np.concatenate([corners, start, end])
+        plane_corners = np.concatenate([plane_corners, side_planes, side_planes])
+        edge_weight = BOUNDARY_WEIGHT * np.einsum('ij,ij->i', edge, edge)
+        weight_corners = np.concatenate([weight_corners, edge_weight, edge_weight])
+
+    outer = plane_corners[:, :, None] * plane_corners[:, None, :] * weight_corners[:, None, None]
+    quadrics = np.empty((len(vertices), 16))
+    for entry in range(16):
+        quadrics[:, entry] = np.bincount(corners, weights=outer.reshape(-1, 16)[:, entry], minlength=len(vertices))
+    return quadrics.reshape(-1, 4, 4)
+
+
+def _quadric_cost(quadrics, points):
+    """[x, 1]ᵀ Q [x, 1]（(..., 4, 4), (..., 3) → (...)）"""
+    h = np.concatenate([points, np.ones(points.shape[:-1] + (1,))], axis=-1)
+    return np.maximum(np.einsum('...i,...ij,...j->...', h, quadrics, h), 0)
+
+
+def collapse_targets(vertices, quadrics, edges):
+    """辺ごとのまとめた点の位置 (E, 3) と費用 (E,)"""
+    q = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]
+    a, b = vertices[edges[:, 0]], vertices[edges[:, 1]]
+    candidates = np.stack([a, b, (a + b) / 2, (a + b) / 2], axis=1)
+
+    # Q を最小にする点（3×3 が解けて、辺から離れすぎない辺だけ）
+    matrix = q[:, :3, :3]
+    scale = np.abs(matrix).max(axis=(1, 2)) + 1e-300
+    solvable = np.abs(np.linalg.det(matrix / scale[:, None, None])) > 1e-9
+    if solvable.any():
+        best = np.linalg.solve(matrix[solvable], -q[solvable, :3, 3][..., None])[..., 0]
+        length = np.linalg.norm(b[solvable] - a[solvable], axis=1)
+        near = np.linalg.norm(best - candidates[solvable, 2], axis=1) <= length
+        rows = np.flatnonzero(solvable)[near]
+        candidates[rows, 3] = best[near]
+    cost = _quadric_cost(q[:, None], candidates)
+    pick = np.argmin(cost, axis=1)
+    rows = np.arange(len(edges))
+    return candidates[rows, pick], cost[rows, pick]
+
+
+def _vertex_faces(faces, count):
+    """頂点ごとの面（CSR）→ (indptr, 面の番号)"""
+    corners = faces.reshape(-1)
+    order = np.argsort(corners, kind='stable')
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(corners, minlength=count))
+    return indptr, order // 3
+
+
+def _expand(indptr, rows):
+    """CSR の行 rows を並べた (何番目の行か, 要素の位置)"""
+    lengths = indptr[rows + 1] - indptr[rows]
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owner, indptr[rows][owner] + offsets
+
+
+def _unique_edges(faces, count):
+    """無向の辺 (E, 2) と、辺ごとの面の数"""
+    start, end = faces.reshape(-1), faces[:, [1, 2, 0]].reshape(-1)
+    keys = np.minimum(start, end) * np.int64(count) + np.maximum(start, end)
+    order, starts, _ = group_keys(keys, with_inverse=False)
+    uses = np.diff(np.append(starts, len(keys)))
+    first = keys[order[starts]]
+    return np.column_stack([first // count, first % count]), uses
+
+
+def _link_ok(edges, uses, count, subset):
+    """縮約しても多様体のままか（a と b の共通の隣の数 = 辺を挟む面の数）。edges[subset] の辺ごと"""
+    neighbor_from = np.concatenate([edges[:, 0], edges[:, 1]])
+    neighbor_to = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.argsort(neighbor_from, kind='stable')
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(neighbor_from, minlength=count))
+    neighbors = neighbor_to[order]
+
+    # 辺ごとに a の隣と b の隣を並べ、同じ頂点が2回出てくれば共通の隣
+    owner_a, position_a = _expand(indptr, edges[subset, 0])
+    owner_b, position_b = _expand(indptr, edges[subset, 1])
+    owner = np.concatenate([owner_a, owner_b])
+    keys = owner * np.int64(count) + np.concatenate([neighbors[position_a], neighbors[position_b]])
+    order, starts, _ = group_keys(keys, with_inverse=False)
+    repeated = starts[np.diff(np.append(starts, len(keys))) == 2]
+    common = np.bincount(keys[order[repeated]] // count, minlength=len(subset))
+    return (uses[subset] <= 2) & (common == uses[subset])
+
+
+def _cross(u, v):
+    # np.cross は呼び出しが重いので成分で書く（1回の縮約ごとに呼ぶ）
+    return np.column_stack([u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1],
+                            u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2],
+                            u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]])
+
+
+def _flip_ok(vertices, faces, edges, targets, vertex_faces):
+    """縮約で周りの面が裏返ったりつぶれたりしない辺 → (辺ごとの可否, 影響する (辺, 面) の組)"""
+    indptr, incident = vertex_faces
+    owner_a, position_a = _expand(indptr, edges[:, 0])
+    owner_b, position_b = _expand(indptr, edges[:, 1])
+    edge = np.concatenate([owner_a, owner_b])
+    face = incident[np.concatenate([position_a, position_b])]
+    moved = np.concatenate([edges[owner_a, 0], edges[owner_b, 1]])
+    other = np.concatenate([edges[owner_a, 1], edges[owner_b, 0]])
+
+    # 両端を含む面は消えるので調べない。残る面は動く頂点を先頭に回して、動かす前後の法線を比べる
+    corners = faces[face]
+    check = ~(corners == other[:, None]).any(axis=1)
+    e, corners, moved = edge[check], corners[check], moved[check]
+    k = np.argmax(corners == moved[:, None], axis=1)
+    rows = np.arange(len(k))
+    p1 = vertices[corners[rows, (k + 1) % 3]]
+    p2 = vertices[corners[rows, (k + 2) % 3]]
+    old, new = vertices[moved], targets[e]
+    before = _cross(p1 - old, p2 - old)
+    after = _cross(p1 - new, p2 - new)
+    dot = np.einsum('ij,ij->i', before, after)
+    good = dot > FLIP_COSINE * np.sqrt(np.einsum('ij,ij->i', before, before) * np.einsum('ij,ij->i', after, after))
+    ok = np.bincount(e[~good], minlength=len(edges)) == 0
+    return ok, edge, face
+
+
+def _independent(pair_edge, pair_face, candidates, face_count, rounds=SELECT_ROUNDS):
+    """候補（費用の小さい順）から、影響する面が重ならない組を選ぶ（費用の小さい方が勝つ、を数回くり返す）"""
+    alive = np.ones(candidates, dtype=bool)
+    chosen = np.zeros(candidates, dtype=bool)
+    for _ in range(rounds):
+        live = alive[pair_edge]
+        edge, face = pair_edge[live], pair_face[live]
+        if not len(edge):
+            break
+        owner = np.full(face_count, candidates)
+        np.minimum.at(owner, face, edge)
+        lost = np.bincount(edge[owner[face] != edge], minlength=candidates) > 0
+        won = alive & ~lost
+        chosen |= won
+
+        # 選んだ候補の面に触れる候補は、この回ではもう選べない
+        taken = np.zeros(face_count, dtype=bool)
+        taken[face[won[edge]]] = True
+        blocked = np.bincount(edge[taken[face]], minlength=candidates) > 0
+        alive &= ~blocked & ~won
+    return chosen
+
+
+def _few_per_vertex(ordered_edges, count, limit=VERTEX_CANDIDATES):
+    """費用の順に並べた辺のうち、両端どちらでも limit 番目までに入る辺
+
+    1つの頂点で縮約できるのは1回に1本なので、面が数百つながる頂点（CAD の扇形分割の中心など）の
+    辺を全部調べなくて済むようにする
+    """
+    ends = ordered_edges.reshape(-1)
+    order = np.argsort(ends, kind='stable')  # 頂点ごとに、費用の順のまま並ぶ
+    starts = np.searchsorted(ends[order], np.arange(count))
+    place = np.empty(len(ends), dtype=np.int64)
+    place[order] = np.arange(len(ends)) - starts[ends[order]]
+    return place.reshape(-1, 2).max(axis=1) < limit
+
+
+def simplify(vertices, faces, target_faces):
+    """面が target_faces 以下になるまで辺を縮約した (頂点, 面)（使わなくなった頂点は詰める）"""
+    vertices = np.array(vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.array(faces, dtype=np.int64).reshape(-1, 3)
+    target_faces = max(int(target_faces), MIN_FACES)
+    quadrics = vertex_quadrics(vertices, faces)
+
+    while len(faces) > target_faces:
+        count = len(vertices)
+        edges, uses = _unique_edges(faces, count)
+        targets, cost = collapse_targets(vertices, quadrics, edges)
+
+        # 費用の小さい辺から候補にし、多様体のままで面が裏返らないものだけ残す
+        # （費用の小さい方に縮約できる辺がなければ、全部の辺から探す）
+        needed = (len(faces) - target_faces + 1) // 2
+        order = np.argsort(cost, kind='stable')
+        order = order[_few_per_vertex(edges[order], count)]
+        for size in (max(int(len(edges) * PASS_FRACTION), 1), len(edges)):
+            pool = order[:size]
+            pool = pool[_link_ok(edges, uses, count, pool)]
+            flip_ok, pair_edge, pair_face = _flip_ok(vertices, faces, edges[pool], targets[pool],
+                                                     _vertex_faces(faces, count))
+            if flip_ok.any() or size == len(edges):
+                break
+        if not flip_ok.any():
+            break
+        keep = flip_ok[pair_edge]
+        rank = np.cumsum(flip_ok) - 1
+        pool = pool[flip_ok]
+        chosen = pool[_independent(rank[pair_edge[keep]], pair_face[keep], len(pool), len(faces))][:needed]
+
+        # b を a にまとめる
+        a, b = edges[chosen, 0], edges[chosen, 1]
+        vertices[a] = targets[chosen]
+        quadrics[a] += quadrics[b]
+        remap = np.arange(count)
+        remap[b] = a
+        faces = remap[faces]
+        keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+        faces = faces[keep]
+
+    used, faces = np.unique(faces, return_inverse=True)
+    return vertices[used], faces.reshape(-1, 3)
+
+
+def lod_meshes(vertices, faces, ratios=LOD_RATIOS):
+    """{比率: (頂点, 面)}（比率 1 以上は元のメッシュ。小さい比率は1つ上の LOD から続けて減らす）
+
+    面の数は LOD_MIN_FACES より少なくしない（それより小さいメッシュはどの比率でも元のまま）
+    """
+    levels = {}
+    current = (np.asarray(vertices, dtype=np.float64), np.asarray(faces, dtype=np.int64))
+    total = len(current[1])
+    for ratio in sorted(ratios, reverse=True):
+        target = max(round(total * ratio), LOD_MIN_FACES)
+        if ratio < 1 and target < len(current[1]):
+            current = simplify(*current, target)
+        levels[ratio] = current
+    return levels
+
+
+def write_lods(vertices, faces, path, ratios=LOD_RATIOS):
+    """path の STL の LOD を <名前>_lod1.stl などに書き出し、{'1%': {'file', 'triangles', 'ratio'}, ...} を返す
+
+    面の向きをそろえてから減らす。ratio は実際の面の数の割合
+    元より面が減らなかった LOD（LOD_MIN_FACES 以下のパーツ）は書き出さず、file は path のままにする
+    """
+    from mesh_repair import orient_faces  # mesh_repair が stl_export を import するため
+    from stl_export import iter_triangle_blocks, write_stl
+
+    faces, _ = orient_faces(vertices, faces)
+    levels = {}
+    for ratio, (lod_vertices, lod_faces) in sorted(lod_meshes(vertices, faces, ratios).items()):
+        lod_path = path
+        if len(lod_faces) < len(faces):
+            lod_path = lod_filename(path, ratio)
+            write_stl(lod_path, iter_triangle_blocks(lod_vertices, lod_faces))
+        levels[lod_label(ratio)] = {'file': lod_path, 'triangles': int(len(lod_faces)),
+                                    'ratio': round(len(lod_faces) / max(len(faces), 1), 4)}
+    return levels
+
+
+def lods_current(path, ratios=LOD_RATIOS):
+    """path の STL の LOD のファイルが揃っているか（LOD_MIN_FACES 以下のパーツは LOD を書き出さないので揃っている）"""
+    from stl_reader import MappedSTL
+
+    if not os.path.exists(path):
+        return False
+    if len(MappedSTL(path)) <= LOD_MIN_FACES:
+        return True
+    return all(os.path.exists(lod_filename(path, ratio)) for ratio in ratios if ratio < 1)
+
+
+def describe_lods(levels):
+    """write_lods の結果 → 表示用の1行（'三角形 12,000 → 1% 200（実際 1.67%） / 10% 1,200（実際 10%）'）"""
+    total = max(level['triangles'] for level in levels.values())
+    written = [f"{label} {level['triangles']:,}（実際 {lod_label(level['ratio'])}）"
+               for label, level in levels.items() if level['triangles'] < total]
+    if not written:
+        return f"三角形 {total:,}（これ以上減らさないので LOD は書き出さない）"
+    return f"三角形 {total:,} → {' / '.join(written)}"
+
+
+def lod_filename(filename, ratio):
+    """'coin_chute_lower.stl', 0.1 → 'coin_chute_lower_lod10.stl'（比率 1 以上は元のファイル名）"""
+    if ratio >= 1:
+        return filename
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}_lod{ratio * 100:g}{ext}"
+
+
+def lod_label(ratio):
+    """0.1 → '10%'（manifest のキー）"""
+    return f"{ratio * 100:g}%"
+
+
+def parse_ratios(text):
+    """'0.01,0.1' → (0.01, 0.1, 1.0)（100% はいつも含める）"""
+    try:
+        ratios = {float(value) for value in text.split(',') if value.strip()}
+    except ValueError:
+        raise ValueError(f"比率をカンマ区切りの数で指定してください: {text}") from None
+    if any(not 0 < ratio <= 1 for ratio in ratios):
+        raise ValueError(f"比率は 0 より大きく 1 以下にしてください: {text}")
+    return tuple(sorted(ratios | {1.0}))
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from mesh_validate import validate
+    from stl_export import save_stl
+    from stl_reader import MappedSTL
+
+    parser = argparse.ArgumentParser(description='STLを二次誤差（QEM）の辺の縮約で簡略化する')
+    parser.add_argument('stl', help='STLファイル')
+    parser.add_argument('-r', '--ratio', type=float, default=0.1, help='残す面の割合（既定: 0.1）')
+    parser.add_argument('-o', '--out', help='出力する STL（既定: <入力>_lod<百分率>.stl）')
+    parser.add_argument('--lod', nargs='?', const=','.join(f'{r:g}' for r in LOD_RATIOS if r < 1),
+                        metavar='RATIOS', help='比率ごとの LOD をまとめて書き出す（既定: 0.01,0.1）')
+    args = parser.parse_args(argv)
+
+    vertices, faces = weld(MappedSTL(args.stl).vectors)
+    start = time.perf_counter()
+    if args.lod:
+        levels = lod_meshes(vertices, faces, parse_ratios(args.lod))
+    else:
+        levels = {args.ratio: simplify(vertices, faces, round(len(faces) * args.ratio))}
+    elapsed = time.perf_counter() - start
+    print(f"{args.stl}: 面 {len(faces)}（{elapsed * 1e3:.0f} ms）")
+    for ratio, (lod_vertices, lod_faces) in sorted(levels.items()):
+        if ratio >= 1:
+            continue
+        if len(lod_faces) >= len(faces):
+            print(f"✅ {ratio:.0%}: 面 {len(faces)} からは減らさないので書き出さない")
+            continue
+        path = args.out if args.out and not args.lod else lod_filename(args.stl, ratio)
+        mark = '✅' if validate(lod_vertices, lod_faces).ok else '❌'
+        print(f"{mark} {ratio:.0%}: 面 {len(lod_faces)} → {path}")
+        save_stl(lod_vertices, lod_faces, path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
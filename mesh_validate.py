@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+メッシュの水密・多様体チェック
+
+- 頂点を溶接（座標を tol 単位に丸めてハッシュ → 同じ点を1つにまとめる）
+- 半辺（有向エッジ）を無向エッジのキーでまとめ、共有数で分類する
+    1面だけ        → 境界エッジ（穴が開いている）
+    3面以上        → 非多様体エッジ
+    2面で同じ向き  → 面の向き（巻き順）が逆
+- 面積ゼロ・頂点が重なった三角形を縮退として数える
+
+使い方:
+    python3 mesh_validate.py                   # 全バリエーションを生成してチェック
+    python3 mesh_validate.py snap frontback    # 指定したバリエーションだけ
+    python3 mesh_validate.py ボディ\\ 15.stl     # STLファイル
+"""
+
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+
+WELD_TOLERANCE = 1e-3  # mm（float32 のSTLでも同じ点として扱える幅）
+AREA_EPSILON = 1e-12   # mm²（これ以下の面積を縮退とみなす）
+
+AXIS_BITS = 21         # 1軸あたりのビット数（3軸で int64 に収まる。tol=1µm なら約2m四方まで）
+
+# 範囲が AXIS_BITS に収まらないときに3軸を1つの int64 にまとめるハッシュの係数
+_HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.int64)
+
+
+def group_keys(keys, with_inverse=True):
+    """整数キーを並べ替えて同じ値ごとにまとめる
+
+    戻り値: (並べ替え順, 各グループの先頭位置（並べ替え後）, 元の並び→グループ番号)
+    np.unique(return_inverse=True) と同じ結果を、並べ替え1回で作る
+    with_inverse=False なら3つ目は None（使わないときの書き戻しを省く）
+    """
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    new = np.empty(len(keys), dtype=bool)
+    new[:1] = True
+    np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=new[1:])
+    if not with_inverse:
+        return order, np.flatnonzero(new), None
+    inverse = np.empty(len(keys), dtype=np.int64)
+    inverse[order] = np.cumsum(new) - 1
+    return order, np.flatnonzero(new), inverse
+
+
+def weld(vertices, faces=None, tol=WELD_TOLERANCE):
+    """同じ位置の頂点をまとめて (溶接後の頂点, 面) を返す
+
+    faces を省略すると vertices を三角形 (N, 3, 3) の並びとして扱う
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if faces is None:
+        vertices = vertices.reshape(-1, 3)
+    else:
+        faces = np.asarray(faces, dtype=np.int64)
+    if len(vertices) == 0:
+        return vertices.reshape(0, 3), np.zeros((0, 3), dtype=np.int64)
+
+    grid = np.rint(vertices * (1.0 / tol)).astype(np.int64)
+    grid -= grid.min(axis=0)
+    if grid.max() < (1 << AXIS_BITS):
+        # 範囲が収まれば、ビットを詰めたキーがそのまま座標の代わりになる（衝突しない）
+        keys = (grid[:, 0] << (2 * AXIS_BITS)) | (grid[:, 1] << AXIS_BITS) | grid[:, 2]
+        order, starts, inverse = group_keys(keys)
+        return vertices[order[starts]], _remap(inverse, faces)
+
+    keys = grid @ _HASH_PRIMES  # int64 の桁あふれは折り返しでよい（ハッシュとして使う）
+    order, starts, inverse = group_keys(keys)
+    # 同じキーになった隣どうしの座標が違えばハッシュ衝突
+    same = np.ones(len(keys), dtype=bool)
+    same[starts] = False
+    same = np.flatnonzero(same)
+    if len(same) and np.any(grid[order[same]] != grid[order[same - 1]]):
+        # 衝突があったときだけ座標そのもので一意化する
+        _, first, inverse = np.unique(grid, axis=0, return_index=True, return_inverse=True)
+        return vertices[first], _remap(inverse.reshape(-1), faces)
+    return vertices[order[starts]], _remap(inverse, faces)
+
+
+def _remap(inverse, faces):
+    """溶接前の頂点番号 → 溶接後の番号（三角形の並びなら3つずつ区切るだけ）"""
+    return inverse.reshape(-1, 3) if faces is None else inverse[faces]
+
+
+@dataclass
+class MeshReport:
+    """チェック結果（各配列は該当するエッジ (k, 2) または面のインデックス）"""
+    vertices: int
+    faces: int
+    edges: int
+    boundary_edges: np.ndarray = field(repr=False)
+    nonmanifold_edges: np.ndarray = field(repr=False)
+    flipped_edges: np.ndarray = field(repr=False)
+    degenerate_faces: np.ndarray = field(repr=False)
+
+    @property
+    def watertight(self):
+        """穴も非多様体エッジもない"""
+        return len(self.boundary_edges) == 0 and len(self.nonmanifold_edges) == 0
+
+    @property
+    def ok(self):
+        """水密で、向きがそろっていて、縮退面がない"""
+        return self.watertight and len(self.flipped_edges) == 0 and len(self.degenerate_faces) == 0
+
+    def counts(self):
+        """manifest などに書く件数だけの辞書"""
+        return {
+            'boundary_edges': int(len(self.boundary_edges)),
+            'nonmanifold_edges': int(len(self.nonmanifold_edges)),
+            'flipped_edges': int(len(self.flipped_edges)),
+            'degenerate_faces': int(len(self.degenerate_faces)),
+        }
+
+    def summary(self):
+        c = self.counts()
+        return (f"頂点 {self.vertices} / 面 {self.faces} / エッジ {self.edges}: "
+                f"境界 {c['boundary_edges']}, 非多様体 {c['nonmanifold_edges']}, "
+                f"向き不一致 {c['flipped_edges']}, 縮退 {c['degenerate_faces']}")
+
+
+def edge_index(faces):
+    """半辺を無向エッジにまとめる
+
+    戻り値: (無向エッジ (E, 2), エッジごとの半辺数, エッジごとの小→大の向きの半辺数)
+    """
+    if len(faces) == 0:
+        return np.zeros((0, 2), dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    a = faces.reshape(-1)
+    b = faces[:, [1, 2, 0]].reshape(-1)
+    forward = a < b
+    n = np.int64(int(faces.max()) + 1)
+    keys = np.minimum(a, b) * n + np.maximum(a, b)
+    order, starts, _ = group_keys(keys, with_inverse=False)
+
+    unique_keys = keys[order[starts]]
+    edges = np.stack([unique_keys // n, unique_keys % n], axis=1)
+    uses = np.diff(np.append(starts, len(keys)))
+    forward_uses = np.add.reduceat(forward[order].astype(np.int64), starts)
+    return edges, uses, forward_uses
+
+
+def twin_half_edges(faces):
+    """半辺 3*面+k（辺 k→k+1）の向かいの半辺（2面で共有しないエッジは -1）"""
+    if len(faces) == 0:
+        return np.zeros(0, dtype=np.int64)
+    a = faces.reshape(-1)
+    b = faces[:, [1, 2, 0]].reshape(-1)
+    n = np.int64(int(faces.max()) + 1)
+    keys = np.minimum(a, b) * n + np.maximum(a, b)
+    order, starts, _ = group_keys(keys, with_inverse=False)
+    uses = np.diff(np.append(starts, len(keys)))
+    paired = starts[uses == 2]
+    twin = np.full(len(keys), -1, dtype=np.int64)
+    twin[order[paired]] = order[paired + 1]
+    twin[order[paired + 1]] = order[paired]
+    return twin
+
+
+def validate(vertices, faces=None, tol=WELD_TOLERANCE):
+    """溶接してから境界・非多様体・向き不一致・縮退を調べる
+
+    faces を省略すると三角形 (N, 3, 3) の並び（mesh.Mesh.vectors や MappedSTL.vectors）として扱う
+    """
+    vertices, faces = weld(vertices, faces, tol)
+    if len(faces) == 0:
+        empty_edges = np.zeros((0, 2), dtype=np.int64)
+        return MeshReport(len(vertices), 0, 0, empty_edges, empty_edges, empty_edges,
+                          np.zeros(0, dtype=np.int64))
+
+    # 縮退: 溶接後に同じ頂点を含む、または面積がほぼゼロ
+    origin = vertices[faces[:, 0]]
+    cross = np.cross(vertices[faces[:, 1]] - origin, vertices[faces[:, 2]] - origin)
+    collapsed = ((faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2])
+                 | (faces[:, 2] == faces[:, 0]))
+    degenerate = np.flatnonzero(collapsed | (np.einsum('ij,ij->i', cross, cross) <= AREA_EPSILON ** 2))
+
+    # 潰れた辺（同じ頂点どうし）はエッジの集計から外す
+    edges, uses, forward_uses = edge_index(faces[~collapsed] if collapsed.any() else faces)
+    # 2面で共有するエッジは、一方が小→大・もう一方が大→小なら向きがそろっている
+    flipped = (uses == 2) & (forward_uses != 1)
+
+    return MeshReport(
+        vertices=len(vertices),
+        faces=len(faces),
+        edges=len(edges),
+        boundary_edges=edges[uses == 1],
+        nonmanifold_edges=edges[uses > 2],
+        flipped_edges=edges[flipped],
+        degenerate_faces=degenerate,
+    )
+
+
+def validate_parts(variant, params=None):
+    """バリエーションの全パーツを生成してチェックする → [(出力ファイル名, MeshReport), ...]"""
+    from chute_params import DEFAULT_PARAMS
+    from variants import load_parts
+
+    params = DEFAULT_PARAMS if params is None else params
+    return [(filename, validate(*func(params))) for func, filename in load_parts(variant)]
+
+
+def main(argv=None):
+    from variants import VARIANTS
+
+    targets = (sys.argv[1:] if argv is None else argv) or list(VARIANTS)
+    failed = 0
+    for target in targets:
+        if target in VARIANTS:
+            results = validate_parts(target)
+        else:
+            from stl_reader import MappedSTL
+            results = [(target, validate(MappedSTL(target).vectors))]
+        for name, report in results:
+            mark = '✅' if report.ok else '❌'
+            failed += not report.ok
+            print(f"{mark} {name}: {report.summary()}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
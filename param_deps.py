@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+パラメータの依存関係と差分再生成
+
+- 生成関数に chute_params.ParamTrace を渡して、パーツ・サブ機能（読んだ関数）ごとに
+  どの ChuteParams のフィールドを読むかを調べる（依存グラフ）
+  例: clearance は段差（はめ込み型の _step_ring）だけ、hole_position（hole_center_y）は下部パーツだけが読む
+- 出力先ディレクトリの BUILD_STATE に、ファイルごとに生成関数・コードの版・読んだ値・中身の SHA-256 を記録する
+  DesignCache.save_stl は、コードの版が同じで読んだ値が今のパラメータでも全部同じで、ファイルの中身も
+  記録どおりなら作り直さない。作り直しても中身が同じならファイルを書き換えない
+  （読んでいないフィールドをいくら変えても結果は同じなので、読んだ値だけ比べれば足りる）
+
+使い方:
+    python3 param_deps.py snap                     # パーツ・サブ機能ごとに読むパラメータ
+    python3 param_deps.py all -p clearance=0.2     # 既定値から変えたとき作り直すパーツ
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+BUILD_STATE = '.coin_chute_build.json'
+HASH_BLOCK = 1 << 20
+
+
+def file_hash(path):
+    """ファイルの中身の SHA-256（16進）"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version(func):
+    """生成関数・モジュールの定数・ソースのハッシュ（変わったら記録した依存は使えない）"""
+    from design_cache import module_params, source_version
+
+    module = sys.modules[func.__module__]
+    payload = json.dumps({
+        'function': f"{func.__module__}.{func.__qualname__}",
+        'params': module_params(module),
+        'source': source_version(module),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def split_args(args):
+    """引数 → (ChuteParams, それ以外の repr のリスト)"""
+    from chute_params import ChuteParams
+
+    params = next((arg for arg in args if isinstance(arg, ChuteParams)), None)
+    return params, [repr(arg) for arg in args if not isinstance(arg, ChuteParams)]
+
+
+def trace_part(func, params):
+    """func(params) を ParamTrace 経由で実行 → ((頂点, 面), ParamTrace)"""
+    from chute_params import ParamTrace
+
+    trace = ParamTrace(params)
+    return func(trace), trace
+
+
+def input_fields(names):
+    """読んだフィールド（派生値を含む）→ 元の入力フィールドの集合"""
+    from chute_params import DERIVED_FROM
+
+    return {source for name in names for source in DERIVED_FROM.get(name, (name,))}
+
+
+class BuildState:
+    """出力先ディレクトリの BUILD_STATE（{ファイル名: 記録}）"""
+
+    def __init__(self, directory='.'):
+        self.path = os.path.join(directory, BUILD_STATE)
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as fh:
+                self.entries = json.load(fh)
+
+    def is_current(self, func, filename, *args):
+        """記録があり、コード・読んだ値・その他の引数・ファイルの中身がどれも変わっていないか"""
+        entry = self.entries.get(os.path.basename(filename))
+        params, others = split_args(args)
+        if entry is None or params is None or not os.path.exists(filename):
+            return False
+        if entry['code'] != code_version(func) or entry['args'] != others:
+            return False
+        if any(getattr(params, name) != value for name, value in entry['reads'].items()):
+            return False
+        return file_hash(filename) == entry['sha256']
+
+    def record(self, func, filename, reads, digest, *args):
+        """作ったファイルを記録（reads: DesignCache.reads の {'reads', 'features'}）"""
+        _, others = split_args(args)
+        self.entries[os.path.basename(filename)] = {
+            'function': f"{func.__module__}.{func.__qualname__}",
+            'code': code_version(func),
+            'args': others,
+            'reads': reads['reads'],
+            'features': reads['features'],
+            'sha256': digest,
+        }
+
+    def save(self):
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as fh:
+            json.dump(self.entries, fh, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def dependency_graph(variants, params):
+    """{ファイル名: {サブ機能: [フィールド, ...]}}（params で実際に生成して調べる）"""
+    from variants import load_parts
+
+    graph = {}
+    for variant in variants:
+        for func, filename in load_parts(variant):
+            _, trace = trace_part(func, params)
+            graph[filename] = {feature: sorted(names) for feature, names in sorted(trace.features.items())}
+    return graph
+
+
+def affected_parts(graph, changed):
+    """changed（入力フィールドの集合）を変えると作り直すパーツ → {ファイル名: {サブ機能: [フィールド, ...]}}"""
+    affected = {}
+    for filename, features in graph.items():
+        hits = {feature: sorted(input_fields(names) & changed) for feature, names in features.items()}
+        hits = {feature: names for feature, names in hits.items() if names}
+        if hits:
+            affected[filename] = hits
+    return affected
+
+
+def main(argv=None):
+    import argparse
+    from dataclasses import fields
+
+    from chute_params import DEFAULT_PARAMS, ChuteParams
+    from coinchute import build_params, parse_param
+    from variants import VARIANTS
+
+    parser = argparse.ArgumentParser(description='パーツ・サブ機能ごとに読むパラメータ（差分再生成の依存グラフ）')
+    parser.add_argument('variant', nargs='?', default='all', choices=list(VARIANTS) + ['all'])
+    parser.add_argument('-p', '--param', action='append', default=[], type=parse_param, metavar='NAME=VALUE',
+                        help='既定値から変えるパラメータ（作り直すパーツを表示）')
+    args = parser.parse_args(argv)
+
+    variants = list(VARIANTS) if args.variant == 'all' else [args.variant]
+    graph = dependency_graph(variants, DEFAULT_PARAMS)
+    if not args.param:
+        for filename, features in graph.items():
+            print(filename)
+            for feature, names in features.items():
+                print(f"  {feature}: {', '.join(names)}")
+        return 0
+
+    params = build_params(args.param)
+    changed = {f.name for f in fields(ChuteParams) if f.init and getattr(params, f.name) != getattr(DEFAULT_PARAMS, f.name)}
+    # 変えた値で読むフィールドが増えることもあるので、変えた後のグラフも合わせる
+    for filename, features in dependency_graph(variants, params).items():
+        for feature, names in features.items():
+            graph[filename][feature] = sorted(set(graph[filename].get(feature, [])) | set(names))
+    affected = affected_parts(graph, changed)
+    print(f"変更: {', '.join(sorted(changed)) or '（なし）'}")
+    for filename in graph:
+        if filename in affected:
+            reasons = ', '.join(f"{feature}（{', '.join(names)}）" for feature, names in affected[filename].items())
+            print(f"  🔄 {filename}: 作り直す ← {reasons}")
+        else:
+            print(f"  ✅ {filename}: そのまま")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,637 @@
+#!/usr/bin/env python3
+"""
+造形サイズに収まらないパーツの自動分割
+
+- 座標軸に垂直な平面で切り、切り口をふさぐ（穴のある断面は耳切り法で三角形に分割）
+- 平面との交差は、三角形を軸方向の最小値で並べた区間インデックスから二分探索で候補を絞る
+- 1軸ごとに「端から収まる限り長く」切る貪欲法で最少の分割数を求め、等分でも収まるなら等分にする
+  1軸では断面が大きすぎるときは、切ったピースを別の軸でさらに分割する
+- 切り口ごとに差し込み式のソケットを付ける
+  （手前側のピースに、切り口の壁を囲む厚さ step_thickness の枠を joint_depth だけ突き出して mesh_boolean の和で足し、
+    ほかのピースからは枠を clearance だけ太らせた溝を差で引く。相手の壁は clearance の隙間で枠に入る）
+- 切り口は溶接してから輪郭をたどるので、T 字の継ぎ目をまたぐ壁の断面も閉じたループとしてふさぐ
+  開いた縁で途切れる断面（閉じていないメッシュ）はふさがない。和・差の結果が閉じた立体にならない
+  （自己交差したメッシュなど）ソケットは付けない
+
+使い方:
+    python3 part_split.py hole                  # バリエーションの各パーツ（収まるものはそのまま）
+    python3 part_split.py 一体型.stl [-o 出力先]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from bed_fit import BED_SIZE, fits_bed
+from chute_params import DEFAULT_PARAMS
+from mesh_boolean import difference, union
+from mesh_builder import MeshBuilder
+from mesh_repair import orient_faces
+from mesh_validate import WELD_TOLERANCE, validate, weld
+
+AXIS_NAMES = 'XYZ'
+PLANE_EPSILON = WELD_TOLERANCE  # 平面からこれ以内の頂点は平面上とみなす（溶接で交点と潰れないように）
+CUT_STEP = 0.5        # mm（切る位置はこの刻みに丸める）
+MAX_DEPTH = 2         # 別の軸で切り直す回数の上限
+TURN_EPSILON = 1e-9   # mm²（外積がこれ以下の3点は一直線とみなす）
+MITER_LIMIT = 4.0     # ソケットの輪郭をずらすとき、鋭い角で伸びすぎないようにする上限（倍）
+
+
+def joint_margin(axis, p):
+    """ソケットを付けたピースで増える寸法"""
+    margin = np.full(3, 2 * (p.clearance + p.step_thickness))
+    margin[axis] = p.joint_depth
+    return margin
+
+
+class SectionIndex:
+    """1軸方向の断面をすばやく求めるための索引
+
+    - 頂点を軸方向の座標で並べておき、区間に入る頂点を二分探索で取り出す
+    - 三角形を軸方向の最小値で並べておき、平面と交わる候補を二分探索で絞る
+    """
+
+    def __init__(self, vertices, faces, axis):
+        self.axis = axis
+        self.vertices = vertices
+        coords = vertices[:, axis]
+        self.vertex_order = np.argsort(coords)
+        self.sorted_coords = coords[self.vertex_order]
+        self.low = float(self.sorted_coords[0])
+        self.high = float(self.sorted_coords[-1])
+
+        face_coords = coords[faces]
+        lower = face_coords.min(axis=1)
+        order = np.argsort(lower)
+        self.faces = faces[order]
+        self.face_low = lower[order]
+        self.face_high = face_coords.max(axis=1)[order]
+
+    def section_points(self, offset):
+        """平面 axis=offset と交わる辺の交点 (k, 3)"""
+        end = np.searchsorted(self.face_low, offset, side='left')
+        faces = self.faces[:end][self.face_high[:end] > offset]
+        a = faces.reshape(-1)
+        b = faces[:, [1, 2, 0]].reshape(-1)
+        sa = self.vertices[a, self.axis] - offset
+        sb = self.vertices[b, self.axis] - offset
+        hit = (sa < 0) != (sb < 0)
+        t = (sa[hit] / (sa[hit] - sb[hit]))[:, None]
+        return self.vertices[a[hit]] + t * (self.vertices[b[hit]] - self.vertices[a[hit]])
+
+    def slab_extents(self, start, stop):
+        """start ≤ 座標 ≤ stop の部分の寸法 (3,)"""
+        first = np.searchsorted(self.sorted_coords, start, side='left')
+        last = np.searchsorted(self.sorted_coords, stop, side='right')
+        points = [self.vertices[self.vertex_order[first:last]]]
+        if start > self.low:
+            points.append(self.section_points(start))
+        if stop < self.high:
+            points.append(self.section_points(stop))
+        points = np.concatenate(points)
+        return points.max(axis=0) - points.min(axis=0)
+
+
+def plan_axis(index, p=DEFAULT_PARAMS, bed=BED_SIZE, along_only=False):
+    """1軸方向に切る位置のリスト（切らなくてよければ []、この軸だけでは収まらなければ None）
+
+    along_only=True なら軸方向の長さだけを見る（断面は後で別の軸で切る前提）
+    """
+    axis = index.axis
+    margin = joint_margin(axis, p)
+    longest = max(bed)
+
+    def fits(start, stop):
+        joined = stop < index.high  # 後ろに切り口があるピースにはソケットが付く
+        if along_only:
+            return stop - start + (margin[axis] if joined else 0) <= longest
+        return fits_bed(index.slab_extents(start, stop) + (margin if joined else 0), bed, rotate=True)
+
+    if fits(index.low, index.high):
+        return []
+
+    # 端から、収まる限り長く切る（1軸の区間の被覆なので貪欲法で最少）
+    cuts = []
+    start = index.low
+    while not fits(start, index.high):
+        if not fits(start, start + CUT_STEP):
+            return None
+        lower, upper = start + CUT_STEP, index.high
+        while upper - lower > CUT_STEP / 4:
+            middle = (lower + upper) / 2
+            if fits(start, middle):
+                lower = middle
+            else:
+                upper = middle
+        start = start + np.floor((lower - start) / CUT_STEP) * CUT_STEP
+        cuts.append(float(start))
+
+    # 同じ数で等分しても収まるなら等分にする
+    pieces = len(cuts) + 1
+    even = [float(np.round((index.low + (index.high - index.low) * k / pieces) / CUT_STEP) * CUT_STEP)
+            for k in range(1, pieces)]
+    bounds = [index.low] + even + [index.high]
+    if all(fits(a, b) for a, b in zip(bounds[:-1], bounds[1:])):
+        return even
+    return cuts
+
+
+def _compact(vertices, faces):
+    """溶接して、潰れた面（交点どうしが溶接の幅より近い細い三角形）と使われていない頂点を除く"""
+    vertices, faces = weld(vertices, faces)
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])]
+    used, inverse = np.unique(faces, return_inverse=True)
+    return vertices[used], inverse.reshape(-1, 3)
+
+
+def cut_mesh(vertices, faces, axis, offset):
+    """平面 axis=offset でメッシュを切り、切り口をふさいだ (下側, 上側) を返す"""
+    vertices = np.array(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    distance = vertices[:, axis] - offset
+    on_plane = np.abs(distance) < PLANE_EPSILON
+    distance[on_plane] = 0
+    vertices[on_plane, axis] = offset
+    side = np.sign(distance).astype(np.int8)
+
+    face_side = side[faces]
+    positive = (face_side > 0).sum(axis=1)
+    negative = (face_side < 0).sum(axis=1)
+    crossing = (positive > 0) & (negative > 0)
+    below = [faces[positive == 0]]
+    above = [faces[(negative == 0) & (positive > 0)]]
+
+    # 交点: 符号の違う辺ごとに1つ（両側の三角形で同じ点になるよう、番号の小さい頂点から計算）
+    cf = faces[crossing]
+    a = cf.reshape(-1)
+    b = cf[:, [1, 2, 0]].reshape(-1)
+    hit = side[a] * side[b] < 0
+    count = np.int64(len(vertices))
+    keys = np.minimum(a, b)[hit] * count + np.maximum(a, b)[hit]
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    i, j = unique_keys // count, unique_keys % count
+    t = (distance[i] / (distance[i] - distance[j]))[:, None]
+    points = vertices[i] + t * (vertices[j] - vertices[i])
+    points[:, axis] = offset
+    edge_point = np.full(len(a), -1, dtype=np.int64)
+    edge_point[hit] = count + inverse.reshape(-1)
+    edge_point = edge_point.reshape(-1, 3)  # edge_point[f, k]: 辺 k→k+1 上の交点
+    vertices = np.concatenate([vertices, points])
+
+    rows = np.arange(len(cf))
+    cs = face_side[crossing]
+
+    def rolled(r, k):
+        return cf[rows, (r + k) % 3]
+
+    # 1頂点が平面上: その頂点を先頭に回して、向かいの辺の交点で2つに分ける
+    zero = (cs == 0).any(axis=1)
+    r = np.argmax(cs == 0, axis=1)
+    v0, v1, v2 = rolled(r, 0), rolled(r, 1), rolled(r, 2)
+    point = edge_point[rows, (r + 1) % 3]
+    first = np.stack([v0, v1, point], axis=1)[zero]
+    second = np.stack([v0, point, v2], axis=1)[zero]
+    first_below = side[v1][zero] < 0
+    below += [first[first_below], second[~first_below]]
+    above += [first[~first_below], second[first_below]]
+
+    # 1頂点だけが反対側: その頂点を先頭に回して、1つと2つの三角形に分ける
+    lone_positive = (cs > 0).sum(axis=1) == 1
+    r = np.where(lone_positive, np.argmax(cs > 0, axis=1), np.argmax(cs < 0, axis=1))
+    lone, v1, v2 = rolled(r, 0), rolled(r, 1), rolled(r, 2)
+    p1 = edge_point[rows, r]
+    p2 = edge_point[rows, (r + 2) % 3]
+    keep = ~zero
+    tip = np.stack([lone, p1, p2], axis=1)[keep]
+    base = np.concatenate([np.stack([p1, v1, v2], axis=1)[keep], np.stack([p1, v2, p2], axis=1)[keep]])
+    tip_below = ~lone_positive[keep]
+    base_below = np.tile(~tip_below, 2)
+    below += [tip[tip_below], base[base_below]]
+    above += [tip[~tip_below], base[~base_below]]
+
+    below = np.concatenate(below)
+    above = np.concatenate(above)
+    plane = np.zeros(len(vertices), dtype=bool)
+    plane[:len(on_plane)] = on_plane
+    plane[len(on_plane):] = True
+    # 先に溶接して、同じ位置の交点を1つにする（T 字の継ぎ目をまたぐ壁の断面も1本のループになる）
+    vertices, index = weld(vertices, np.arange(len(vertices)))
+    below, above = index[below], index[above]
+    welded = np.zeros(len(vertices), dtype=bool)
+    welded[index[plane]] = True
+    cap = cap_faces(vertices, below, welded, axis)
+    return (_compact(vertices, np.concatenate([below, cap])),
+            _compact(vertices, np.concatenate([above, cap[:, [0, 2, 1]]])))
+
+
+def boundary_loops(faces, keep_edge=None):
+    """面の集合の境界エッジをつないだループ（頂点番号のリスト）
+
+    境界エッジは面と同じ向き（面を左に見て進む）でたどる
+    keep_edge: (始点, 終点) → bool 配列。指定すればそのエッジだけを使う
+    """
+    a = faces.reshape(-1)
+    b = faces[:, [1, 2, 0]].reshape(-1)
+    count = np.int64(faces.max() + 1) if len(faces) else np.int64(1)
+    boundary = ~np.isin(b * count + a, a * count + b)
+    if keep_edge is not None:
+        boundary &= keep_edge(a, b)
+
+    following = {}
+    for start, end in zip(a[boundary].tolist(), b[boundary].tolist()):
+        following.setdefault(start, []).append(end)
+    loops = []
+    while following:
+        start = next(iter(following))
+        loop = [start]
+        current = start
+        while True:
+            ends = following.get(current)
+            if not ends:
+                break  # 閉じていない（メッシュの穴など）ものは捨てる
+            end = ends.pop()
+            if not ends:
+                del following[current]
+            if end == start:
+                if len(loop) >= 3:
+                    loops.append(loop)
+                break
+            loop.append(end)
+            current = end
+    return loops
+
+
+def _plane_axes(axis):
+    """平面内の (u, v) 軸（u × v = +axis）"""
+    return (axis + 1) % 3, (axis + 2) % 3
+
+
+def _signed_area(points):
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def _contains(polygon, point):
+    """点が多角形の内側にあるか（交差数の偶奇）"""
+    a = polygon
+    b = np.roll(polygon, -1, axis=0)
+    straddle = (a[:, 1] > point[1]) != (b[:, 1] > point[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = a[:, 0] + (point[1] - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    return bool(np.count_nonzero(straddle & (x > point[0])) % 2)
+
+
+def cap_faces(vertices, faces, on_plane, axis):
+    """下側ピースの切り口をふさぐ三角形（+axis 向き）"""
+    # 平面上の辺を持てるのは、2頂点以上が平面上にある面だけ
+    faces = faces[on_plane[faces].sum(axis=1) >= 2]
+    loops = boundary_loops(faces, lambda a, b: on_plane[a] & on_plane[b])
+    # 下側ピースの境界を逆にたどると切り口の輪郭になる
+    loops = [loop[::-1] for loop in loops]
+    if not loops:
+        return np.zeros((0, 3), dtype=np.int64)
+
+    u, v = _plane_axes(axis)
+    plane = vertices[:, [u, v]]
+    areas = [_signed_area(plane[loop]) for loop in loops]
+    # 入れ子の深さが偶数なら外周、奇数なら穴（メッシュの向きに頼らない）
+    depth = [sum(_contains(plane[other], plane[loop[0]]) for k, other in enumerate(loops) if k != i)
+             for i, loop in enumerate(loops)]
+    outers = []
+    holes = []
+    for loop, area, level in zip(loops, areas, depth):
+        if level % 2 == 0:
+            outers.append(loop if area > 0 else loop[::-1])
+        else:
+            holes.append(loop if area < 0 else loop[::-1])
+
+    triangles = []
+    for outer in sorted(outers, key=lambda loop: abs(_signed_area(plane[loop]))):
+        # 穴は、それを含む外周のうち一番小さいものに割り当てる
+        mine = [hole for hole in holes if _contains(plane[outer], plane[hole[0]])]
+        holes = [hole for hole in holes if hole not in mine]
+        triangles += triangulate(plane, outer, mine)
+    return np.array(triangles, dtype=np.int64).reshape(-1, 3)
+
+
+def _cross(o, a, b):
+    return (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - (a[..., 1] - o[..., 1]) * (b[..., 0] - o[..., 0])
+
+
+def _inside_triangle(points, a, b, c, eps=TURN_EPSILON):
+    """三角形の内部（辺上は含まない）にある点"""
+    d1 = _cross(a, b, points)
+    d2 = _cross(b, c, points)
+    d3 = _cross(c, a, points)
+    return ((d1 > eps) & (d2 > eps) & (d3 > eps)) | ((d1 < -eps) & (d2 < -eps) & (d3 < -eps))
+
+
+def _bridge(plane, polygon, hole):
+    """穴を外周に橋渡しでつないだ1本の多角形にする（Eberly の方法）"""
+    k = int(np.argmax(plane[hole, 0]))
+    m = plane[hole[k]]
+    points = plane[polygon]
+    following = np.roll(points, -1, axis=0)
+
+    # 穴の最も右の点から右向きの半直線を出し、最初に当たる辺を探す
+    straddle = (points[:, 1] > m[1]) != (following[:, 1] > m[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = points[:, 0] + (m[1] - points[:, 1]) * (following[:, 0] - points[:, 0]) / (following[:, 1] - points[:, 1])
+    candidates = np.flatnonzero(straddle & (x >= m[0]))
+    if len(candidates):
+        edge = candidates[np.argmin(x[candidates])]
+        i = edge if points[edge, 0] > following[edge, 0] else (edge + 1) % len(polygon)
+        hit = np.array([x[edge], m[1]])
+        # 三角形 (m, 交点, 辺の端点) の中に凹頂点があれば、そのうち最も角度の小さいものにつなぐ
+        previous = np.roll(points, 1, axis=0)
+        reflex = _cross(previous, points, following) <= 0
+        inside = reflex & _inside_triangle(points, m, hit, points[i])
+        if inside.any():
+            options = np.flatnonzero(inside)
+            angle = np.abs(np.arctan2(points[options, 1] - m[1], points[options, 0] - m[0]))
+            i = options[np.argmin(angle)]
+    else:
+        i = int(np.argmin(np.linalg.norm(points - m, axis=1)))
+
+    hole_path = hole[k:] + hole[:k] + [hole[k]]
+    return polygon[:i + 1] + hole_path + polygon[i:]
+
+
+def triangulate(plane, outer, holes=()):
+    """穴あき多角形の三角形分割（耳切り法）
+
+    plane: 2D座標 (N, 2)、outer: 反時計回りの頂点番号、holes: 時計回りの頂点番号のリスト
+    戻り値: 反時計回りの三角形（頂点番号の3つ組）のリスト
+    """
+    polygon = list(outer)
+    for hole in sorted(holes, key=lambda loop: -plane[loop, 0].max()):
+        polygon = _bridge(plane, polygon, list(hole))
+
+    # 頂点を双方向リストでつなぎ、耳を切ったら両隣の凹凸だけを計算し直す
+    points = plane[polygon]
+    n = len(polygon)
+    previous = np.roll(np.arange(n), 1)
+    following = np.roll(np.arange(n), -1)
+    alive = np.ones(n, dtype=bool)
+    turn = _cross(points[previous], points, points[following])
+
+    def update(i):
+        turn[i] = _cross(points[previous[i]], points[i], points[following[i]])
+
+    def is_ear(i):
+        a, b, c = points[previous[i]], points[i], points[following[i]]
+        # 凹頂点（一直線のものを含む）が三角形に入っていれば耳ではない
+        # 新しくできる辺 c→a の上に乗る点も入っているものとする（取り残されると一直線の多角形が残る）
+        # 三角形の頂点と同じ座標の点（橋渡しで2回出てくる点）は a→b か b→c の上なので入らない
+        others = points[alive & (turn <= TURN_EPSILON)]
+        blocked = ((_cross(a, b, others) > TURN_EPSILON) & (_cross(b, c, others) > TURN_EPSILON)
+                   & (_cross(c, a, others) >= -TURN_EPSILON))
+        return not blocked.any()
+
+    triangles = []
+    remaining = n
+    i = 0
+    misses = 0
+    while remaining > 3:
+        # 一直線に近い頂点は耳にしない（面積ゼロの三角形ができる）
+        ear = turn[i] > TURN_EPSILON and is_ear(i)
+        if not ear and misses > remaining:
+            # 数値誤差で耳が見つからないときは最も凸な頂点
+            i = int(np.flatnonzero(alive)[np.argmax(turn[alive])])
+            ear = True
+        if not ear:
+            i = following[i]
+            misses += 1
+            continue
+        p, q = previous[i], following[i]
+        triangles.append((polygon[p], polygon[i], polygon[q]))
+        alive[i] = False
+        following[p] = q
+        previous[q] = p
+        update(p)
+        update(q)
+        remaining -= 1
+        misses = 0
+        i = p
+    i = int(np.flatnonzero(alive)[0])
+    triangles.append((polygon[previous[i]], polygon[i], polygon[following[i]]))
+    return triangles
+
+
+def cut_loops(vertices, faces, axis, offset):
+    """ピースの切り口（平面 axis=offset 上で +axis を向く面）の輪郭 [(k, 3), ...]
+
+    輪郭は +axis から見て材料を左に見る向き（外周は反時計回り、穴は時計回り）
+    """
+    on_plane = np.abs(vertices[:, axis] - offset) < PLANE_EPSILON
+    flat = on_plane[faces].all(axis=1)
+    u, v = _plane_axes(axis)
+    tri = vertices[faces[flat]]
+    facing = _cross(tri[:, 0, [u, v]], tri[:, 1, [u, v]], tri[:, 2, [u, v]]) > 0
+    loops = boundary_loops(faces[flat][facing])
+    return [vertices[loop] for loop in loops]
+
+
+def _thin_loop(loop, spacing):
+    """間隔が spacing より短い点を間引く（ずらした輪郭が細かい凹凸で折り返さないように）"""
+    keep = [0]
+    for i in range(1, len(loop)):
+        if np.linalg.norm(loop[i] - loop[keep[-1]]) >= spacing:
+            keep.append(i)
+    while len(keep) > 3 and np.linalg.norm(loop[keep[-1]] - loop[0]) < spacing:
+        keep.pop()
+    return loop[keep] if len(keep) >= 3 else loop
+
+
+def _offset_rings(loop, axis, profile, p=DEFAULT_PARAMS):
+    """切り口の輪郭をずらした輪を断面 profile [(輪郭から外向きのずれ, 平面からの距離), ...] の順に並べた閉じたシェル"""
+    loop = _thin_loop(loop, p.clearance)
+    u, v = _plane_axes(axis)
+    points = loop[:, [u, v]]
+    edge = np.roll(points, -1, axis=0) - points
+    normal = np.stack([edge[:, 1], -edge[:, 0]], axis=1)  # 材料と反対側（右手側）
+    normal /= np.linalg.norm(normal, axis=1, keepdims=True)
+    previous = np.roll(normal, 1, axis=0)
+    miter = (normal + previous) / (1 + np.einsum('ij,ij->i', normal, previous))[:, None]
+    length = np.linalg.norm(miter, axis=1, keepdims=True)
+    miter *= np.minimum(1, MITER_LIMIT / np.maximum(length, 1e-12))
+
+    direction = np.zeros((len(loop), 3))
+    direction[:, u] = miter[:, 0]
+    direction[:, v] = miter[:, 1]
+    along = np.zeros(3)
+    along[axis] = 1
+
+    rings = [loop + shift * direction + depth * along for shift, depth in profile]
+    builder = MeshBuilder()
+    builder.loft(rings + [rings[0]])
+    return builder.to_arrays()
+
+
+def socket_shell(loop, axis, p=DEFAULT_PARAMS):
+    """手前側のピースに足す（union）差し込み用ソケット: 切り口の壁を囲む厚さ step_thickness の枠
+
+    断面（輪郭から外向きのずれ, 平面からの距離）は次の六角形
+        手前側（-joint_depth〜-clearance）: -clearance 〜 clearance+step_thickness（壁に食い込ませて和でつなぐ）
+        相手側（-clearance〜+joint_depth）: clearance 〜 clearance+step_thickness（相手の壁が隙間つきで入る）
+    切り口の面と同じ平面に面を置かない（和で重なった面を分けられないため）
+    """
+    c, t, d = p.clearance, p.step_thickness, p.joint_depth
+    return _offset_rings(loop, axis, [(-c, -d), (c + t, -d), (c + t, d), (c, d), (c, -c), (-c, -c)], p)
+
+
+def socket_groove(loop, axis, p=DEFAULT_PARAMS):
+    """相手側のピースから引く（difference）溝: ソケットの枠を clearance だけ太らせたもの
+
+    壁の側は clearance / 2 だけ（切り口で相手の壁の面に触れないように）
+    """
+    c, t, d = p.clearance, p.step_thickness, p.joint_depth
+    return _offset_rings(loop, axis, [(c / 2, -c), (2 * c + t, -c), (2 * c + t, d + c), (c / 2, d + c)], p)
+
+
+def _bounds(vertices):
+    return vertices.min(axis=0), vertices.max(axis=0)
+
+
+def _overlaps(a, b):
+    return bool(np.all(a[0] <= b[1]) and np.all(b[0] <= a[1]))
+
+
+def _cut_all(piece, axis, cuts):
+    """ピース (vertices, faces, 切り口) を軸方向に順に切る
+
+    切り口は、そのピースが手前側になる平面 (軸, 位置) の集合（ソケットを付ける面）
+    """
+    vertices, faces, joints = piece
+    pieces = []
+    for offset in cuts:
+        below, (vertices, faces) = cut_mesh(vertices, faces, axis, offset)
+        pieces.append(below + (joints | {(axis, offset)},))
+    pieces.append((vertices, faces, joints))
+    return pieces
+
+
+def plan_split(piece, p=DEFAULT_PARAMS, bed=BED_SIZE, depth=MAX_DEPTH):
+    """収まるまで分割したピース [(vertices, faces, 切り口), ...]（どう分けても収まらなければ None）"""
+    vertices, faces, _ = piece
+    if fits_bed(vertices.max(axis=0) - vertices.min(axis=0), bed, rotate=True):
+        return [piece]
+
+    # 1軸だけで収まる切り方のうち、ピースが最も少ないもの
+    best = None
+    for axis in range(3):
+        cuts = plan_axis(SectionIndex(vertices, faces, axis), p, bed)
+        if cuts and (best is None or len(cuts) < len(best[1])):
+            best = (axis, cuts)
+    if best is not None:
+        return _cut_all(piece, *best)
+    if depth == 0:
+        return None
+
+    # 断面が大きすぎる: 長さだけで切ってから、各ピースを別の軸で切る
+    for axis in range(3):
+        cuts = plan_axis(SectionIndex(vertices, faces, axis), p, bed, along_only=True)
+        if not cuts:
+            continue
+        pieces = []
+        for part in _cut_all(piece, axis, cuts):
+            result = plan_split(part, p, bed, depth - 1)
+            if result is None:
+                break
+            pieces += result
+        else:
+            if best is None or len(pieces) < len(best):
+                best = pieces
+    return best
+
+
+def split_part(vertices, faces=None, p=DEFAULT_PARAMS, bed=BED_SIZE):
+    """パーツを分割してソケットを付ける
+    → (ピース [(vertices, faces), ...], 切った平面 [(軸, 位置), ...], 付けられなかったソケットと溝の数)
+
+    faces を省略すると三角形 (N, 3, 3) の並びとして扱う
+    """
+    vertices, faces = weld(vertices, faces)
+    faces, _ = orient_faces(vertices, faces)
+    pieces = plan_split((vertices, faces, frozenset()), p, bed)
+    if pieces is None:
+        raise ValueError("造形サイズに収まる分け方が見つかりません")
+
+    # 手前側のピースにはソケットを足し、それ以外のピースからはソケットの当たるところを溝として引く
+    # 演算の結果が閉じた立体にならなければ（自己交差しているメッシュなど）、そのソケットは付けない
+    skipped = 0
+    finished = []
+    attached = []
+    for piece_vertices, piece_faces, joints in pieces:
+        mesh = (piece_vertices, piece_faces)
+        grooves = []
+        for axis, offset in sorted(joints):
+            for loop in cut_loops(piece_vertices, piece_faces, axis, offset):
+                joined = union(mesh, socket_shell(loop, axis, p))
+                if validate(*joined).ok:
+                    mesh = joined
+                    grooves.append(socket_groove(loop, axis, p))
+                else:
+                    skipped += 1
+        finished.append(mesh)
+        attached.append(grooves)
+    for k, mesh in enumerate(finished):
+        for other, grooves in enumerate(attached):
+            for groove in grooves if other != k else ():
+                if not _overlaps(_bounds(mesh[0]), _bounds(groove[0])):
+                    continue
+                cut = difference(mesh, groove)
+                if validate(*cut).ok:
+                    mesh = cut
+                else:
+                    skipped += 1
+        finished[k] = mesh
+    planes = sorted(set().union(*(joints for _, _, joints in pieces)))
+    return finished, planes, skipped
+
+
+def main(argv=None):
+    from stl_export import save_stl
+    from variants import VARIANTS
+
+    parser = argparse.ArgumentParser(description='造形サイズに収まらないパーツを自動で分割')
+    parser.add_argument('targets', nargs='+', help='バリエーション名またはSTLファイル')
+    parser.add_argument('-o', '--out', default='.', help='出力先ディレクトリ')
+    args = parser.parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+
+    for target in args.targets:
+        if target in VARIANTS:
+            from variants import load_parts
+
+            parts = [(filename, func(DEFAULT_PARAMS)) for func, filename in load_parts(target)]
+        else:
+            from stl_reader import MappedSTL
+
+            parts = [(os.path.basename(target), (np.array(MappedSTL(target).vectors), None))]
+
+        for filename, (vertices, faces) in parts:
+            pieces, planes, skipped = split_part(vertices, faces)
+            if not planes:
+                print(f"✅ {filename}: 分割不要")
+                continue
+            cuts = ', '.join(f"{AXIS_NAMES[axis]}={offset:g}mm" for axis, offset in planes)
+            print(f"{filename}: {len(pieces)}分割（{cuts}）")
+            if not validate(*weld(vertices, faces)).watertight:
+                print("  * 閉じていないメッシュ（開いた縁で途切れる断面はふさがない）")
+            if skipped:
+                print(f"  * ソケット・溝 {skipped} 個は付けられませんでした（和・差の結果が閉じた立体にならない）")
+            stem = os.path.splitext(filename)[0]
+            for k, (piece_vertices, piece_faces) in enumerate(pieces, 1):
+                extents = piece_vertices.max(axis=0) - piece_vertices.min(axis=0)
+                report = validate(piece_vertices, piece_faces)
+                mark = '✅' if fits_bed(extents, rotate=True) and report.ok else '❌'
+                print(f"  {mark} {k}: {extents[0]:.1f}×{extents[1]:.1f}×{extents[2]:.1f}mm  {report.summary()}")
+                save_stl(piece_vertices, piece_faces, os.path.join(args.out, f"{stem}_split{k}.stl"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+平面スライサー（層ごとの輪郭と印刷時間の見積もり）
+
+- 三角形ごとに交わる層の範囲を z の最小・最大から求め、(層, 三角形) の組を全層まとめて作る
+  （z の区間インデックス: 各層は交わる三角形だけを調べ、交わらない三角形には触れない）
+- 交点は辺ごとに1つなので、辺の番号で線分の端点をつないで閉じた輪郭にする
+  （つなぐ順番は全層まとめてポインタジャンプで決める）
+- 輪郭の向きは面の向きから決まる（外周は反時計回り、穴は時計回り）
+- 押出長さ: 壁（周長 × 壁ライン数）+ 上下面のソリッド + インフィル
+- 時間: 壁は角ごとに止まる加減速つき、面を埋める線は面積から線の長さを見積もって計算
+  （速度・加速度は PRINT_SPEEDS の仮定値）
+
+使い方:
+    python3 slicer.py                     # 全バリエーション
+    python3 slicer.py hole ボディ\\ 15.stl  # バリエーション名またはSTLファイル
+"""
+
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from mesh_props import PRINT_SETTINGS
+from mesh_validate import twin_half_edges, weld
+
+FILAMENT_DIAMETER = 1.75  # mm
+CORNER_ANGLE = 45         # 度（これ以上曲がる頂点ではいったん止まるとみなす）
+
+# 速度の仮定値（Bambu Studio 0.20mm Standard @BBL A1 の既定値と仮定。PRINT_SETTINGS.md の記録は「標準 100%」だけ）
+# mm/s, mm/s²
+PRINT_SPEEDS = {
+    'initial_layer': 50,
+    'outer_wall': 200,
+    'inner_wall': 300,
+    'solid_infill': 250,
+    'sparse_infill': 270,
+    'acceleration': 10000,
+    'outer_wall_acceleration': 5000,
+}
+
+
+@dataclass(frozen=True)
+class Layer:
+    """1層分の輪郭（xy 座標 (k, 2) の閉じた折れ線。最後の点から最初の点に戻る）"""
+    z: float
+    loops: list = field(repr=False)
+    open_chains: list = field(default_factory=list, repr=False)  # 閉じていないメッシュの切れた輪郭
+
+    @property
+    def area(self):
+        """外周は正、穴は負の面積の合計 mm²"""
+        return sum(_signed_area(loop) for loop in self.loops)
+
+    @property
+    def perimeter(self):
+        return sum(_length(loop, closed=True) for loop in self.loops) + \
+            sum(_length(chain, closed=False) for chain in self.open_chains)
+
+
+@dataclass(frozen=True)
+class PrintEstimate:
+    """押出した線の長さ（mm）と時間（秒）"""
+    layers: int
+    wall_mm: float
+    solid_mm: float
+    infill_mm: float
+    filament_mm: float
+    seconds: float
+
+    @property
+    def extrusion_mm(self):
+        return self.wall_mm + self.solid_mm + self.infill_mm
+
+    def summary(self):
+        hours, rest = divmod(int(round(self.seconds)), 3600)
+        return (f"{self.layers}層 押出 {self.extrusion_mm / 1000:.1f}m "
+                f"フィラメント {self.filament_mm / 1000:.2f}m 約{hours}時間{rest // 60:02d}分")
+
+
+def _signed_area(loop):
+    x, y = loop[:, 0], loop[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def _length(points, closed):
+    steps = np.diff(points, axis=0, append=points[:1]) if closed else np.diff(points, axis=0)
+    return float(np.linalg.norm(steps, axis=1).sum())
+
+
+def layer_heights(vertices, layer_height=PRINT_SETTINGS['layer_height']):
+    """各層を切る高さ（層の真ん中）"""
+    low, high = float(vertices[:, 2].min()), float(vertices[:, 2].max())
+    count = max(int(np.ceil((high - low) / layer_height - 1e-9)), 1)
+    return low + (np.arange(count) + 0.5) * layer_height
+
+
+def slice_segments(vertices, faces, heights):
+    """全層の線分 → (層番号, 始点 (P, 2), 次の線分 (P,), 次がない線分の終点 (k, 2))
+
+    線分は面の外側を右に見る向き（外周が反時計回りになる向き）
+    次の線分は、終点の辺を共有する隣の三角形の同じ層の線分（面の向きがそろっていればそこから始まる）
+    """
+    z = vertices[:, 2]
+    face_z = z[faces]
+    low = face_z.min(axis=1)
+    high = face_z.max(axis=1)
+    step = heights[1] - heights[0] if len(heights) > 1 else 1.0
+    # heights[k] が low より上で high 以下の層 k だけと交わる
+    first = np.clip(np.floor((low - heights[0]) / step).astype(np.int64) + 1, 0, len(heights))
+    last = np.clip(np.floor((high - heights[0]) / step).astype(np.int64) + 1, 0, len(heights))
+    count = np.maximum(last - first, 0)
+    offset = np.cumsum(count) - count  # 三角形ごとの (層, 三角形) の組の先頭
+    total = int(count.sum())
+    face = np.repeat(np.arange(len(faces)), count)
+    layer = np.repeat(first - offset, count) + np.arange(total)
+
+    tri = faces[face]
+    above = z[tri] >= heights[layer][:, None]
+    ups = above.sum(axis=1)
+    mixed = (ups == 1) | (ups == 2)  # 丸め誤差で交わらなかった組を除く
+    segment = np.cumsum(mixed) - 1   # 組の番号 → 線分の番号
+    face, tri, layer, above, ups = face[mixed], tri[mixed], layer[mixed], above[mixed], ups[mixed]
+
+    # 1つだけ反対側にある頂点 k から出る辺 k→k+1 と、入る辺 k-1→k が交わる
+    # 面の向きがそろっていれば、その頂点が上なら k→k+1 の交点から k-1→k の交点へ進むと外周が反時計回り
+    lone = np.where(ups == 1, np.argmax(above, axis=1), np.argmin(above, axis=1))
+    flip = ups == 2
+    start_edge = np.where(flip, (lone + 2) % 3, lone)
+    end_edge = np.where(flip, lone, (lone + 2) % 3)
+    level = heights[layer]
+
+    def edge_point(rows, edge):
+        # 両側の三角形で同じ点になるよう、番号の小さい頂点から計算する
+        a = tri[rows, edge]
+        b = tri[rows, (edge + 1) % 3]
+        i = np.minimum(a, b)
+        j = np.maximum(a, b)
+        t = ((level[rows] - z[i]) / (z[j] - z[i]))[:, None]
+        return vertices[i, :2] + t * (vertices[j, :2] - vertices[i, :2])
+
+    start = edge_point(np.arange(len(tri)), start_edge)
+
+    # 終点の辺の向かいの三角形の、同じ層の線分が次の線分
+    twin = twin_half_edges(faces)[face * 3 + end_edge]
+    neighbor = np.where(twin >= 0, twin // 3, 0)
+    linked = (twin >= 0) & (layer >= first[neighbor]) & (layer < last[neighbor])
+    pair = np.where(linked, offset[neighbor] + layer - first[neighbor], 0)
+    linked &= mixed[pair]
+    following = np.where(linked, segment[pair], 0)
+    # 向きのそろっていない隣とはつながない（隣の線分がその辺から始まらない）
+    linked &= face[following] * 3 + start_edge[following] == twin
+    following = np.where(linked, following, -1)
+
+    tails = np.flatnonzero(~linked)
+    return layer, start, following, edge_point(tails, end_edge[tails])
+
+
+def _jump_to_root(following):
+    """ポインタジャンプで、各線分から末尾（following が自分自身）までの (末尾, 線分数)"""
+    distance = (following != np.arange(len(following))).astype(np.int64)
+    while True:
+        ahead = following[following]
+        if np.array_equal(ahead, following):
+            return following, distance
+        distance = distance + distance[following]
+        following = ahead
+
+
+def chain_segments(following):
+    """線分をつなぐ → (輪郭ごとにまとめた並べ替え順, 各輪郭の先頭位置, 閉じているか)
+
+    following: 次の線分の番号（次がなければ -1）
+    """
+    segments = len(following)
+    if segments == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+    index = np.arange(segments)
+    found = following >= 0
+    following = np.where(found, following, index)
+
+    # 閉じた輪郭の最小番号: 2^r 個先までの最小値が変わらなくなれば1周分を見渡している
+    # 切れた輪郭があるときは、末尾に行き着くまで（log2(線分数) 回）は必ずジャンプする
+    rounds = 0 if found.all() else int(np.ceil(np.log2(segments))) + 1
+    head = index
+    jump = following
+    while True:
+        updated = np.minimum(head, head[jump])
+        jump = jump[jump]
+        rounds -= 1
+        if rounds < 0 and np.array_equal(updated, head):
+            break
+        head = updated
+    closed = found[jump]  # 切れた輪郭なら末尾（次がない線分）に行き着いている
+
+    # 閉じた輪郭は番号が最小の線分の手前で切り、切れた輪郭と同じく末尾までの距離で並べる
+    following = np.where(closed & (following == head), index, following)
+    root, distance = _jump_to_root(following)
+    by_chain = np.lexsort((-distance, root))
+    chain = root[by_chain]
+    starts = np.flatnonzero(np.r_[True, chain[1:] != chain[:-1]])
+    return by_chain, starts, closed[by_chain[starts]]
+
+
+def slice_mesh(vertices, faces=None, layer_height=PRINT_SETTINGS['layer_height']):
+    """メッシュを層に切る → [Layer, ...]（下の層から順）
+
+    faces を省略すると三角形 (N, 3, 3) の並び（mesh.Mesh.vectors や MappedSTL.vectors）として扱う
+    面の向きがそろっていないと輪郭がつながらない（mesh_repair.orient_faces を通しておく）
+    """
+    vertices, faces = weld(vertices, faces)
+    heights = layer_heights(vertices, layer_height)
+    layer, start, following, tail_end = slice_segments(vertices, faces, heights)
+    by_chain, starts, closed = chain_segments(following)
+    tails = np.flatnonzero(following < 0)
+
+    points = start[by_chain]
+    bounds = np.append(starts, len(by_chain))
+    loops = [[] for _ in heights]
+    open_chains = [[] for _ in heights]
+    for k, (first, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        level = layer[by_chain[first]]
+        if closed[k]:
+            loops[level].append(points[first:stop])
+        else:
+            # 切れた輪郭は最後の線分の終点まで含める
+            end = tail_end[np.searchsorted(tails, by_chain[stop - 1])]
+            open_chains[level].append(np.concatenate([points[first:stop], end[None]]))
+    return [Layer(float(z), layer_loops, chains)
+            for z, layer_loops, chains in zip(heights, loops, open_chains)]
+
+
+def _move_time(length, speed, acceleration):
+    """止まった状態から length 動いて止まるまでの時間（台形の速度変化）"""
+    length = np.asarray(length, dtype=np.float64)
+    cruise = length >= speed * speed / acceleration
+    return np.where(cruise, length / speed + speed / acceleration,
+                    2 * np.sqrt(np.maximum(length, 0) / acceleration))
+
+
+def stroke_lengths(loop):
+    """閉じた輪郭を、CORNER_ANGLE 以上曲がる角で区切った一筆ごとの長さ"""
+    steps = np.roll(loop, -1, axis=0) - loop
+    lengths = np.linalg.norm(steps, axis=1)
+    direction = steps / np.maximum(lengths, 1e-12)[:, None]
+    turn = np.einsum('ij,ij->i', np.roll(direction, 1, axis=0), direction)
+    corners = np.flatnonzero(turn < np.cos(np.radians(CORNER_ANGLE)))
+    if len(corners) == 0:
+        return lengths.sum(keepdims=True)  # 角のない輪郭（円など）は一筆で回る
+    # 最初の角から始めて角ごとに区切る
+    rolled = np.roll(lengths, -corners[0])
+    return np.add.reduceat(rolled, corners - corners[0])
+
+
+def _fill_time(area, spacing, speed, acceleration):
+    """面積 area を間隔 spacing の平行線で埋める時間（線の長さは面積の平方根とみなす）"""
+    if area <= 0:
+        return 0.0, 0.0
+    length = area / spacing
+    line = min(np.sqrt(area), length)
+    return length, float(length / line * _move_time(line, speed, acceleration))
+
+
+def estimate_print(layers, settings=PRINT_SETTINGS, speeds=PRINT_SPEEDS):
+    """押出長さと印刷時間の見積もり
+
+    - 壁: 周長 × 壁ライン数（1周目が外壁）
+    - 上下面: 上 top_layers 層・下 bottom_layers 層のどこかで断面が小さくなる部分はソリッド
+    - 残りはインフィル率で埋める
+    """
+    height = settings['layer_height']
+    width = settings['line_width']
+    walls = settings['wall_loops']
+    areas = np.array([max(layer.area, 0.0) for layer in layers])
+    # 上下の層の断面積の最小値（範囲の外は面積 0 = 露出面）
+    top, bottom = settings['top_layers'], settings['bottom_layers']
+    padded = np.concatenate([np.zeros(bottom), areas, np.zeros(top)])
+    windows_below = np.lib.stride_tricks.sliding_window_view(padded[:-top - 1], bottom)
+    windows_above = np.lib.stride_tricks.sliding_window_view(padded[bottom + 1:], top)
+    covered = np.minimum(windows_below.min(axis=1), windows_above.min(axis=1))
+
+    wall_mm = solid_mm = infill_mm = seconds = 0.0
+    for k, (layer, area) in enumerate(zip(layers, areas)):
+        limit = speeds['initial_layer'] if k == 0 else np.inf
+        outer_speed = min(speeds['outer_wall'], limit)
+        inner_speed = min(speeds['inner_wall'], limit)
+        strokes = [stroke_lengths(loop) for loop in layer.loops if len(loop) >= 2]
+        strokes += [np.linalg.norm(np.diff(chain, axis=0), axis=1).sum(keepdims=True)
+                    for chain in layer.open_chains]
+        perimeter = 0.0
+        if strokes:
+            strokes = np.concatenate(strokes)
+            perimeter = float(strokes.sum())
+            # 肉厚が壁ライン数分より薄いところは、断面を埋める分しか壁を引けない
+            share = min(1.0, area / (perimeter * walls * width)) if layer.loops else 1.0
+            seconds += share * float(_move_time(strokes, outer_speed, speeds['outer_wall_acceleration']).sum())
+            seconds += share * (walls - 1) * float(_move_time(strokes, inner_speed, speeds['acceleration']).sum())
+            wall_mm += share * perimeter * walls
+
+        inside = max(area - perimeter * walls * width, 0.0)
+        solid = min(max(area - covered[k], 0.0), inside)
+        length, time = _fill_time(solid, width, min(speeds['solid_infill'], limit), speeds['acceleration'])
+        solid_mm += length
+        seconds += time
+        length, time = _fill_time((inside - solid) * settings['infill'], width,
+                                  min(speeds['sparse_infill'], limit), speeds['acceleration'])
+        infill_mm += length
+        seconds += time
+
+    # 押し出した線の断面（ライン幅 × 積層ピッチ）からフィラメントの長さを出す
+    extruded = (wall_mm + solid_mm + infill_mm) * width * height
+    filament_mm = extruded / (np.pi * (FILAMENT_DIAMETER / 2) ** 2)
+    return PrintEstimate(len(layers), float(wall_mm), float(solid_mm), float(infill_mm),
+                         float(filament_mm), float(seconds))
+
+
+def main(argv=None):
+    from mesh_repair import orient_faces
+    from variants import VARIANTS
+
+    targets = (sys.argv[1:] if argv is None else argv) or list(VARIANTS)
+    print(f"{'パーツ':<28} {'層数':>5} {'押出[m]':>8} {'フィラメント[m]':>15} {'時間':>10}")
+    total = 0.0
+    marked = False
+    for target in targets:
+        if target in VARIANTS:
+            from chute_params import DEFAULT_PARAMS
+            from variants import load_parts
+
+            parts = [(filename, func(DEFAULT_PARAMS)) for func, filename in load_parts(target)]
+        else:
+            from stl_reader import MappedSTL
+
+            parts = [(target, weld(MappedSTL(target).vectors))]
+        for name, (vertices, faces) in parts:
+            faces, _ = orient_faces(vertices, faces)
+            layers = slice_mesh(vertices, faces)
+            estimate = estimate_print(layers)
+            total += estimate.seconds
+            hours, rest = divmod(int(round(estimate.seconds)), 3600)
+            mark = ' *' if any(layer.open_chains for layer in layers) else ''
+            marked |= bool(mark)
+            print(f"{name + mark:<28} {estimate.layers:>5} {estimate.extrusion_mm / 1000:>8.1f} "
+                  f"{estimate.filament_mm / 1000:>15.2f} {hours:>4}時間{rest // 60:02d}分")
+    hours, rest = divmod(int(round(total)), 3600)
+    print(f"{'合計':<28} {'':>5} {'':>8} {'':>15} {hours:>4}時間{rest // 60:02d}分")
+    if marked:
+        print("* 閉じていないメッシュ（輪郭が切れるので参考値）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
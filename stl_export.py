@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+STL出力の共通モジュール
+各生成スクリプトの save_stl をまとめたもの
+
+- 頂点配列 + 面インデックス配列から三角形を一括で組み立てる（vertices[faces]）
+- 法線もまとめて計算する（外積 → 単位ベクトル化）
+- save_stl は書き出す前に面の向き（巻き順）をそろえる（mesh_repair）
+- write_stl は三角形ブロックのイテレータを受け取り、ファイルへ逐次書き込む
+  （メモリ使用量はブロックの大きさだけで決まる）
+- write_ply は頂点ごと・面ごとの色をつけたバイナリ PLY（肉厚マップ・ずれのヒートマップ用）
+"""
+
+import os
+import struct
+
+import numpy as np
+from stl import mesh
+
+# バイナリSTLの1三角形分のレコード（50バイト）
+STL_RECORD = np.dtype([
+    ('normals', '<f4', (3,)),
+    ('vectors', '<f4', (3, 3)),
+    ('attr', '<u2'),
+])
+HEADER_SIZE = 80
+CHUNK_SIZE = 65536  # 1ブロックあたりの三角形数
+
+
+def face_normals(triangles):
+    """
+    三角形配列 (N, 3, 3) から単位法線 (N, 3) を一括計算
+    面積ゼロの三角形は法線 0 のまま
+    """
+    normals = np.cross(triangles[:, 1] - triangles[:, 0],
+                       triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    nonzero = lengths > 0
+    normals[nonzero] /= lengths[nonzero, None]
+    return normals
+
+
+def build_mesh(vertices, faces):
+    """頂点配列と面インデックスから mesh.Mesh を組み立てる"""
+    # STLは float32 なので先に頂点を変換してから取り出す（変換は頂点数分だけ）
+    vertices = np.asarray(vertices, dtype=np.float32)
+    faces = np.asarray(faces, dtype=np.intp)
+
+    data = np.zeros(faces.shape[0], dtype=mesh.Mesh.dtype)
+    # 1回のファンシーインデックスで全三角形を取り出す
+    triangles = vertices[faces]
+    data['vectors'] = triangles
+    data['normals'] = face_normals(triangles)
+    return mesh.Mesh(data, remove_empty_areas=False)
+
+
+def iter_triangle_blocks(vertices, faces, chunk_size=CHUNK_SIZE):
+    """頂点配列と面インデックスから (chunk_size, 3, 3) の三角形ブロックを順に返す"""
+    vertices = np.asarray(vertices, dtype=np.float32)
+    faces = np.asarray(faces, dtype=np.intp)
+    for start in range(0, len(faces), chunk_size):
+        yield vertices[faces[start:start + chunk_size]]
+
+
+def _header(filename):
+    """80バイトのヘッダ（"solid" で始めるとASCIIと誤認されるので避ける）"""
+    name = os.path.basename(filename).encode('utf-8')
+    return (b'coin_chute ' + name)[:HEADER_SIZE].ljust(HEADER_SIZE, b' ')
+
+
+def _write_binary(fh, filename, blocks):
+    fh.write(_header(filename))
+    fh.write(struct.pack('<I', 0))  # 三角形数は最後に書き戻す
+
+    count = 0
+    for block in blocks:
+        triangles = np.asarray(block, dtype=np.float32).reshape(-1, 3, 3)
+        records = np.zeros(len(triangles), dtype=STL_RECORD)
+        records['vectors'] = triangles
+        records['normals'] = face_normals(triangles)
+        fh.write(records.tobytes())
+        count += len(triangles)
+
+    fh.seek(HEADER_SIZE)
+    fh.write(struct.pack('<I', count))
+    return count
+
+
+def _write_ascii(fh, filename, blocks):
+    name = os.path.splitext(os.path.basename(filename))[0]
+    fh.write(f'solid {name}\n'.encode('utf-8'))
+
+    facet = ('facet normal %.7e %.7e %.7e\n'
+             '  outer loop\n'
+             '    vertex %.7e %.7e %.7e\n'
+             '    vertex %.7e %.7e %.7e\n'
+             '    vertex %.7e %.7e %.7e\n'
+             '  endloop\n'
+             'endfacet\n')
+    count = 0
+    for block in blocks:
+        triangles = np.asarray(block, dtype=np.float32).reshape(-1, 3, 3)
+        values = np.concatenate([face_normals(triangles), triangles.reshape(-1, 9)], axis=1)
+        fh.write(''.join(facet % tuple(row) for row in values.tolist()).encode('ascii'))
+        count += len(triangles)
+
+    fh.write(f'endsolid {name}\n'.encode('utf-8'))
+    return count
+
+
+def write_stl(filename, blocks, ascii=False):
+    """
+    三角形ブロック (k, 3, 3) のイテレータを STL ファイルへ逐次書き込む
+    バイナリでは三角形数をヘッダに最後に書き戻す
+    ascii=True はデバッグ用のテキスト形式
+    書き込んだ三角形数を返す
+    """
+    with open(filename, 'wb') as fh:
+        if ascii:
+            return _write_ascii(fh, filename, blocks)
+        return _write_binary(fh, filename, blocks)
+
+
+def save_stl(vertices, faces, filename, ascii=False, orient=True):
+    """STLファイルに保存（orient=True なら mesh_repair で面の向きをそろえてから書く）"""
+    if orient:
+        from mesh_repair import orient_faces  # mesh_repair がこのモジュールを import するため
+
+        faces, _ = orient_faces(vertices, faces)
+    write_stl(filename, iter_triangle_blocks(vertices, faces), ascii=ascii)
+    print(f"✅ {filename} を生成しました")
+
+
+def write_ply(path, vertices, faces, vertex_colors=None, face_colors=None):
+    """色つきのバイナリ PLY を書き出す（vertex_colors: 頂点ごと (V, 3)、face_colors: 面ごと (F, 3) の uchar）"""
+    header = ["ply", "format binary_little_endian 1.0", f"element vertex {len(vertices)}",
+              "property float x", "property float y", "property float z"]
+    point_fields = [('position', '<f4', (3,))]
+    if vertex_colors is not None:
+        header += ["property uchar red", "property uchar green", "property uchar blue"]
+        point_fields.append(('color', 'u1', (3,)))
+    header += [f"element face {len(faces)}", "property list uchar int vertex_indices"]
+    face_fields = [('count', 'u1'), ('vertices', '<i4', (3,))]
+    if face_colors is not None:
+        header += ["property uchar red", "property uchar green", "property uchar blue"]
+        face_fields.append(('color', 'u1', (3,)))
+
+    points = np.empty(len(vertices), dtype=point_fields)
+    points['position'] = vertices
+    records = np.empty(len(faces), dtype=face_fields)
+    records['count'] = 3
+    records['vertices'] = faces
+    if vertex_colors is not None:
+        points['color'] = vertex_colors
+    if face_colors is not None:
+        records['color'] = face_colors
+    with open(path, 'wb') as fh:
+        fh.write(("\n".join(header + ["end_header"]) + "\n").encode('ascii'))
+        fh.write(points.tobytes())
+        fh.write(records.tobytes())
+    print(f"✅ {path} を生成しました")
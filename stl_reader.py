@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+バイナリSTLのメモリマップ読み込み
+Shapr3D から書き出したボディ（ボディ 15.stl など）との比較用
+
+- ファイルを np.memmap で開き、三角形レコードを構造化 dtype のビューとして見せる
+- 読み込み時にコピーしない。触った範囲だけがページインされる
+- バウンディングボックスはブロックごとに計算してキャッシュする
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from stl_export import HEADER_SIZE, STL_RECORD
+
+BLOCK_SIZE = 65536  # バウンディングボックス計算時の1ブロックの三角形数
+
+
+class MappedSTL:
+    """バイナリSTLをコピーなしで参照する"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        size = os.path.getsize(filename)
+        with open(filename, 'rb') as fh:
+            header = fh.read(HEADER_SIZE + 4)
+        if len(header) < HEADER_SIZE + 4:
+            raise ValueError(f"{filename}: STLヘッダが短すぎます")
+
+        count = struct.unpack('<I', header[HEADER_SIZE:])[0]
+        if size != HEADER_SIZE + 4 + count * STL_RECORD.itemsize:
+            raise ValueError(f"{filename}: バイナリSTLではありません（ASCII形式は未対応）")
+
+        self.header = header[:HEADER_SIZE]
+        self.count = count
+        if count:
+            self.records = np.memmap(filename, dtype=STL_RECORD, mode='r',
+                                     offset=HEADER_SIZE + 4, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=STL_RECORD)
+        self._bounds = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def vectors(self):
+        """三角形の頂点 (N, 3, 3) のビュー（コピーなし）"""
+        return self.records['vectors']
+
+    @property
+    def normals(self):
+        """法線 (N, 3) のビュー（コピーなし）"""
+        return self.records['normals']
+
+    def triangles(self, start=0, stop=None):
+        """指定範囲の三角形 (k, 3, 3) のビュー"""
+        return self.vectors[start:stop]
+
+    def iter_blocks(self, block_size=BLOCK_SIZE):
+        """三角形を block_size ずつ順に返す（write_stl にそのまま渡せる）"""
+        for start in range(0, self.count, block_size):
+            yield self.vectors[start:start + block_size]
+
+    def bounds(self):
+        """バウンディングボックス (min(3,), max(3,))"""
+        if self._bounds is None:
+            lower = np.full(3, np.inf, dtype=np.float32)
+            upper = np.full(3, -np.inf, dtype=np.float32)
+            for block in self.iter_blocks():
+                # レコードは50バイト刻みで揃っていないので、ブロック単位で詰め直してから集計
+                points = np.ascontiguousarray(block).reshape(-1, 3)
+                np.minimum(lower, points.min(axis=0), out=lower)
+                np.maximum(upper, points.max(axis=0), out=upper)
+            self._bounds = (lower, upper)
+        return self._bounds
+
+    @property
+    def size(self):
+        """バウンディングボックスの寸法 (3,)"""
+        lower, upper = self.bounds()
+        return upper - lower
+
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+パラメータスイープ（複数プロセスでまとめて生成）
+
+グリッドファイル（JSON）の例:
+    {
+        "variant": "hole",
+        "base": {"segments": 64},
+        "grid": {
+            "slope_angle": [15, 20, 25, 30, 35],
+            "hole_position": [40, 60],
+            "clearance": [0.2, 0.3]
+        }
+    }
+
+- grid の全組み合わせ × base を ChuteParams にして create_*_part で生成
+- 出力: <出力先>/<バリエーションID>/*.stl と manifest.json / manifest.csv
+- 各パーツは mesh_validate で水密・多様体チェックし、境界エッジ数なども manifest に書く
+- 途中で止めても、再実行すれば完了済みのバリエーションは飛ばす
+- 各パーツを mesh_simplify で減らしたプレビュー用の LOD（既定 1%, 10%。--lod で比率を変え、--no-lod で省く）も
+  <パーツ>_lod1.stl などに書き出し、manifest の lod（{'1%': {file, triangles, ratio}, ..., '100%': ...}）に記録する
+  （ratio は実際の割合。小さくて減らせないパーツの LOD は書き出さず、元のファイルを指す）
+
+使い方:
+    python3 sweep.py grid.json [-o sweep_out] [-j プロセス数] [--lod 0.01,0.1 | --no-lod]
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields
+
+import numpy as np
+
+from chute_params import ChuteParams
+from mesh_props import mesh_properties
+from mesh_repair import orient_faces
+from mesh_simplify import LOD_RATIOS, lod_label, parse_ratios, write_lods
+from mesh_validate import validate
+from stl_export import iter_triangle_blocks, write_stl
+from variants import VARIANTS, load_parts
+
+MANIFEST_JSON = 'manifest.json'
+MANIFEST_CSV = 'manifest.csv'
+
+
+def load_grid(path):
+    """グリッドファイルを読んで (バリエーション名, [パラメータ辞書, ...]) を返す"""
+    with open(path, encoding='utf-8') as fh:
+        spec = json.load(fh)
+
+    variant = spec.get('variant', 'hole')
+    if variant not in VARIANTS:
+        raise ValueError(f"不明なバリエーション: {variant}")
+
+    base = spec.get('base', {})
+    grid = spec.get('grid', {})
+    known = {f.name for f in fields(ChuteParams) if f.init}
+    unknown = (set(base) | set(grid)) - known
+    if unknown:
+        raise ValueError(f"ChuteParams にないパラメータ: {', '.join(sorted(unknown))}")
+
+    names = sorted(grid)
+    combos = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(base)
+        params.update(zip(names, values))
+        combos.append(params)
+    return variant, combos
+
+
+def variant_id(variant, params):
+    """パラメータから決まる短いID（再開時の照合に使う）"""
+    payload = json.dumps({'variant': variant, 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def part_metrics(vertices, faces):
+    """パーツごとの指標（mesh_validate のチェック結果と mesh_props の体積・PLA質量を含む）"""
+    size = vertices.max(axis=0) - vertices.min(axis=0)
+    metrics = {
+        'triangles': int(len(faces)),
+        'vertices': int(len(vertices)),
+        'size_x': round(float(size[0]), 3),
+        'size_y': round(float(size[1]), 3),
+        'size_z': round(float(size[2]), 3),
+    }
+    report = validate(vertices, faces)
+    metrics['watertight'] = report.watertight
+    metrics.update(report.counts())
+    props = mesh_properties((vertices, faces))
+    metrics['volume_cm3'] = round(abs(props.volume) / 1000, 3)
+    metrics['pla_g'] = round(props.print_estimate('PLA')['grams'], 1)
+    return metrics
+
+
+def build_variant(variant, params, out_dir, lod=LOD_RATIOS):
+    """1バリエーション分を生成して manifest の1レコードを返す（子プロセスで実行）
+
+    lod: LOD の比率（parse_ratios の結果。空なら LOD は作らない）
+    """
+    vid = variant_id(variant, params)
+    record = {'id': vid, 'variant': variant, 'params': params, 'parts': {}}
+    start = time.perf_counter()
+    try:
+        chute = ChuteParams(**params)
+        variant_dir = os.path.join(out_dir, vid)
+        os.makedirs(variant_dir, exist_ok=True)
+        for func, filename in load_parts(variant):
+            part_start = time.perf_counter()
+            vertices, faces = func(chute)
+            faces, _ = orient_faces(vertices, faces)
+            path = os.path.join(variant_dir, filename)
+            write_stl(path, iter_triangle_blocks(vertices, faces))
+            metrics = part_metrics(np.asarray(vertices), np.asarray(faces))
+            metrics['file'] = os.path.relpath(path, out_dir)
+            if lod:
+                metrics['lod'] = {label: dict(level, file=os.path.relpath(level['file'], out_dir))
+                                  for label, level in write_lods(vertices, faces, path, lod).items()}
+            metrics['seconds'] = round(time.perf_counter() - part_start, 4)
+            record['parts'][filename] = metrics
+        record['status'] = 'ok'
+    except Exception as exc:  # 1つの失敗でスイープ全体を止めない
+        record['status'] = 'error'
+        record['error'] = f"{type(exc).__name__}: {exc}"
+    record['seconds'] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def is_done(record, out_dir, lod=LOD_RATIOS):
+    """完了済みで出力ファイル（lod があればその LOD も）も揃っているか"""
+    if record.get('status') != 'ok':
+        return False
+    files = []
+    for part in record['parts'].values():
+        levels = part.get('lod', {})
+        if any(lod_label(ratio) not in levels for ratio in lod):
+            return False
+        files += [part['file']] + [level['file'] for level in levels.values()]
+    return all(os.path.exists(os.path.join(out_dir, file)) for file in files)
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_JSON)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as fh:
+        return {record['id']: record for record in json.load(fh)}
+
+
+def write_manifest(out_dir, records):
+    """manifest.json（全情報）と manifest.csv（パーツ1行）を書き出す"""
+    records = sorted(records.values(), key=lambda r: r['id'])
+    path = os.path.join(out_dir, MANIFEST_JSON)
+    with open(path + '.tmp', 'w', encoding='utf-8') as fh:
+        json.dump(records, fh, ensure_ascii=False, indent=1)
+    os.replace(path + '.tmp', path)
+
+    param_names = sorted({name for r in records for name in r['params']})
+    metric_names = ['triangles', 'vertices', 'size_x', 'size_y', 'size_z', 'watertight',
+                    'boundary_edges', 'nonmanifold_edges', 'flipped_edges', 'degenerate_faces',
+                    'volume_cm3', 'pla_g', 'seconds', 'file', 'lod']
+    path = os.path.join(out_dir, MANIFEST_CSV)
+    with open(path + '.tmp', 'w', newline='', encoding='utf-8') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(['id', 'variant', 'status'] + param_names + ['part'] + metric_names)
+        for r in records:
+            head = [r['id'], r['variant'], r['status']] + [r['params'].get(n, '') for n in param_names]
+            if not r['parts']:
+                writer.writerow(head + [''] + [''] * len(metric_names))
+            for part, metrics in sorted(r['parts'].items()):
+                row = dict(metrics)
+                # LOD は「1%=N(実際の割合) 10%=M(...) 100%=F(100%)」（三角形数）の1列にする
+                row['lod'] = ' '.join(f"{label}={level['triangles']}({lod_label(level['ratio'])})"
+                                      for label, level in metrics.get('lod', {}).items())
+                writer.writerow(head + [part] + [row.get(n, '') for n in metric_names])
+    os.replace(path + '.tmp', path)
+
+
+def sweep(grid_path, out_dir, workers=None, resume=True, lod=LOD_RATIOS):
+    """スイープを実行して manifest のレコード辞書を返す（lod: LOD の比率）"""
+    variant, combos = load_grid(grid_path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    records = load_manifest(out_dir) if resume else {}
+    todo = [params for params in combos
+            if not (variant_id(variant, params) in records
+                    and is_done(records[variant_id(variant, params)], out_dir, lod))]
+    print(f"スイープ: {variant} {len(combos)}通り（完了済み {len(combos) - len(todo)}、残り {len(todo)}）")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_variant, variant, params, out_dir, lod) for params in todo]
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            records[record['id']] = record
+            # 1件ごとに manifest を更新（中断しても完了分は残る）
+            write_manifest(out_dir, records)
+            mark = '✅' if record['status'] == 'ok' else '❌'
+            print(f"{mark} [{done}/{len(todo)}] {record['id']} {record['params']}"
+                  + (f" {record['error']}" if record['status'] != 'ok' else ''))
+
+    write_manifest(out_dir, records)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='コインシュートのパラメータスイープ')
+    parser.add_argument('grid', help='グリッドファイル（JSON）')
+    parser.add_argument('-o', '--out', default='sweep_out', help='出力先ディレクトリ')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='プロセス数（既定: CPU数）')
+    parser.add_argument('--no-resume', action='store_true', help='完了済みも含めて作り直す')
+    default_lod = ','.join(f'{r:g}' for r in LOD_RATIOS if r < 1)
+    parser.add_argument('--lod', nargs='?', const=default_lod, default=default_lod, metavar='RATIOS',
+                        help='プレビュー用の LOD の比率（既定: 0.01,0.1）')
+    parser.add_argument('--no-lod', action='store_true', help='プレビュー用の LOD を書き出さない')
+    args = parser.parse_args(argv)
+
+    lod = () if args.no_lod else parse_ratios(args.lod)
+    records = sweep(args.grid, args.out, workers=args.jobs, resume=not args.no_resume, lod=lod)
+    failed = sum(1 for r in records.values() if r['status'] != 'ok')
+    print(f"\n✅ 完了: {len(records) - failed}件 / 失敗: {failed}件 → {args.out}/{MANIFEST_CSV}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
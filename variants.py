@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+生成スクリプトの一覧（バリエーション名 → モジュールとパーツ）
+sweep やまとめて生成する処理から使う
+
+モジュールは必要になったときに import する
+"""
+
+import importlib
+
+# バリエーション名: (モジュール名, [(生成関数名, 出力ファイル名), ...])
+VARIANTS = {
+    'hole': ('generate_stl', [
+        ('create_upper_part', 'coin_chute_upper.stl'),
+        ('create_lower_part', 'coin_chute_lower.stl'),
+    ]),
+    'snap': ('generate_stl_snap_fit', [
+        ('create_upper_part_snap', 'coin_chute_upper_snap.stl'),
+        ('create_lower_part_snap', 'coin_chute_lower_snap.stl'),
+    ]),
+    'slot': ('generate_stl_open_slot', [
+        ('create_upper_part_open', 'coin_chute_upper_open.stl'),
+        ('create_lower_part_open', 'coin_chute_lower_open.stl'),
+    ]),
+    'frontback': ('generate_stl_front_back', [
+        ('create_back_part', 'coin_chute_back.stl'),
+        ('create_front_part', 'coin_chute_front.stl'),
+    ]),
+    'scad': ('generate_stl_scad', [
+        ('create_upper_part_scad', 'coin_chute_upper_scad.stl'),
+        ('create_lower_part_scad', 'coin_chute_lower_scad.stl'),
+    ]),
+}
+
+
+def load_parts(variant):
+    """[(生成関数, 出力ファイル名), ...] を返す"""
+    if variant not in VARIANTS:
+        raise ValueError(f"不明なバリエーション: {variant}（{', '.join(VARIANTS)}）")
+    module_name, parts = VARIANTS[variant]
+    module = importlib.import_module(module_name)
+    return [(getattr(module, func_name), filename) for func_name, filename in parts]
+
+
+def part_surfaces(func, params):
+    """
+    パーツの曲面 S(u, v) の一覧（誤差の測定用）
+    生成関数 create_X と同じモジュールに X_surfaces があればその戻り値、なければ []（平面だけのパーツ）
+    """
+    module = importlib.import_module(func.__module__)
+    surfaces = getattr(module, func.__name__.removeprefix('create_') + '_surfaces', None)
+    return surfaces(params) if surfaces is not None else []
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+肉厚マップ（内向きの光線をまとめて飛ばす）
+
+- 各面の中心から、法線の逆向き（内側）に光線を1本ずつ飛ばし、最初に当たった面までの距離を肉厚とする
+  （全面の光線を bvh.BVH.intersect に一度に渡す。面の向きは先に mesh_repair でそろえる）
+- MIN_THICKNESS（壁ライン数 × ライン幅）より薄い面を、辺でつながるかたまりごとにまとめて報告する
+  （つながりは mesh_validate.twin_half_edges の向かいの半辺から、ラベルの最小値を伝えてポインタジャンプ）
+- 設計の壁厚 (ChuteParams.wall_thickness) と比べて、厚すぎる面の割合も出す
+- --ply で面ごとに色をつけた PLY を書き出す（赤: 印刷できない薄さ、黄→緑: 設計の壁厚まで、緑→青: それ以上、
+  灰: 光線が外に抜けた面）
+- かかる時間の目安（bench_wall_thickness、1コア）: 10万面で BVH 1.1 s + 光線 0.9 s、
+  100万面で BVH 12.6 s + 光線 8.4 s（約20秒）。数秒に収まるのは数十万面まで
+  （BVH は bvh.cached_bvh でキャッシュするので、同じメッシュの2回目からは光線の分だけ）
+
+使い方:
+    python3 wall_thickness.py                       # 全バリエーション
+    python3 wall_thickness.py hole ボディ\\ 15.stl --ply  # バリエーション名またはSTLファイル
+"""
+
+import os
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from chute_params import DEFAULT_PARAMS
+from mesh_props import PRINT_SETTINGS
+from mesh_repair import repair_triangles
+from mesh_validate import group_keys, twin_half_edges, weld
+from stl_export import face_normals, write_ply
+
+MIN_THICKNESS = PRINT_SETTINGS['wall_loops'] * PRINT_SETTINGS['line_width']  # mm（これより薄いと壁が引けない）
+THICK_FACTOR = 3.0   # 設計の壁厚のこの倍より厚い面を「厚すぎる」とする
+RAY_OFFSET = 1e-4    # mm（光線の始点を面から内側へずらして、自分の面に当たらないようにする）
+REPORT_REGIONS = 5   # 表示する薄いかたまりの数
+
+# 色（RGB）
+THIN_COLOR = (230, 30, 30)
+NO_HIT_COLOR = (160, 160, 160)
+GRADIENT = [(255, 220, 0), (0, 200, 60), (0, 90, 255)]  # MIN_THICKNESS, 設計の壁厚, THICK_FACTOR 倍
+
+
+@dataclass(frozen=True)
+class ThinRegion:
+    """辺でつながった薄い面のかたまり"""
+    faces: np.ndarray = field(repr=False)
+    area: float          # mm²
+    thinnest: float      # mm
+    center: tuple        # 面積で重みをつけた中心 (x, y, z) mm
+
+
+@dataclass(frozen=True)
+class ThicknessReport:
+    """面ごとの肉厚と、そのまとめ"""
+    thickness: np.ndarray = field(repr=False)  # mm（光線が抜けた面は inf、面積ゼロの面は nan）
+    area: np.ndarray = field(repr=False)       # mm²
+    minimum: float                              # これより薄い面を印刷できないとする
+    nominal: float                              # 設計の壁厚
+    regions: list = field(repr=False)           # ThinRegion（面積の大きい順）
+
+    @property
+    def faces(self):
+        return len(self.thickness)
+
+    @property
+    def measured(self):
+        """光線が当たった面"""
+        return np.isfinite(self.thickness)
+
+    @property
+    def no_hit(self):
+        return int(np.count_nonzero(np.isinf(self.thickness)))
+
+    @property
+    def thinnest(self):
+        measured = self.thickness[self.measured]
+        return float(measured.min()) if len(measured) else np.inf
+
+    @property
+    def median(self):
+        """面積で重みをつけた中央値"""
+        measured = self.measured
+        if not measured.any():
+            return np.inf
+        thickness = self.thickness[measured]
+        order = np.argsort(thickness)
+        weight = np.cumsum(self.area[measured][order])
+        return float(thickness[order][np.searchsorted(weight, weight[-1] / 2)])
+
+    def area_share(self, mask):
+        total = self.area[self.measured].sum()
+        return float(self.area[mask & self.measured].sum() / total) if total > 0 else 0.0
+
+    @property
+    def thin_share(self):
+        return self.area_share(self.thickness < self.minimum)
+
+    @property
+    def thick_share(self):
+        return self.area_share(self.thickness > self.nominal * THICK_FACTOR)
+
+
+def face_thickness(triangles, normals, tree=None, reach=np.inf):
+    """向きをそろえた三角形 (N, 3, 3) と外向きの単位法線 → 面ごとの肉厚 mm
+
+    光線が外に抜けた面は inf、面積ゼロ（法線 0）の面は nan
+    reach: まず reach mm までの光線で調べ、当たらなかった面だけ遠くまで飛ばし直す
+    （ほとんどの壁は薄いので、遠い節を早く切り捨てられる）
+    """
+    from bvh import build_bvh
+
+    triangles = np.asarray(triangles, dtype=np.float64)
+    tree = tree or build_bvh(triangles)
+    origins = triangles.mean(axis=1) - normals * RAY_OFFSET
+    distance, _ = tree.intersect(origins, -normals, reach)
+    valid = normals.any(axis=1)
+    far = np.isinf(distance) & valid
+    if np.isfinite(reach) and far.any():
+        distance[far], _ = tree.intersect(origins[far], -normals[far])
+    thickness = distance + RAY_OFFSET
+    thickness[~valid] = np.nan
+    return thickness
+
+
+def connected_faces(faces, selected):
+    """selected の面を、2面で共有する辺でつながるものどうしにまとめる → 面の番号の配列のリスト"""
+    twin = twin_half_edges(faces)
+    face = np.arange(len(twin)) // 3
+    other = twin // 3
+    linked = (twin >= 0) & selected[face] & selected[np.maximum(other, 0)]
+    a, b = face[linked], other[linked]
+
+    # 隣の小さいラベルをもらい、ラベルの先のラベルへ飛ぶ（ポインタジャンプ）を変わらなくなるまでくり返す
+    label = np.arange(len(faces))
+    while True:
+        smaller = label.copy()
+        np.minimum.at(smaller, a, label[b])
+        smaller = smaller[smaller]
+        if np.array_equal(smaller, label):
+            break
+        label = smaller
+
+    members = np.flatnonzero(selected)
+    if len(members) == 0:
+        return []
+    order, starts, _ = group_keys(label[members], with_inverse=False)
+    return np.split(members[order], starts[1:])
+
+
+def analyze(triangles, minimum=MIN_THICKNESS, nominal=DEFAULT_PARAMS.wall_thickness, tree=None, orient=True):
+    """三角形 (N, 3, 3) の肉厚を調べる → (向きをそろえた三角形, ThicknessReport)
+
+    tree: 三角形で作った BVH（省略時は作る。向きをそろえても面の順番は変わらないので元の三角形で作ってよい）
+    orient=False なら面の向きをそのまま使う（mesh_repair は閉じたシェルをどれも外向きにするので、
+    中空の立体の内側のシェルのように、向きが正しい内向きのシェルを含むとき）
+    """
+    triangles = np.asarray(triangles, dtype=np.float64)
+    if orient:
+        triangles, normals = repair_triangles(triangles)
+    else:
+        normals = face_normals(triangles.copy())
+    thickness = face_thickness(triangles, normals, tree, nominal * THICK_FACTOR)
+    area = 0.5 * np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0],
+                                         triangles[:, 2] - triangles[:, 0]), axis=1)
+
+    _, faces = weld(triangles)
+    centers = triangles.mean(axis=1)
+    regions = []
+    for members in connected_faces(faces, thickness < minimum):
+        weight = area[members]
+        total = weight.sum()
+        center = centers[members].mean(axis=0) if total == 0 else weight @ centers[members] / total
+        regions.append(ThinRegion(members, float(total), float(thickness[members].min()), tuple(center)))
+    regions.sort(key=lambda region: -region.area)
+    return triangles, ThicknessReport(thickness, area, minimum, nominal, regions)
+
+
+def thickness_colors(report):
+    """面ごとの色 (N, 3) uint8（赤: minimum 未満、黄→緑→青: minimum〜nominal×THICK_FACTOR、灰: 測れない面）"""
+    stops = [report.minimum, report.nominal, report.nominal * THICK_FACTOR]
+    thickness = report.thickness
+    measured = report.measured
+    colors = np.empty((report.faces, 3), dtype=np.uint8)
+    colors[:] = NO_HIT_COLOR
+    for channel in range(3):
+        levels = [color[channel] for color in GRADIENT]
+        colors[measured, channel] = np.rint(np.interp(thickness[measured], stops, levels))
+    colors[thickness < report.minimum] = THIN_COLOR
+    return colors
+
+
+def main(argv=None):
+    import argparse
+
+    from bvh import cached_bvh
+    from variants import VARIANTS
+
+    parser = argparse.ArgumentParser(description='面ごとの肉厚を内向きの光線で調べる')
+    parser.add_argument('targets', nargs='*', help='バリエーション名またはSTLファイル（省略時は全バリエーション）')
+    parser.add_argument('--min', type=float, default=MIN_THICKNESS, help='印刷できる最小の肉厚 mm')
+    parser.add_argument('--ply', action='store_true', help='色つきの <名前>_thickness.ply を書き出す')
+    args = parser.parse_args(argv)
+
+    print(f"{'パーツ':<28} {'面数':>9} {'最薄[mm]':>9} {'中央[mm]':>9} {'薄い[%]':>8} {'厚い[%]':>8} "
+          f"{'抜け':>6}  結果")
+    failed = False
+    for target in args.targets or list(VARIANTS):
+        if target in VARIANTS:
+            from variants import load_parts
+
+            parts = []
+            for func, filename in load_parts(target):
+                vertices, faces = func(DEFAULT_PARAMS)
+                parts.append((filename, np.asarray(vertices, dtype=np.float64)[np.asarray(faces)]))
+        else:
+            from stl_reader import MappedSTL
+
+            parts = [(target, np.asarray(MappedSTL(target).vectors, dtype=np.float64))]
+        for name, triangles in parts:
+            tree, _ = cached_bvh(triangles)
+            fixed, report = analyze(triangles, args.min, tree=tree)
+            mark = '❌' if report.regions else '✅'
+            failed |= bool(report.regions)
+            print(f"{name:<28} {report.faces:>9} {report.thinnest:>9.2f} {report.median:>9.2f} "
+                  f"{report.thin_share * 100:>8.2f} {report.thick_share * 100:>8.2f} {report.no_hit:>6}  "
+                  f"{mark} 薄い箇所 {len(report.regions)}")
+            for region in report.regions[:REPORT_REGIONS]:
+                x, y, z = region.center
+                print(f"    面 {len(region.faces):>6} 面積 {region.area:>9.2f} mm² 最薄 {region.thinnest:.2f} mm "
+                      f"中心 ({x:.1f}, {y:.1f}, {z:.1f})")
+            if args.ply:
+                vertices, faces = weld(fixed)
+                write_ply(os.path.splitext(os.path.basename(name))[0] + '_thickness.ply', vertices, faces,
+                          face_colors=thickness_colors(report))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())